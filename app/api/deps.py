@@ -0,0 +1,64 @@
+# app/api/deps.py
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.config import settings
+from app.schemas.auth_schemas import AuthenticatedUser
+from app.services.profiling_service import is_admin
+from app.services.token_service import token_verifier, InvalidTokenError, TokenVerificationUnavailableError
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)
+) -> Optional[AuthenticatedUser]:
+    """
+    Returns the user for the request's bearer token, or None if no token was sent.
+
+    A token that is present but invalid is still rejected with 401.
+    """
+    if credentials is None:
+        return None
+    try:
+        return await token_verifier.verify(credentials.credentials)
+    except InvalidTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid access token: {e}",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    except TokenVerificationUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+async def get_current_user(
+    user: Optional[AuthenticatedUser] = Depends(get_optional_user)
+) -> AuthenticatedUser:
+    """Returns the authenticated user, rejecting requests without a bearer token."""
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated.",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user
+
+async def get_document_user(
+    user: Optional[AuthenticatedUser] = Depends(get_optional_user)
+) -> Optional[AuthenticatedUser]:
+    """Guards the document endpoints; authentication is required when `settings.require_document_auth` is on."""
+    if settings.require_document_auth:
+        return await get_current_user(user)
+    return user
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guards the admin endpoints: the `X-Admin-Token` header must match `settings.admin_token` (denied without one)."""
+    if not is_admin(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required."
+        )
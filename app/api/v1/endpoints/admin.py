@@ -0,0 +1,55 @@
+# app/api/v1/endpoints/admin.py
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+
+from app.config import settings
+from app.services.profiling_service import profiling_service, ProfileNotFoundError
+
+router = APIRouter()
+
+def _check_enabled():
+    if not settings.profiling_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled. Set PROFILING_ENABLED to enable it.",
+        )
+
+@router.get("/profiling/slowest")
+async def slowest_requests():
+    """
+    The slowest requests since startup, slowest first, with the time spent in each pipeline stage.
+    """
+    _check_enabled()
+    return profiling_service.slowest()
+
+@router.get("/profiling/profiles")
+async def list_profiles():
+    """
+    Requests profiled with `X-Profile: 1` (or `?profile=1`), newest first.
+    """
+    _check_enabled()
+    return profiling_service.profiles()
+
+@router.get("/profiling/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    sort: str = "cumulative",
+    limit: int = Query(50, ge=1, le=1000),
+    format: str = Query("text", pattern="^(text|pstats)$"),
+):
+    """
+    A request's profile, as `pstats` text or as a `.prof` file (`format=pstats`) for tools like snakeviz.
+    """
+    _check_enabled()
+    try:
+        if format == "pstats":
+            return Response(
+                content=profiling_service.profile_dump(profile_id),
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'},
+            )
+        return PlainTextResponse(profiling_service.profile_text(profile_id, sort, limit))
+    except ProfileNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
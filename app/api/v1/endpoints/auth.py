@@ -1,8 +1,13 @@
 # app/api/v1/endpoints/auth.py
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
+from app.api.deps import get_current_user
 from app.services.auth_service import auth_service
-from app.schemas.auth_schemas import UserCreate, UserLogin, Token
+from app.schemas.auth_schemas import UserCreate, UserLogin, Token, AuthenticatedUser
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -14,10 +19,10 @@ async def signup(user_credentials: UserCreate):
     If disabled, it returns a JWT token.
     """
     try:
-        response = auth_service.get_supabase_client().auth.sign_up({
-            "email": user_credentials.email,
-            "password": user_credentials.password,
-        })
+        response = await auth_service.sign_up(
+            user_credentials.email,
+            user_credentials.password,
+        )
 
         # Case 1: Email confirmation is required. User is created, but no session yet.
         if response.user and not response.session:
@@ -42,6 +47,11 @@ async def signup(user_credentials: UserCreate):
             detail="Could not sign up user. Unexpected response from authentication service.",
         )
 
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Authentication service timed out.",
+        )
     except Exception as e:
         error_message = str(e)
         # Check for a common error message when user already exists.
@@ -51,7 +61,7 @@ async def signup(user_credentials: UserCreate):
                 detail="A user with this email already exists.",
             )
 
-        print(f"An error occurred during signup: {type(e).__name__} - {error_message}")
+        logger.exception(f"Signup failed: {type(e).__name__}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error_message,
@@ -65,10 +75,10 @@ async def login(user_credentials: UserLogin):
     """
     try:
         # Sign in the user with Supabase
-        session = auth_service.get_supabase_client().auth.sign_in_with_password({
-            "email": user_credentials.email,
-            "password": user_credentials.password,
-        })
+        session = await auth_service.sign_in_with_password(
+            user_credentials.email,
+            user_credentials.password,
+        )
         
         if not session or not session.session or not session.session.access_token:
             raise HTTPException(
@@ -80,12 +90,25 @@ async def login(user_credentials: UserLogin):
             "access_token": session.session.access_token,
             "token_type": "bearer"
         }
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Authentication service timed out.",
+        )
     except Exception as e:
         # This is a broad exception to catch the specific error from gotrue
         # and help identify the correct exception class.
         error_message = str(e)
-        print(f"An error occurred during login: {type(e).__name__} - {error_message}")
+        logger.warning(f"Login failed: {type(e).__name__} - {error_message}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=error_message or "Invalid credentials",
         )
+
+
+@router.get("/me", response_model=AuthenticatedUser)
+async def me(user: AuthenticatedUser = Depends(get_current_user)):
+    """
+    Return the user the bearer token belongs to. The token is verified locally.
+    """
+    return user
@@ -0,0 +1,95 @@
+# app/api/v1/endpoints/batch.py
+import os
+from typing import Literal, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.background import BackgroundTask
+
+from app.services.batch_service import batch_service, BatchNotFoundError
+from app.services.storage_services import StorageError
+from app.models.document_models import BatchRequest, BatchStatus, BatchUploadResponse
+from app.api.deps import get_document_user
+from app.schemas.auth_schemas import AuthenticatedUser
+
+router = APIRouter()
+
+@router.post("/upload", response_model=BatchUploadResponse)
+async def upload_batch(
+    files: list[UploadFile] = File(..., description="Documents (PDF, DOCX, TXT) and/or .zip archives of them"),
+    generate: bool = Query(False, description="Start generating presentations for the stored documents"),
+    concurrency: Optional[int] = Query(None, ge=1, description="Documents generated at once (capped by the server)"),
+    user: Optional[AuthenticatedUser] = Depends(get_document_user)
+):
+    """
+    Upload many documents in one request.
+
+    .zip archives are unpacked and each document in them is stored. Files
+    that cannot be stored are listed under `errors` without failing the
+    others. With `generate=true` a generation batch is started for the
+    stored documents; poll `/batch/{batch_id}` for progress.
+    """
+    try:
+        documents, errors = await batch_service.save_files(files, owner_id=user.id if user else None)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to store file: {str(e)}")
+
+    batch = None
+    if generate and documents:
+        batch = await batch_service.create([document.document_id for document in documents], concurrency)
+    return BatchUploadResponse(documents=documents, errors=errors, batch=batch)
+
+@router.post("", response_model=BatchStatus, status_code=202)
+async def create_batch(request: BatchRequest):
+    """
+    Generate presentations for many uploaded documents.
+
+    Documents are generated concurrently, up to the batch's concurrency, in
+    the background. Poll `/batch/{batch_id}` for progress and download the
+    presentations as a .zip from `/batch/{batch_id}/download`.
+    """
+    try:
+        batch = await batch_service.create(request.document_ids, request.concurrency)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content=batch.model_dump(mode="json"),
+        headers={"Location": f"/api/v1/batch/{batch.batch_id}"}
+    )
+
+@router.get("/{batch_id}", response_model=BatchStatus)
+async def get_batch(batch_id: str):
+    """
+    Get the combined and per-document status of a generation batch.
+    """
+    batch = batch_service.get(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found.")
+    return batch
+
+@router.get("/{batch_id}/download", response_class=FileResponse)
+async def download_batch(
+    batch_id: str,
+    format: Literal["pptx", "pdf", "html"] = Query("pptx", description="Output format")
+):
+    """
+    Download the presentations of a batch generated so far as a .zip archive.
+    """
+    try:
+        archive_path, file_name = await batch_service.build_archive(batch_id, format)
+    except BatchNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Presentation file not found.")
+    except StorageError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return FileResponse(
+        archive_path,
+        media_type="application/zip",
+        filename=file_name,
+        background=BackgroundTask(os.unlink, archive_path)
+    )
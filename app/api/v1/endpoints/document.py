@@ -1,42 +1,70 @@
 # app/api/v1/endpoints/document.py
+import json
+import math
 import os
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
+from typing import Literal, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
-from app.services.document_service import document_service, UPLOAD_DIR
-from app.services.presentation_service import presentation_service, PRESENTATION_DIR
-from app.services.azure_service import azure_service
-from app.models.document_models import DocumentMetadata, PresentationResponse
+from app.services.document_service import document_service, SUPPORTED_EXTENSIONS, UploadTooLargeError, InvalidFileContentError
+from app.services.renderers import RENDERERS
+from app.services.storage_services import StorageError
+from app.services.generation_service import generation_service, DocumentNotFoundError
+from app.services.job_service import job_service, JobQueueFullError
+from app.services.registry_service import registry_service
+from app.services.azure_service import AzureOpenAIUnavailableError
+from app.models.document_models import DocumentMetadata, PresentationResponse, GenerationJob
+from app.api.deps import get_document_user
+from app.config import settings
+from app.utils.file_responses import CachedFileResponse
+from app.schemas.auth_schemas import AuthenticatedUser
 
 router = APIRouter()
 
 @router.post("/upload", response_model=DocumentMetadata)
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(
+    file: UploadFile = File(...),
+    user: Optional[AuthenticatedUser] = Depends(get_document_user)
+):
     """
     Upload a document (PDF, DOCX, TXT) for processing.
     """
-    supported_extensions = [".pdf", ".docx", ".txt"]
     # Extract extension from filename
     file_extension = Path(file.filename).suffix.lower()
-    if file_extension not in supported_extensions:
+    if file_extension not in SUPPORTED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file format. Please upload a PDF, DOCX, or TXT file."
         )
         
     try:
-        document_id, _ = await document_service.save_uploaded_file(file)
+        saved = await document_service.save_uploaded_file(file, owner_id=user.id if user else None)
         metadata = DocumentMetadata(
-            document_id=document_id,
-            file_name=file.filename
+            document_id=saved.document_id,
+            file_name=file.filename,
+            size_bytes=saved.size,
+            content_hash=saved.content_hash
         )
         return metadata
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidFileContentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        raise HTTPException(status_code=502, detail=f"Failed to store file: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
-@router.post("/{document_id}/generate-presentation", response_model=PresentationResponse)
-async def generate_presentation(document_id: str):
+@router.post(
+    "/{document_id}/generate-presentation",
+    response_model=PresentationResponse,
+    responses={202: {"model": GenerationJob, "description": "Job queued (when `background=true`)"}}
+)
+async def generate_presentation(
+    document_id: str,
+    background: bool = Query(False, description="Queue the work and return a job ID instead of waiting for the result")
+):
     """
     Generate a presentation from an uploaded document.
     
@@ -44,60 +72,134 @@ async def generate_presentation(document_id: str):
     1. Finds the uploaded document by its ID.
     2. Extracts text from the document.
     3. Generates a summary using an AI service.
-    4. Creates a .pptx presentation from the summary.
-    5. Returns a download link for the presentation.
-    """
-    try:
-        # Find the file in the upload directory
-        uploaded_files = list(UPLOAD_DIR.glob(f"{document_id}.*"))
-        if not uploaded_files:
-            raise HTTPException(status_code=404, detail="Document not found.")
-        
-        file_path = uploaded_files[0]
-        
-        # 1. Extract text
-        text = document_service.extract_text_from_file(file_path)
-        if not text.strip():
-            raise HTTPException(status_code=400, detail="Extracted text is empty.")
-            
-        # 2. Generate presentation content
-        presentation_content = await azure_service.create_presentation_content(document_text=text)
-        if not presentation_content.strip():
-            raise HTTPException(status_code=500, detail="Failed to generate presentation content.")
+    4. Stores the slides and renders an HTML preview.
+    5. Returns download links; the .pptx and PDF are rendered on first download.
 
-        # 3. Create presentation
-        presentation_path = presentation_service.create_presentation_from_content(
-            document_id,
-            presentation_content
-        )
-        
-        # 4. Create response with download URL
-        response = PresentationResponse(
-            document_id=document_id,
-            file_name=presentation_path.name,
-            download_url=f"/api/v1/document/download/presentation/{document_id}"
+    With `background=true` the work is queued instead and a job is returned
+    immediately with status 202; poll `/jobs/{job_id}` for progress.
+    """
+    if background:
+        try:
+            await generation_service.find_document(document_id)
+        except DocumentNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        try:
+            job = await job_service.submit(document_id)
+        except JobQueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        return JSONResponse(
+            status_code=202,
+            content=job.model_dump(mode="json"),
+            headers={"Location": f"/api/v1/document/jobs/{job.job_id}"}
         )
-        return response
 
+    try:
+        return await generation_service.generate_presentation(document_id)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AzureOpenAIUnavailableError as e:
+        retry_after = str(math.ceil(e.retry_after)) if e.retry_after else "30"
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": retry_after})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
-@router.get("/download/presentation/{document_id}", response_class=FileResponse)
-async def download_presentation(document_id: str):
+@router.api_route("/{document_id}/generate-presentation/stream", methods=["GET", "POST"])
+async def stream_presentation(
+    document_id: str,
+    build_pptx: bool = Query(True, description="Store the presentation for download once all slides have been generated")
+):
+    """
+    Generate a presentation and stream its slides as Server-Sent Events.
+
+    Events:
+    - `title`: the presentation title, as soon as it is known.
+    - `slide`: one completed slide object (`{"title", "content"}`), with its index.
+    - `done`: the presentation response (or null when `build_pptx=false`).
+    - `error`: `{"detail": ...}` if generation fails mid-stream.
+    """
+    try:
+        await generation_service.find_document(document_id)
+    except DocumentNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def event_stream():
+        index = 0
+        try:
+            async for event, data in generation_service.stream_presentation(document_id, build_pptx=build_pptx):
+                if event == "slide":
+                    data = {"index": index, **data}
+                    index += 1
+                elif event == "done" and data is not None:
+                    data = data.model_dump(mode="json")
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/jobs/{job_id}", response_model=GenerationJob)
+async def get_generation_job(job_id: str):
+    """
+    Get the status of a queued presentation generation job.
+    """
+    job = await job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+@router.get("/{document_id}", response_model=DocumentMetadata)
+async def get_document(document_id: str):
+    """
+    Get the metadata and processing status of an uploaded document.
+    """
+    record = await registry_service.get(document_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Document not found.")
+    return DocumentMetadata(
+        document_id=record.document_id,
+        file_name=record.file_name,
+        size_bytes=record.size_bytes,
+        content_hash=record.content_hash,
+        status=record.status,
+        created_at=record.created_at,
+        error_message=record.error_message
+    )
+
+@router.api_route("/download/presentation/{document_id}", methods=["GET", "HEAD"], response_class=FileResponse)
+async def download_presentation(
+    document_id: str,
+    format: Literal["pptx", "pdf", "html"] = Query("pptx", description="Output format")
+):
     """
     Download a generated presentation file.
+
+    The HTML preview exists as soon as generation finishes; the .pptx and PDF
+    are rendered on the first request for them and kept in the shared storage.
+
+    The response carries a strong ETag (SHA-256 of the file) and Last-Modified,
+    so repeat downloads can be revalidated with `If-None-Match` or
+    `If-Modified-Since` and answered with 304. `Range` requests are supported
+    for resuming interrupted downloads.
     """
+    renderer = RENDERERS[format]
     try:
-        presentation_path = PRESENTATION_DIR / f"{document_id}.pptx"
-        if not presentation_path.exists():
-            raise HTTPException(status_code=404, detail="Presentation file not found.")
-        
-        return FileResponse(
-            path=presentation_path,
-            filename=f"presentation_{document_id}.pptx",
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+        presentation_path = await generation_service.get_rendition(document_id, format)
+        return await CachedFileResponse.create(
+            presentation_path,
+            cache_control=settings.download_cache_control,
+            # The HTML preview opens in the browser, other formats download
+            filename=None if format == "html" else f"presentation_{document_id}{renderer.extension}",
+            media_type=renderer.media_type
         )
-    except Exception as e:
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Presentation file not found.")
+    except StorageError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except OSError as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
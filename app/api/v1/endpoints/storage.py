@@ -0,0 +1,13 @@
+# app/api/v1/endpoints/storage.py
+from fastapi import APIRouter
+
+from app.services.janitor_service import janitor_service
+
+router = APIRouter()
+
+@router.get("/stats")
+async def storage_stats():
+    """
+    Disk usage of uploads and presentations and what the storage janitor has reclaimed.
+    """
+    return janitor_service.stats()
@@ -1,7 +1,8 @@
 # app/api/v1/router.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.endpoints import document, auth
+from app.api.deps import get_document_user, require_admin
+from app.api.v1.endpoints import document, auth, storage, admin, batch
 
 api_router = APIRouter()
 
@@ -16,5 +17,30 @@ api_router.include_router(
 api_router.include_router(
     document.router,
     prefix="/document",
-    tags=["document"]
+    tags=["document"],
+    dependencies=[Depends(get_document_user)]
+)
+
+# Include batch upload and generation endpoints
+api_router.include_router(
+    batch.router,
+    prefix="/batch",
+    tags=["batch"],
+    dependencies=[Depends(get_document_user)]
+)
+
+# Include storage usage endpoints
+api_router.include_router(
+    storage.router,
+    prefix="/storage",
+    tags=["storage"],
+    dependencies=[Depends(get_document_user)]
+)
+
+# Include admin endpoints (request profiling)
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)]
 )
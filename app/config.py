@@ -20,6 +20,69 @@ class Settings(BaseSettings):
     base_dir: Path = Path(__file__).parent.parent
     storage_dir: Path = base_dir / "app" / "storage"
     transcripts_dir: Path = storage_dir / "transcripts"
+    cache_dir: Path = storage_dir / "cache"
+    uploads_dir: Path = storage_dir / "uploads"
+    presentations_dir: Path = storage_dir / "presentations"
+    
+    # Shared artifact storage: "local" keeps everything under storage_dir;
+    # "s3" stores uploads and presentations in an S3-compatible bucket and
+    # uses storage_dir as a local cache
+    storage_backend: str = "local"
+    s3_endpoint_url: Optional[str] = None
+    s3_bucket: Optional[str] = None
+    s3_access_key: Optional[str] = None
+    s3_secret_key: Optional[str] = None
+    s3_region: str = "us-east-1"
+    s3_prefix: str = ""
+    # "path" (https://host/bucket/key, e.g. MinIO) or "virtual" (https://bucket.host/key)
+    s3_addressing_style: str = "path"
+    s3_part_size: int = 8 * 1024 * 1024
+    s3_max_concurrency: int = 4
+    s3_timeout: float = 60.0
+    
+    # Storage janitor: uploads and presentations not accessed within their TTL
+    # are deleted, then the least recently accessed ones until usage is under
+    # the quota (0 disables a limit; an interval of 0 disables the janitor)
+    janitor_interval: float = 600.0
+    upload_ttl: float = 7 * 24 * 3600.0
+    presentation_ttl: float = 7 * 24 * 3600.0
+    storage_quota_bytes: int = 10 * 1024 * 1024 * 1024
+    # Files accessed this recently are kept even over quota
+    janitor_min_idle: float = 600.0
+    # Files deleted per step, so each step is short
+    janitor_batch_size: int = 200
+    
+    # Document registry (SQLAlchemy URL)
+    database_url: str = f"sqlite:///{storage_dir / 'registry.db'}"
+    
+    # Result cache settings (extracted text and LLM output); processes sharing
+    # cache_dir pick up each other's entries on periodic re-scans
+    cache_max_bytes: int = 512 * 1024 * 1024
+    
+    # Upload settings
+    max_upload_bytes: int = 50 * 1024 * 1024
+    upload_chunk_size: int = 1024 * 1024
+    # Uploads are spread over nested subdirectories, this many levels deep
+    upload_shard_depth: int = 2
+    
+    # Base .pptx for generated presentations (layout 0: title, layout 1: title and content);
+    # python-pptx's default template when unset
+    presentation_template: Optional[Path] = None
+    # Bullets beyond these limits continue on "(cont.)" slides
+    slide_max_words: int = 80
+    slide_max_chars: int = 550
+    
+    # Download settings; presentations can be regenerated under the same URL,
+    # so clients revalidate with the ETag by default
+    download_cache_control: str = "private, no-cache"
+    
+    # Extraction stops once either budget is reached (0 disables a budget)
+    extract_max_chars: int = 2_000_000
+    extract_max_tokens: int = 0
+    
+    # PDFs with at least this many pages are extracted in parallel (0 disables)
+    pdf_parallel_min_pages: int = 64
+    pdf_pages_per_task: int = 32
     
     # API settings
     api_v1_prefix: str = "/api/v1"
@@ -30,12 +93,105 @@ class Settings(BaseSettings):
     # Supabase settings
     supabase_url: str
     supabase_key: str
-    
+    supabase_timeout: float = 10.0
+    supabase_max_connections: int = 100
+    supabase_max_keepalive: int = 20
+
+    # Access tokens are verified locally: HS256 with the project's JWT secret
+    # (if set) or asymmetric keys from the project's JWKS endpoint
+    supabase_jwt_secret: Optional[str] = None
+    supabase_jwt_audience: str = "authenticated"
+    supabase_jwt_leeway: float = 0.0
+    supabase_jwks_ttl: float = 600.0
+    auth_token_cache_size: int = 1024
+    require_document_auth: bool = False
+
     # Azure OpenAI setting
     azure_openai_api_key: str
     azure_openai_api_version: str
     azure_openai_endpoint: str
     azure_openai_deployment_name: str
+    azure_openai_max_tokens: int = 2000
+    
+    # Azure OpenAI connection pool, retries, quota (0 = unlimited) and circuit breaker
+    azure_openai_http2: bool = True
+    azure_openai_max_connections: int = 100
+    azure_openai_max_keepalive: int = 20
+    azure_openai_keepalive_expiry: float = 30.0
+    azure_openai_timeout: float = 120.0
+    azure_openai_connect_timeout: float = 10.0
+    azure_openai_max_retries: int = 4
+    azure_openai_retry_base_delay: float = 0.5
+    azure_openai_retry_max_delay: float = 30.0
+    azure_openai_rpm: int = 0
+    azure_openai_tpm: int = 0
+    azure_openai_circuit_failures: int = 5
+    azure_openai_circuit_reset_seconds: float = 30.0
+    # Request token usage on streamed completions; disable for API versions without stream_options
+    azure_openai_stream_usage: bool = True
+    
+    # Prompt preprocessing between extraction and the LLM: headers, footers
+    # and page numbers recurring on at least this share of PDF pages are
+    # removed, whitespace is compacted, and text over prompt_max_tokens is
+    # sampled section by section (0 disables the budget)
+    prompt_preprocessing: bool = True
+    prompt_max_tokens: int = 120000
+    prompt_boilerplate_min_share: float = 0.5
+    
+    # Long documents are split into chunks of this many tokens and summarized map-reduce style
+    llm_chunk_tokens: int = 12000
+    llm_map_concurrency: int = 8
+    llm_map_max_tokens: int = 800
+    tokenizer_encoding: str = "o200k_base"
+    
+    # Generation job settings; job_workers is per process (0 for API-only
+    # replicas when workers run separately with `python -m app.worker`,
+    # which needs JOB_BACKEND=redis)
+    job_workers: int = 4
+    job_queue_size: int = 100
+    # Pipelines run at once per process, whoever started them: job workers,
+    # batches and direct generation requests all share these slots
+    generation_concurrency: int = 4
+    job_history_size: int = 1000
+    
+    # "local" keeps jobs in the API process; "redis" shares the queue and job
+    # status between replicas and worker processes (which also need a shared
+    # DATABASE_URL and STORAGE_BACKEND=s3)
+    job_backend: str = "local"
+    redis_url: str = "redis://localhost:6379/0"
+    redis_prefix: str = "noburnout:"
+    # A running job's lease is renewed every third of this; jobs of workers
+    # that stop renewing are handed to another worker
+    job_visibility_timeout: float = 300.0
+    job_max_attempts: int = 3
+    job_retry_base_delay: float = 5.0
+    job_result_ttl: float = 24 * 3600.0
+    job_poll_interval: float = 0.5
+    
+    # Batch uploads (files or .zip archives) and batch generation; each batch
+    # generates up to batch_concurrency documents at once, within the
+    # process-wide generation_concurrency
+    batch_max_files: int = 200
+    batch_max_archive_bytes: int = 1024 * 1024 * 1024
+    batch_concurrency: int = 8
+    batch_max_concurrency: int = 16
+    batch_history_size: int = 100
+    
+    # Prometheus metrics at /metrics
+    metrics_enabled: bool = True
+    
+    # Request profiling: the slowest requests are kept with their time per
+    # pipeline stage, and requests sent with `X-Profile: 1` (or ?profile=1)
+    # are run under cProfile; both are listed under /api/v1/admin/profiling
+    profiling_enabled: bool = False
+    profiling_slowest_count: int = 20
+    profiling_max_profiles: int = 20
+    # Required for the admin endpoints and the profiling flag; without it
+    # they are disabled
+    admin_token: Optional[str] = None
+    
+    # CPU-bound work (extraction, rendering); 0 uses a thread pool instead of processes
+    cpu_pool_size: int = 2
     
     class Config:
         env_file = ".env"
@@ -44,14 +200,18 @@ class Settings(BaseSettings):
 # Create settings instance
 settings = Settings()
 
-# Ensure storage directories exist
 def ensure_storage_dirs():
-    """Create storage directories if they don't exist."""
+    """
+    Create storage directories if they don't exist.
+
+    Called when the app or a worker starts rather than on import, so importing
+    the app touches no files.
+    """
     for dir_path in [
         settings.storage_dir,
         settings.transcripts_dir,
+        settings.cache_dir,
+        settings.uploads_dir,
+        settings.presentations_dir,
     ]:
         dir_path.mkdir(parents=True, exist_ok=True)
-
-# Call on import
-ensure_storage_dirs()
\ No newline at end of file
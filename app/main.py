@@ -1,14 +1,48 @@
 # Update your main.py
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.config import settings
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from app.config import settings, ensure_storage_dirs
 from app.api.v1.router import api_router 
+from app.services.job_service import job_service
+from app.services.batch_service import batch_service
+from app.services.executor_service import executor_service
+from app.services.azure_service import azure_service
+from app.services.auth_service import auth_service
+from app.services.token_service import token_verifier
+from app.services.registry_service import registry_service
+from app.services.storage_services import storage
+from app.services.janitor_service import janitor_service
+from app.services.cache_service import result_cache
+from app.services.metrics_service import MetricsMiddleware, ServiceStatsCollector
+from app.services.profiling_service import ProfilingMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ensure_storage_dirs()
+    # Start the background presentation generation workers
+    await job_service.start()
+    # Expire and evict old uploads and presentations in the background
+    await janitor_service.start()
+    yield
+    await janitor_service.stop()
+    await batch_service.stop()
+    await job_service.stop()
+    executor_service.shutdown()
+    await azure_service.aclose()
+    await auth_service.aclose()
+    await token_verifier.aclose()
+    registry_service.close()
+    await storage.aclose()
+    await job_service.aclose()
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -22,6 +56,23 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.metrics_enabled:
+    # Outermost, so latency covers the other middleware too
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register(ServiceStatsCollector(
+        caches={"result": result_cache.stats, "token": token_verifier.stats},
+        storage=janitor_service.stats,
+        jobs_queued=lambda: job_service.queued,
+    ))
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics."""
+        return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
 # Include v1 API routes (which now includes both transcript and ai)
 app.include_router(
     api_router,
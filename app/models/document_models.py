@@ -15,13 +15,74 @@ class DocumentMetadata(BaseModel):
     """Model for document processing status and metadata."""
     document_id: str = Field(..., description="Unique identifier for the document")
     file_name: str = Field(..., description="Original name of the uploaded file")
+    size_bytes: Optional[int] = Field(None, description="Size of the uploaded file in bytes")
+    content_hash: Optional[str] = Field(None, description="SHA-256 hex digest of the file content")
     status: ProcessingStatus = Field(default=ProcessingStatus.PENDING, description="Current processing status")
     created_at: datetime = Field(default_factory=datetime.now, description="Timestamp of upload")
     error_message: Optional[str] = Field(None, description="Details of processing failure, if any")
 
+class PromptStats(BaseModel):
+    """Model for how much the document text was reduced before prompting the LLM."""
+    original_tokens: int = Field(..., description="Tokens in the extracted text")
+    prompt_tokens: int = Field(..., description="Tokens sent after preprocessing")
+    reduction: float = Field(..., description="Share of tokens removed (0-1)")
+    boilerplate_lines: int = Field(0, description="Header, footer and page number lines removed")
+    sampled: bool = Field(False, description="Whether the text was sampled to fit the token budget")
+
 class PresentationResponse(BaseModel):
     """Response model for a generated presentation."""
     document_id: str = Field(..., description="Identifier of the source document")
     file_name: str = Field(..., description="File name of the generated presentation (e.g., 'summary.pptx')")
-    download_url: str = Field(..., description="URL to download the presentation file")
+    download_url: str = Field(..., description="URL to download the presentation file (add `?format=pdf` or `?format=html` for other formats)")
+    preview_url: Optional[str] = Field(None, description="URL of the HTML preview, available immediately")
+    prompt_stats: Optional[PromptStats] = Field(None, description="Prompt-size reduction, when this request called the LLM")
     created_at: datetime = Field(default_factory=datetime.now, description="Timestamp of presentation creation")
+
+class GenerationJob(BaseModel):
+    """Model for a queued presentation generation job."""
+    job_id: str = Field(..., description="Unique identifier for the job")
+    document_id: str = Field(..., description="Identifier of the source document")
+    status: ProcessingStatus = Field(default=ProcessingStatus.PENDING, description="Current processing status")
+    stage: Optional[str] = Field(None, description="Pipeline stage currently running (e.g., 'extracting', 'generating')")
+    attempts: int = Field(0, description="Number of times a worker has started the job")
+    created_at: datetime = Field(default_factory=datetime.now, description="Timestamp the job was queued")
+    updated_at: datetime = Field(default_factory=datetime.now, description="Timestamp of the last status change")
+    error_message: Optional[str] = Field(None, description="Details of processing failure, if any")
+    result: Optional[PresentationResponse] = Field(None, description="Generated presentation, once completed")
+
+class BatchItem(BaseModel):
+    """Model for the generation status of one document in a batch."""
+    document_id: str = Field(..., description="Identifier of the source document")
+    file_name: Optional[str] = Field(None, description="Original name of the uploaded file")
+    status: ProcessingStatus = Field(default=ProcessingStatus.PENDING, description="Current processing status")
+    error_message: Optional[str] = Field(None, description="Details of processing failure, if any")
+    result: Optional[PresentationResponse] = Field(None, description="Generated presentation, once completed")
+
+class BatchStatus(BaseModel):
+    """Model for a batch of presentation generations."""
+    batch_id: str = Field(..., description="Unique identifier for the batch")
+    status: ProcessingStatus = Field(default=ProcessingStatus.PENDING, description="COMPLETED once every document is done, FAILED if all of them failed")
+    concurrency: int = Field(..., description="Documents generated at once")
+    total: int = Field(..., description="Number of documents in the batch")
+    completed: int = Field(0, description="Documents with a generated presentation")
+    failed: int = Field(0, description="Documents whose generation failed")
+    created_at: datetime = Field(default_factory=datetime.now, description="Timestamp the batch was created")
+    updated_at: datetime = Field(default_factory=datetime.now, description="Timestamp of the last status change")
+    download_url: str = Field(..., description="URL of a .zip with the presentations generated so far")
+    items: list[BatchItem] = Field(default_factory=list, description="Status of each document")
+
+class BatchRequest(BaseModel):
+    """Model for a batch generation request."""
+    document_ids: list[str] = Field(..., min_length=1, description="Documents to generate presentations for")
+    concurrency: Optional[int] = Field(None, ge=1, description="Documents generated at once (capped by the server)")
+
+class BatchFileError(BaseModel):
+    """Model for a file of a batch upload that was rejected."""
+    file_name: str = Field(..., description="Name of the file (path within the archive for .zip uploads)")
+    detail: str = Field(..., description="Why the file was rejected")
+
+class BatchUploadResponse(BaseModel):
+    """Model for the result of a batch upload."""
+    documents: list[DocumentMetadata] = Field(default_factory=list, description="Stored documents, in upload order")
+    errors: list[BatchFileError] = Field(default_factory=list, description="Files that were not stored")
+    batch: Optional[BatchStatus] = Field(None, description="The generation batch, when `generate=true`")
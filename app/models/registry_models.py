@@ -0,0 +1,37 @@
+# app/models/registry_models.py
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Enum, Index, Integer, String
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.models.document_models import ProcessingStatus
+
+class Base(DeclarativeBase):
+    """Declarative base for the document registry tables."""
+    pass
+
+class DocumentRecord(Base):
+    """An uploaded document, keyed by its document ID."""
+    __tablename__ = "documents"
+
+    document_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    owner_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    file_name: Mapped[str] = mapped_column(String(255))
+    extension: Mapped[str] = mapped_column(String(16))
+    # Relative to the upload directory
+    path: Mapped[str] = mapped_column(String(255))
+    size_bytes: Mapped[int] = mapped_column(Integer)
+    content_hash: Mapped[str] = mapped_column(String(64), index=True)
+    status: Mapped[ProcessingStatus] = mapped_column(
+        Enum(ProcessingStatus, values_callable=lambda e: [m.value for m in e], native_enum=False),
+        default=ProcessingStatus.PENDING,
+        index=True
+    )
+    error_message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    __table_args__ = (
+        Index("ix_documents_owner_created", "owner_id", "created_at"),
+    )
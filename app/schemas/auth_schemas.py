@@ -1,4 +1,5 @@
 # app/schemas/auth_schemas.py
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 class UserCreate(BaseModel):
@@ -15,3 +16,10 @@ class Token(BaseModel):
     """Schema for the JWT token response."""
     access_token: str
     token_type: str = "bearer"
+
+class AuthenticatedUser(BaseModel):
+    """Identity taken from a verified Supabase access token."""
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    expires_at: int
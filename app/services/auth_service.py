@@ -1,18 +1,87 @@
 # app/services/auth_service.py
-from supabase import create_client, Client
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
 from app.config import settings
 
-# Initialize Supabase client
-supabase_url: str = settings.supabase_url
-supabase_key: str = settings.supabase_key
-supabase: Client = create_client(supabase_url, supabase_key)
+if TYPE_CHECKING:
+    from gotrue.types import AuthResponse
+    from supabase import AsyncClient
 
 class AuthService:
     """Service for handling authentication with Supabase."""
 
-    @staticmethod
-    def get_supabase_client() -> Client:
-        """Returns the Supabase client instance."""
-        return supabase
+    def __init__(self):
+        self._client: Optional["AsyncClient"] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+
+    async def get_supabase_client(self) -> "AsyncClient":
+        """
+        Returns the shared async Supabase client, creating it on first use.
+
+        The client keeps one pooled HTTP connection set for all requests. It
+        does not persist or refresh sessions, since it acts on behalf of many
+        users rather than holding a session of its own. The supabase package
+        is imported here as well, keeping it out of the startup path.
+        """
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    from supabase import AsyncClientOptions, acreate_client
+
+                    self._http_client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.supabase_max_connections,
+                            max_keepalive_connections=settings.supabase_max_keepalive
+                        ),
+                        timeout=settings.supabase_timeout,
+                        follow_redirects=True
+                    )
+                    self._client = await acreate_client(
+                        settings.supabase_url,
+                        settings.supabase_key,
+                        options=AsyncClientOptions(
+                            auto_refresh_token=False,
+                            persist_session=False,
+                            httpx_client=self._http_client
+                        )
+                    )
+        return self._client
+
+    async def sign_up(self, email: str, password: str) -> "AuthResponse":
+        """
+        Creates a user in Supabase Auth.
+
+        Raises:
+            asyncio.TimeoutError: If Supabase does not answer within `settings.supabase_timeout`.
+        """
+        client = await self.get_supabase_client()
+        return await asyncio.wait_for(
+            client.auth.sign_up({"email": email, "password": password}),
+            timeout=settings.supabase_timeout
+        )
+
+    async def sign_in_with_password(self, email: str, password: str) -> "AuthResponse":
+        """
+        Signs a user in with email and password.
+
+        Raises:
+            asyncio.TimeoutError: If Supabase does not answer within `settings.supabase_timeout`.
+        """
+        client = await self.get_supabase_client()
+        return await asyncio.wait_for(
+            client.auth.sign_in_with_password({"email": email, "password": password}),
+            timeout=settings.supabase_timeout
+        )
+
+    async def aclose(self):
+        """Closes the pooled HTTP connections."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._client = None
+        self._http_client = None
 
 auth_service = AuthService()
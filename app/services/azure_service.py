@@ -1,80 +1,340 @@
-from openai import AsyncAzureOpenAI
-from typing import Optional
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
+import asyncio
+import httpx
+import json
 import logging
 from app.config import settings
+from app.services.metrics_service import record_token_usage
+from app.utils.json_stream import SlideStreamParser
+from app.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter,
+    parse_retry_after,
+    retry_delay,
+)
+from app.utils.tokens import count_tokens, split_into_chunks
+
+if TYPE_CHECKING:
+    from openai import AsyncAzureOpenAI
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompts change so cached LLM output is not reused
+PROMPT_VERSION = "2"
+
+PRESENTATION_SYSTEM_PROMPT = """Anda adalah asisten ahli yang bertugas membuat konten presentasi dari sebuah dokumen.
+Berdasarkan teks yang diberikan, buatlah struktur presentasi yang terdiri dari judul dan serangkaian slide.
+Setiap slide harus memiliki judul dan konten. Konten dapat berupa poin-poin (bullet points) atau paragraf singkat yang ringkas.
+
+Format output harus berupa JSON yang valid, seperti contoh ini:
+{
+  "title": "Judul Presentasi",
+  "slides": [
+    {
+      "title": "Judul Slide 1",
+      "content": [
+        "Ini adalah contoh konten dalam bentuk paragraf singkat, merangkum ide utama dari bagian ini.",
+        "Paragraf bisa digunakan untuk penjelasan yang lebih naratif."
+      ]
+    },
+    {
+      "title": "Judul Slide 2",
+      "content": [
+        "Poin penting pertama dalam bentuk bullet point.",
+        "Poin penting kedua untuk menyoroti detail spesifik."
+      ]
+    }
+  ]
+}
+
+Pastikan konten tetap ringkas, informatif, dan relevan dengan dokumen sumber. Gunakan Bahasa Indonesia."""
+
+OUTLINE_SYSTEM_PROMPT = """Anda adalah asisten ahli yang merangkum satu bagian dari dokumen yang lebih panjang.
+Buatlah kerangka ringkas dari bagian tersebut: judul bagian dan poin-poin kunci yang penting untuk presentasi.
+
+Format output harus berupa JSON yang valid, seperti contoh ini:
+{
+  "section_title": "Judul Bagian",
+  "key_points": [
+    "Poin kunci pertama.",
+    "Poin kunci kedua."
+  ]
+}
+
+Jangan menambahkan informasi yang tidak ada di teks. Gunakan Bahasa Indonesia."""
+
+class AzureOpenAIError(Exception):
+    """Raised when Azure OpenAI fails to produce presentation content."""
+
+class AzureOpenAIUnavailableError(AzureOpenAIError):
+    """Raised when Azure OpenAI is throttling or degraded; the caller may retry later."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 class AzureOpenAIService:
     """Service for interacting with Azure OpenAI."""
-    
+
     def __init__(self):
-        self.client = AsyncAzureOpenAI(
-            api_key=settings.azure_openai_api_key,
-            api_version=settings.azure_openai_api_version,
-            azure_endpoint=settings.azure_openai_endpoint
-        )
+        self._client: Optional["AsyncAzureOpenAI"] = None
         self.deployment_name = settings.azure_openai_deployment_name
-    
+        self.rate_limiter = RateLimiter(settings.azure_openai_rpm, settings.azure_openai_tpm)
+        self.circuit_breaker = CircuitBreaker(
+            settings.azure_openai_circuit_failures,
+            settings.azure_openai_circuit_reset_seconds
+        )
+
+    @property
+    def client(self) -> "AsyncAzureOpenAI":
+        """
+        The Azure OpenAI client, created on first use.
+
+        The openai SDK is slow to import, so neither the import nor the client
+        is paid for at startup. One pooled HTTP client is shared by every call;
+        retries are handled here rather than by the SDK so they can honour the
+        rate limiter.
+        """
+        if self._client is None:
+            from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+            http_client = DefaultAsyncHttpxClient(
+                http2=settings.azure_openai_http2,
+                limits=httpx.Limits(
+                    max_connections=settings.azure_openai_max_connections,
+                    max_keepalive_connections=settings.azure_openai_max_keepalive,
+                    keepalive_expiry=settings.azure_openai_keepalive_expiry
+                ),
+                timeout=httpx.Timeout(
+                    settings.azure_openai_timeout,
+                    connect=settings.azure_openai_connect_timeout
+                )
+            )
+            self._client = AsyncAzureOpenAI(
+                api_key=settings.azure_openai_api_key,
+                api_version=settings.azure_openai_api_version,
+                azure_endpoint=settings.azure_openai_endpoint,
+                http_client=http_client,
+                max_retries=0
+            )
+        return self._client
+
+    @client.setter
+    def client(self, client: "AsyncAzureOpenAI"):
+        self._client = client
+
+    async def aclose(self):
+        """Closes the pooled HTTP connections, if the client was ever created."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _create_completion(self, messages: list[dict], max_tokens: int, **kwargs: Any) -> Any:
+        """
+        Calls the chat completions API with rate limiting, retries and a circuit breaker.
+
+        Throttling (429), timeouts, connection errors and 5xx responses are
+        retried with jittered exponential backoff, waiting at least as long as
+        the `Retry-After` header asks; if it asks for longer than
+        `settings.azure_openai_retry_max_delay`, the call fails at once with
+        that `retry_after`. Timeouts, connection errors and 5xx
+        responses also count towards opening the circuit breaker.
+
+        Raises:
+            AzureOpenAIUnavailableError: If the circuit is open or retries are exhausted.
+            openai.APIStatusError: For other (client) errors, which are not retried.
+        """
+        import openai
+
+        # Failures that indicate the service (not the request) is in trouble
+        transient_errors = (openai.APIConnectionError, openai.APITimeoutError, openai.InternalServerError)
+        estimated_tokens = sum(count_tokens(m["content"]) for m in messages) + max_tokens
+        attempts = settings.azure_openai_max_retries + 1
+        for attempt in range(attempts):
+            try:
+                self.circuit_breaker.before_call()
+            except CircuitOpenError as e:
+                raise AzureOpenAIUnavailableError(str(e), retry_after=e.retry_after)
+
+            try:
+                await self.rate_limiter.acquire(estimated_tokens)
+                response = await self.client.chat.completions.create(
+                    model=self.deployment_name,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    **kwargs
+                )
+            except (openai.RateLimitError, *transient_errors) as e:
+                if isinstance(e, openai.RateLimitError):
+                    # Throttling says nothing either way about an outage: neither
+                    # trip nor close the circuit, just hand back a half-open trial
+                    self.circuit_breaker.release_trial()
+                else:
+                    self.circuit_breaker.record_failure()
+                retry_after = parse_retry_after(e.response.headers) if isinstance(e, openai.APIStatusError) else None
+                # Retrying before the requested wait would only be throttled again
+                if attempt == attempts - 1 or (retry_after or 0) > settings.azure_openai_retry_max_delay:
+                    raise AzureOpenAIUnavailableError(str(e), retry_after=retry_after)
+                delay = retry_delay(
+                    attempt,
+                    settings.azure_openai_retry_base_delay,
+                    settings.azure_openai_retry_max_delay,
+                    retry_after
+                )
+                logger.warning(f"Azure OpenAI call failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception:
+                # A request-specific error says nothing about service health
+                self.circuit_breaker.record_success()
+                raise
+            except BaseException:
+                # Cancelled (client gone, timeout, shutdown) without an outcome;
+                # a half-open trial must not stay claimed forever
+                self.circuit_breaker.release_trial()
+                raise
+            else:
+                self.circuit_breaker.record_success()
+                if not kwargs.get("stream"):
+                    record_token_usage(response.usage)
+                return response
+
+    async def _complete_json(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """Runs a JSON-mode chat completion and returns the message content."""
+        response = await self._create_completion(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.5,
+            response_format={"type": "json_object"}
+        )
+        return response.choices[0].message.content.strip()
+
     async def create_presentation_content(self, document_text: str, max_tokens: int = 2000) -> str:
         """
         Create presentation content from document text.
-        
+
+        Documents longer than `settings.llm_chunk_tokens` are summarized with
+        map-reduce: each chunk is outlined concurrently, then the outlines are
+        merged into the final presentation in one more call.
+
         Args:
             document_text: The full text from the document.
             max_tokens: Maximum tokens for the generated content.
-            
+
         Returns:
             A JSON string representing the presentation structure.
         """
         try:
-            system_prompt = """Anda adalah asisten ahli yang bertugas membuat konten presentasi dari sebuah dokumen.
-            Berdasarkan teks yang diberikan, buatlah struktur presentasi yang terdiri dari judul dan serangkaian slide.
-            Setiap slide harus memiliki judul dan konten. Konten dapat berupa poin-poin (bullet points) atau paragraf singkat yang ringkas.
-            
-            Format output harus berupa JSON yang valid, seperti contoh ini:
-            {
-              "title": "Judul Presentasi",
-              "slides": [
-                {
-                  "title": "Judul Slide 1",
-                  "content": [
-                    "Ini adalah contoh konten dalam bentuk paragraf singkat, merangkum ide utama dari bagian ini.",
-                    "Paragraf bisa digunakan untuk penjelasan yang lebih naratif."
-                  ]
-                },
-                {
-                  "title": "Judul Slide 2",
-                  "content": [
-                    "Poin penting pertama dalam bentuk bullet point.",
-                    "Poin penting kedua untuk menyoroti detail spesifik."
-                  ]
-                }
-              ]
-            }
-            
-            Pastikan konten tetap ringkas, informatif, dan relevan dengan dokumen sumber. Gunakan Bahasa Indonesia."""
-            
-            user_prompt = f"""Buatkan konten presentasi dari dokumen berikut:
+            user_prompt = await self._build_user_prompt(document_text)
+            return await self._complete_json(PRESENTATION_SYSTEM_PROMPT, user_prompt, max_tokens)
 
-{document_text}"""
-            
-            response = await self.client.chat.completions.create(
-                model=self.deployment_name,
+        except Exception as e:
+            logger.error(f"Error creating presentation content: {str(e)}")
+            if isinstance(e, AzureOpenAIError):
+                raise
+            raise AzureOpenAIError(f"Failed to create presentation content: {str(e)}") from e
+
+    async def stream_presentation_content(
+        self, document_text: str, max_tokens: int = 2000
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Stream presentation content as the model generates it.
+
+        The completion is requested with `stream=True` and parsed incrementally,
+        so slides are yielded as soon as their JSON object is complete.
+
+        Args:
+            document_text: The full text from the document.
+            max_tokens: Maximum tokens for the generated content.
+
+        Yields:
+            `("title", str)` once the presentation title is known, `("slide", dict)`
+            for every completed slide, and finally `("content", str)` with the
+            full JSON string.
+        """
+        try:
+            user_prompt = await self._build_user_prompt(document_text)
+            # Ask for a final chunk with token usage (newer API versions only)
+            extra = {"stream_options": {"include_usage": True}} if settings.azure_openai_stream_usage else {}
+            stream = await self._create_completion(
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": PRESENTATION_SYSTEM_PROMPT},
                     {"role": "user", "content": user_prompt}
                 ],
                 max_tokens=max_tokens,
                 temperature=0.5,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True,
+                **extra
             )
-            
-            return response.choices[0].message.content.strip()
-            
+            parser = SlideStreamParser()
+            async for chunk in stream:
+                record_token_usage(getattr(chunk, "usage", None))
+                # Azure sends chunks without choices (e.g. content filter results)
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                had_title = parser.title is not None
+                slides = parser.feed(chunk.choices[0].delta.content)
+                if not had_title and parser.title is not None:
+                    yield "title", parser.title
+                for slide in slides:
+                    yield "slide", slide
+            yield "content", parser.text.strip()
+
         except Exception as e:
-            logger.error(f"Error creating presentation content: {str(e)}")
-            raise Exception(f"Failed to create presentation content: {str(e)}")
+            logger.error(f"Error streaming presentation content: {str(e)}")
+            if isinstance(e, AzureOpenAIError):
+                raise
+            raise AzureOpenAIError(f"Failed to create presentation content: {str(e)}") from e
+
+    async def _build_user_prompt(self, document_text: str) -> str:
+        """Builds the final user prompt, outlining long documents first."""
+        if count_tokens(document_text) > settings.llm_chunk_tokens:
+            source_text = await self._outline_document(document_text)
+            return f"""Buatkan konten presentasi dari kerangka bagian-bagian dokumen berikut:
+
+{source_text}"""
+        return f"""Buatkan konten presentasi dari dokumen berikut:
+
+{document_text}"""
+
+    async def _outline_document(self, document_text: str) -> str:
+        """
+        Reduces a long document to section outlines that fit in one prompt.
+
+        Chunks are outlined concurrently, limited by `settings.llm_map_concurrency`.
+        If the combined outlines are still too long they are outlined again.
+        """
+        semaphore = asyncio.Semaphore(settings.llm_map_concurrency)
+
+        async def outline_chunk(index: int, chunk: str) -> str:
+            async with semaphore:
+                content = await self._complete_json(
+                    OUTLINE_SYSTEM_PROMPT,
+                    f"Bagian {index + 1} dari dokumen:\n\n{chunk}",
+                    settings.llm_map_max_tokens
+                )
+            try:
+                outline = json.loads(content)
+                points = "\n".join(f"- {point}" for point in outline.get("key_points", []))
+                return f"## {outline.get('section_title', f'Bagian {index + 1}')}\n{points}"
+            except (json.JSONDecodeError, AttributeError):
+                # Keep whatever the model returned rather than losing the section
+                return content
+
+        text = document_text
+        while True:
+            chunks = split_into_chunks(text, settings.llm_chunk_tokens)
+            outlines = await asyncio.gather(*(outline_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+            merged = "\n\n".join(outlines)
+            merged_tokens = count_tokens(merged)
+            # Stop once the outlines fit, or if another pass would not shrink them
+            if len(chunks) == 1 or merged_tokens <= settings.llm_chunk_tokens or merged_tokens >= count_tokens(text):
+                return merged
+            text = merged
 
 # Create service instance
-azure_service = AzureOpenAIService()
\ No newline at end of file
+azure_service = AzureOpenAIService()
@@ -0,0 +1,358 @@
+# app/services/batch_service.py
+import asyncio
+import logging
+import os
+import tempfile
+import uuid
+import zipfile
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.models.document_models import (
+    BatchFileError, BatchItem, BatchStatus, DocumentMetadata, ProcessingStatus
+)
+from app.services.document_service import (
+    document_service, SUPPORTED_EXTENSIONS, UploadTooLargeError, InvalidFileContentError
+)
+from app.services.generation_service import generation_service
+from app.services.registry_service import registry_service
+from app.services.renderers import RENDERERS
+
+logger = logging.getLogger(__name__)
+
+class BatchNotFoundError(Exception):
+    """Raised when a batch ID is unknown or has been dropped from the history."""
+
+def _archive_members(archive: zipfile.ZipFile) -> list[zipfile.ZipInfo]:
+    """Files of an archive, without directories and macOS/hidden metadata files."""
+    members = []
+    for info in archive.infolist():
+        path = PurePosixPath(info.filename)
+        if info.is_dir() or path.name.startswith(".") or "__MACOSX" in path.parts:
+            continue
+        members.append(info)
+    return members
+
+def _is_archive(file_name: Optional[str]) -> bool:
+    return Path(file_name or "").suffix.lower() == ".zip"
+
+def _is_supported(file_name: Optional[str]) -> bool:
+    return Path(file_name or "").suffix.lower() in SUPPORTED_EXTENSIONS
+
+def _is_candidate(info: zipfile.ZipInfo) -> bool:
+    """Whether an archive member will be stored, unless its content is rejected."""
+    return _is_supported(info.filename) and info.file_size <= settings.max_upload_bytes
+
+def _write_archive(archive_path: str, entries: list[tuple[Path, str]]):
+    # Presentations are compressed already; storing them keeps this I/O-bound
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_STORED) as archive:
+        for file_path, name in entries:
+            archive.write(file_path, name)
+
+class BatchService:
+    """
+    Uploads many documents at once and generates their presentations concurrently.
+
+    Each batch runs up to `concurrency` generations at a time, so a large
+    batch takes roughly (documents / concurrency) generation times instead
+    of one per document. The generations share the process-wide slots of
+    `generation_service` with the job workers, so batches cannot push the
+    number of concurrent pipelines (and LLM calls) past that limit.
+    Batches and their status live in this process.
+    """
+
+    def __init__(self, default_concurrency: int, max_concurrency: int, max_files: int, history_size: int):
+        self.default_concurrency = default_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_files = max_files
+        self.history_size = history_size
+        self._batches: "OrderedDict[str, BatchStatus]" = OrderedDict()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def save_files(
+        self,
+        files: list[UploadFile],
+        owner_id: Optional[str] = None,
+    ) -> tuple[list[DocumentMetadata], list[BatchFileError]]:
+        """
+        Stores uploaded documents; .zip files are unpacked and their documents stored.
+
+        Archive members are streamed into storage one at a time, with the same
+        size and content checks as single uploads. Rejected files are reported
+        instead of failing the whole batch. Documents are counted before any
+        is stored, so a batch over the limit is rejected as a whole, and if
+        storing fails part-way (or the request is cancelled), the documents
+        stored so far are removed again.
+
+        Args:
+            files: The uploaded files.
+            owner_id: ID of the uploading user, if known.
+
+        Returns:
+            The stored documents and the rejected files.
+
+        Raises:
+            ValueError: If the batch holds more than `max_files` documents.
+        """
+        documents: list[DocumentMetadata] = []
+        errors: list[BatchFileError] = []
+        archives: dict[int, tuple[zipfile.ZipFile, list[zipfile.ZipInfo]]] = {}
+        try:
+            count = 0
+            for i, file in enumerate(files):
+                if _is_archive(file.filename):
+                    opened = await self._open_archive(file, errors)
+                    if opened is not None:
+                        archives[i] = opened
+                        count += sum(1 for info in opened[1] if _is_candidate(info))
+                elif _is_supported(file.filename):
+                    count += 1
+            if count > self.max_files:
+                raise ValueError(f"A batch can hold at most {self.max_files} documents; this one has {count}.")
+
+            try:
+                for i, file in enumerate(files):
+                    if i in archives:
+                        archive, members = archives[i]
+                        await self._save_archive(file, archive, members, owner_id, documents, errors)
+                    elif not _is_archive(file.filename):
+                        await self._save_file(file, file.filename or "", owner_id, documents, errors)
+            except BaseException:
+                await self._discard(documents)
+                raise
+        finally:
+            for archive, _ in archives.values():
+                archive.close()
+        return documents, errors
+
+    async def _discard(self, documents: list[DocumentMetadata]):
+        """Removes the documents of a batch upload that failed part-way."""
+        if not documents:
+            return
+        logger.warning(f"Batch upload failed after storing {len(documents)} documents; removing them")
+        try:
+            await document_service.delete_uploaded_files([document.document_id for document in documents])
+        except Exception:
+            # The upload's own error is the one to report
+            logger.exception("Failed to remove the documents of a failed batch upload")
+
+    async def _open_archive(
+        self,
+        file: UploadFile,
+        errors: list[BatchFileError],
+    ) -> Optional[tuple[zipfile.ZipFile, list[zipfile.ZipInfo]]]:
+        """Opens an uploaded .zip file and lists its members; rejected archives are reported."""
+        if file.size is not None and file.size > settings.batch_max_archive_bytes:
+            errors.append(BatchFileError(
+                file_name=file.filename,
+                detail=f"Archive exceeds the maximum size of {settings.batch_max_archive_bytes} bytes.",
+            ))
+            return None
+        try:
+            archive = await asyncio.to_thread(zipfile.ZipFile, file.file)
+        except zipfile.BadZipFile:
+            errors.append(BatchFileError(file_name=file.filename, detail="File is not a valid .zip archive."))
+            return None
+        return archive, await asyncio.to_thread(_archive_members, archive)
+
+    async def _save_archive(
+        self,
+        file: UploadFile,
+        archive: zipfile.ZipFile,
+        members: list[zipfile.ZipInfo],
+        owner_id: Optional[str],
+        documents: list[DocumentMetadata],
+        errors: list[BatchFileError],
+    ):
+        for info in members:
+            name = f"{file.filename}/{info.filename}"
+            if not _is_supported(info.filename):
+                errors.append(BatchFileError(file_name=name, detail="Unsupported file format."))
+                continue
+            # Sizes in the archive can be forged; the limit is enforced while copying as well
+            if info.file_size > settings.max_upload_bytes:
+                errors.append(BatchFileError(
+                    file_name=name,
+                    detail=f"File exceeds the maximum upload size of {settings.max_upload_bytes} bytes.",
+                ))
+                continue
+            try:
+                member = archive.open(info)
+            except (RuntimeError, NotImplementedError, zipfile.BadZipFile) as e:
+                # Encrypted members or unsupported compression methods
+                errors.append(BatchFileError(file_name=name, detail=str(e)))
+                continue
+            with member:
+                upload = UploadFile(member, filename=PurePosixPath(info.filename).name)
+                await self._save_file(upload, name, owner_id, documents, errors)
+
+    async def _save_file(
+        self,
+        file: UploadFile,
+        name: str,
+        owner_id: Optional[str],
+        documents: list[DocumentMetadata],
+        errors: list[BatchFileError],
+    ):
+        if not _is_supported(file.filename):
+            errors.append(BatchFileError(file_name=name, detail="Unsupported file format. Please upload PDF, DOCX, TXT or ZIP files."))
+            return
+        try:
+            saved = await document_service.save_uploaded_file(file, owner_id=owner_id)
+        except (UploadTooLargeError, InvalidFileContentError) as e:
+            errors.append(BatchFileError(file_name=name, detail=str(e)))
+            return
+        documents.append(DocumentMetadata(
+            document_id=saved.document_id,
+            file_name=file.filename,
+            size_bytes=saved.size,
+            content_hash=saved.content_hash,
+        ))
+
+    async def create(self, document_ids: list[str], concurrency: Optional[int] = None) -> BatchStatus:
+        """
+        Starts generating presentations for documents in the background.
+
+        Args:
+            document_ids: The documents; duplicates are generated once.
+            concurrency: Documents generated at once; defaults to
+                `default_concurrency` and is capped at `max_concurrency`.
+
+        Returns:
+            The new batch. Documents that do not exist fail individually.
+
+        Raises:
+            ValueError: If there are more than `max_files` documents.
+        """
+        document_ids = list(dict.fromkeys(document_ids))
+        if len(document_ids) > self.max_files:
+            raise ValueError(f"A batch can hold at most {self.max_files} documents.")
+        concurrency = min(concurrency or self.default_concurrency, self.max_concurrency)
+
+        records = await asyncio.gather(*(registry_service.get(document_id) for document_id in document_ids))
+        batch_id = str(uuid.uuid4())
+        batch = BatchStatus(
+            batch_id=batch_id,
+            concurrency=concurrency,
+            total=len(document_ids),
+            download_url=f"/api/v1/batch/{batch_id}/download",
+            items=[
+                BatchItem(document_id=document_id, file_name=record.file_name if record else None)
+                for document_id, record in zip(document_ids, records)
+            ],
+        )
+        self._tasks[batch_id] = asyncio.create_task(self._run(batch), name=f"batch-{batch_id}")
+        self._remember(batch)
+        return batch
+
+    def get(self, batch_id: str) -> Optional[BatchStatus]:
+        """Returns the batch with the given ID, or None if it is unknown."""
+        return self._batches.get(batch_id)
+
+    async def build_archive(self, batch_id: str, format: str = "pptx") -> tuple[str, str]:
+        """
+        Writes the presentations generated so far into a temporary .zip file.
+
+        Entries are named after the uploaded files. The caller deletes the
+        archive once it has been sent.
+
+        Returns:
+            The archive's path and a file name for the download.
+
+        Raises:
+            BatchNotFoundError: If the batch is unknown.
+            ValueError: If no presentation of the batch has been generated yet.
+        """
+        batch = self.get(batch_id)
+        if batch is None:
+            raise BatchNotFoundError("Batch not found.")
+        items = [item for item in batch.items if item.status == ProcessingStatus.COMPLETED]
+        if not items:
+            raise ValueError("No presentation of this batch has been generated yet.")
+
+        paths = await asyncio.gather(*(generation_service.get_rendition(item.document_id, format) for item in items))
+        entries = []
+        used_names: set[str] = set()
+        for item, path in zip(items, paths):
+            stem = Path(item.file_name).stem if item.file_name else item.document_id
+            name = f"{stem}{RENDERERS[format].extension}"
+            counter = 2
+            while name in used_names:
+                name = f"{stem} ({counter}){RENDERERS[format].extension}"
+                counter += 1
+            used_names.add(name)
+            entries.append((path, name))
+
+        handle, archive_path = tempfile.mkstemp(prefix="batch-", suffix=".zip")
+        os.close(handle)
+        try:
+            await asyncio.to_thread(_write_archive, archive_path, entries)
+        except BaseException:
+            os.unlink(archive_path)
+            raise
+        return archive_path, f"presentations-{batch_id}.zip"
+
+    async def stop(self):
+        """Cancels running batches; their unfinished documents are marked as failed."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _remember(self, batch: BatchStatus):
+        self._batches[batch.batch_id] = batch
+        # Drop the oldest finished batches once the history is full
+        while len(self._batches) > self.history_size:
+            for batch_id, old in self._batches.items():
+                if batch_id not in self._tasks:
+                    del self._batches[batch_id]
+                    break
+            else:
+                break
+
+    async def _run(self, batch: BatchStatus):
+        semaphore = asyncio.Semaphore(batch.concurrency)
+
+        async def generate(item: BatchItem):
+            async with semaphore:
+                item.status = ProcessingStatus.PROCESSING
+                batch.status = ProcessingStatus.PROCESSING
+                batch.updated_at = datetime.now()
+                try:
+                    item.result = await generation_service.generate_presentation(item.document_id)
+                except Exception as e:
+                    logger.error(f"Batch {batch.batch_id}: generation for {item.document_id} failed: {str(e)}")
+                    item.status = ProcessingStatus.FAILED
+                    item.error_message = str(e)
+                    batch.failed += 1
+                else:
+                    item.status = ProcessingStatus.COMPLETED
+                    batch.completed += 1
+                batch.updated_at = datetime.now()
+
+        try:
+            await asyncio.gather(*(generate(item) for item in batch.items))
+        except asyncio.CancelledError:
+            for item in batch.items:
+                if item.status in (ProcessingStatus.PENDING, ProcessingStatus.PROCESSING):
+                    item.status = ProcessingStatus.FAILED
+                    item.error_message = "Server shutting down."
+                    batch.failed += 1
+            raise
+        finally:
+            batch.status = ProcessingStatus.FAILED if batch.failed == batch.total else ProcessingStatus.COMPLETED
+            batch.updated_at = datetime.now()
+            del self._tasks[batch.batch_id]
+
+# Create a singleton instance
+batch_service = BatchService(
+    default_concurrency=settings.batch_concurrency,
+    max_concurrency=settings.batch_max_concurrency,
+    max_files=settings.batch_max_files,
+    history_size=settings.batch_history_size,
+)
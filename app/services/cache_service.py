@@ -0,0 +1,150 @@
+# app/services/cache_service.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+import aiofiles.os
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between re-scans of the cache directory, which pick up entries
+# written and removed by other processes
+RESCAN_INTERVAL = 60.0
+
+def _scan(cache_dir: Path) -> "OrderedDict[str, int]":
+    """Lists the entries on disk with their sizes, least recently used first."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(".cache"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, entry.name[:-len(".cache")], stat.st_size))
+    entries.sort()
+    return OrderedDict((key, size) for _, key, size in entries)
+
+class ResultCache:
+    """
+    Disk cache for pipeline results (extracted text, LLM output).
+
+    Entries are stored as one file each under `cache_dir`, named by a hash of
+    their key. The total size is kept under `max_bytes` by evicting the least
+    recently used entries; recency survives restarts through file mtimes.
+
+    Several processes (e.g. uvicorn workers) can share the directory. Each
+    keeps its own index, and re-scans the directory every `RESCAN_INTERVAL`
+    seconds when storing, so entries of the other processes count towards
+    `max_bytes` too; between scans the total can overshoot by what the other
+    processes wrote since.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self._scanned_at = 0.0
+        self._scan_lock = asyncio.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, *parts) -> str:
+        """Builds a stable cache key from a namespace and key parts."""
+        raw = json.dumps([namespace, *parts], separators=(",", ":"), default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.cache"
+
+    async def _load_index(self, rescan: bool = False) -> "OrderedDict[str, int]":
+        """Returns the LRU index, building it from the files on disk (off the event loop) if needed."""
+        if self._index is None or rescan:
+            scanned_at = self._scanned_at
+            async with self._scan_lock:
+                # Another caller may have scanned while this one waited
+                if self._index is None or (rescan and self._scanned_at == scanned_at):
+                    self._index = await asyncio.to_thread(_scan, self.cache_dir)
+                    self._total_bytes = sum(self._index.values())
+                    self._scanned_at = time.monotonic()
+        return self._index
+
+    async def get(self, key: str) -> Optional[str]:
+        """Returns the cached value for `key`, or None on a miss."""
+        index = await self._load_index()
+        if key not in index:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                value = await f.read()
+        except FileNotFoundError:
+            # Removed behind our back; forget it
+            self._total_bytes -= index.pop(key)
+            self.misses += 1
+            return None
+        index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        """Stores `value` under `key`, evicting old entries to stay within budget."""
+        index = await self._load_index()
+        data = value.encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        temp_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(temp_path, "wb") as f:
+            await f.write(data)
+        await aiofiles.os.replace(temp_path, path)
+
+        self._total_bytes += len(data) - index.pop(key, 0)
+        index[key] = len(data)
+        await self._evict()
+
+    async def _evict(self):
+        index = await self._load_index(rescan=time.monotonic() - self._scanned_at > RESCAN_INTERVAL)
+        while self._total_bytes > self.max_bytes and index:
+            key, size = index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                await aiofiles.os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and current usage (as of this process's index)."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._index) if self._index is not None else 0,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+# Create a singleton instance
+result_cache = ResultCache(cache_dir=settings.cache_dir, max_bytes=settings.cache_max_bytes)
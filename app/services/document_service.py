@@ -1,84 +1,414 @@
 # app/services/document_service.py
+import asyncio
+import codecs
+import hashlib
+import mmap
 import os
 import uuid
 from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+import aiofiles
+import aiofiles.os
 from fastapi import UploadFile
-import pypdf
-import docx
 
-# Define storage paths
-UPLOAD_DIR = Path("app/storage/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+from app.config import settings
+from app.services.executor_service import executor_service
+from app.services.registry_service import registry_service
+from app.services.storage_services import storage, storage_key
+from app.services.metrics_service import track_stage
+from app.models.registry_models import DocumentRecord
+from app.utils.access_times import mark_accessed
+from app.utils.tokens import count_tokens
+
+# Define storage paths; created at startup by `ensure_storage_dirs`
+UPLOAD_DIR = settings.uploads_dir
+# Content-addressed copies of uploads; UPLOAD_DIR holds per-document links into it
+OBJECT_DIR = UPLOAD_DIR / "objects"
+
+# Characters read per chunk from TXT files
+TXT_READ_SIZE = 64 * 1024
+
+# Ends the text of each PDF page, so later stages can tell pages apart
+PAGE_BREAK = "\f"
+
+# Part of the cache keys of extracted text; bump when the extractors' output
+# changes (2: PDF pages end with PAGE_BREAK)
+EXTRACTION_VERSION = "2"
+
+# Document formats accepted for upload
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+# Leading bytes expected for each binary format (DOCX is a ZIP container)
+MAGIC_BYTES = {
+    ".pdf": b"%PDF-",
+    ".docx": b"PK\x03\x04",
+}
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+class InvalidFileContentError(ValueError):
+    """Raised when an upload's content does not match its file extension."""
+
+class SavedUpload(NamedTuple):
+    """Result of storing an uploaded file."""
+    document_id: str
+    file_path: Path
+    content_hash: str
+    size: int
+
+def shard_path(root: Path, key: str, file_name: str) -> Path:
+    """
+    Returns where a file keyed by `key` lives under `root`.
+
+    Keys are random (UUIDs) or hashes, so their leading hex digits spread
+    files evenly over `settings.upload_shard_depth` levels of 256
+    subdirectories each, keeping every directory small.
+    """
+    digits = key.replace("-", "")
+    parts = [digits[2 * i:2 * i + 2] for i in range(settings.upload_shard_depth)]
+    return root.joinpath(*parts, file_name)
+
+class _TextBudget:
+    """Collects text chunks until a character or token budget is reached."""
+
+    def __init__(self, max_chars: Optional[int], max_tokens: Optional[int]):
+        self.max_chars = settings.extract_max_chars if max_chars is None else max_chars
+        self.max_tokens = settings.extract_max_tokens if max_tokens is None else max_tokens
+        self.parts: list[str] = []
+        self.chars = 0
+        self.tokens = 0
+
+    def add(self, chunk: str) -> bool:
+        """Adds a chunk, truncated to fit; returns True once the budget is used up."""
+        if self.max_chars and self.chars + len(chunk) >= self.max_chars:
+            self.parts.append(chunk[:self.max_chars - self.chars])
+            self.chars = self.max_chars
+            return True
+        self.parts.append(chunk)
+        self.chars += len(chunk)
+        if self.max_tokens:
+            self.tokens += count_tokens(chunk)
+            if self.tokens >= self.max_tokens:
+                return True
+        return False
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+def count_pdf_pages(file_path: Path) -> int:
+    """Returns the number of pages in a PDF."""
+    import pypdf
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return len(pypdf.PdfReader(data).pages)
+
+def extract_pdf_pages(file_path: Path, start: int, stop: int) -> list[str]:
+    """
+    Extracts the text of pages `start` to `stop - 1` of a PDF.
+    
+    Meant to run in a worker process: each call maps the file read-only and
+    parses it independently, so workers share the page cache but no state.
+    """
+    import pypdf
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        reader = pypdf.PdfReader(data)
+        return [(reader.pages[i].extract_text() or "") + PAGE_BREAK for i in range(start, stop)]
 
 class DocumentService:
     """Service for handling document uploads and text extraction."""
 
-    async def save_uploaded_file(self, file: UploadFile) -> (str, Path):
+    def _check_content(self, extension: str, head: bytes):
+        """Rejects files whose first bytes do not match the declared format."""
+        magic = MAGIC_BYTES.get(extension)
+        if magic is not None:
+            if not head.startswith(magic):
+                raise InvalidFileContentError(f"File content does not match the {extension} format.")
+        elif extension == ".txt":
+            try:
+                # A partial trailing character is fine, invalid UTF-8 is not
+                codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+            except UnicodeDecodeError:
+                raise InvalidFileContentError("Text files must be UTF-8 encoded.")
+            if b"\x00" in head:
+                raise InvalidFileContentError("File content does not look like plain text.")
+
+    async def save_uploaded_file(
+        self,
+        file: UploadFile,
+        max_bytes: Optional[int] = None,
+        owner_id: Optional[str] = None
+    ) -> SavedUpload:
         """
-        Saves an uploaded file and returns its ID and path.
+        Streams an uploaded file to disk and returns its ID, path and content hash.
+        
+        The file is copied in chunks, so memory use does not depend on its size.
+        The content type is checked against the first chunk and the size limit is
+        enforced while copying; nothing is kept on disk if either check fails.
+        Identical content is stored only once under OBJECT_DIR, and the document
+        path is a symlink to that copy. Both live in sharded subdirectories, and
+        the document is recorded in the registry.
         
         Args:
             file: The uploaded file from FastAPI.
+            max_bytes: Maximum accepted size; defaults to `settings.max_upload_bytes`.
+            owner_id: ID of the uploading user, if known.
             
         Returns:
-            A tuple containing the unique document ID and the file path.
+            The unique document ID, the file path, the SHA-256 hex digest of the
+            content and its size in bytes.
+
+        Raises:
+            UploadTooLargeError: If the file is larger than `max_bytes`.
+            InvalidFileContentError: If the content does not match the extension.
         """
+        max_bytes = settings.max_upload_bytes if max_bytes is None else max_bytes
+
         # Generate a unique ID for the document
         document_id = str(uuid.uuid4())
         file_extension = Path(file.filename).suffix
-        file_path = UPLOAD_DIR / f"{document_id}{file_extension}"
+        file_path = shard_path(UPLOAD_DIR, document_id, f"{document_id}{file_extension}")
+        # Write under a hidden name so a partial upload is never picked up
+        temp_path = UPLOAD_DIR / f".{document_id}.part"
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with track_stage("upload_write"):
+                async with aiofiles.open(temp_path, "wb") as buffer:
+                    while chunk := await file.read(settings.upload_chunk_size):
+                        if size == 0:
+                            self._check_content(file_extension.lower(), chunk)
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise UploadTooLargeError(
+                                f"File exceeds the maximum upload size of {max_bytes} bytes."
+                            )
+                        digest.update(chunk)
+                        await buffer.write(chunk)
+            if size == 0:
+                raise InvalidFileContentError("Uploaded file is empty.")
+            content_hash = digest.hexdigest()
+            object_path = shard_path(OBJECT_DIR, content_hash, f"{content_hash}{file_extension.lower()}")
+            if await aiofiles.os.path.exists(object_path):
+                await aiofiles.os.remove(temp_path)
+                # Reused content counts as fresh for the storage janitor
+                mark_accessed(object_path)
+            else:
+                await aiofiles.os.makedirs(object_path.parent, exist_ok=True)
+                await aiofiles.os.replace(temp_path, object_path)
+                try:
+                    with track_stage("save"):
+                        await storage.put_file(storage_key(object_path), object_path)
+                except BaseException:
+                    # Keep local and shared copies in step; the next upload retries
+                    await aiofiles.os.remove(object_path)
+                    raise
+            await aiofiles.os.makedirs(file_path.parent, exist_ok=True)
+            await aiofiles.os.symlink(os.path.relpath(object_path, file_path.parent), file_path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        try:
+            await registry_service.add(DocumentRecord(
+                document_id=document_id,
+                owner_id=owner_id,
+                file_name=file.filename,
+                extension=file_extension.lower(),
+                path=str(file_path.relative_to(UPLOAD_DIR)),
+                size_bytes=size,
+                content_hash=content_hash
+            ))
+        except BaseException:
+            await aiofiles.os.remove(file_path)
+            raise
+            
+        return SavedUpload(document_id, file_path, content_hash, size)
+
+    async def delete_uploaded_files(self, document_ids: list[str]):
+        """
+        Removes stored documents: their links and registry entries.
+
+        The content objects stay, since other documents may share them; the
+        storage janitor removes objects no document links to any more.
+        """
+        for document_id in document_ids:
+            record = await registry_service.get(document_id)
+            if record is None:
+                continue
+            try:
+                await aiofiles.os.remove(UPLOAD_DIR / record.path)
+            except FileNotFoundError:
+                pass
+        await registry_service.delete(document_ids)
+
+    def get_content_hash(self, file_path: Path) -> Optional[str]:
+        """
+        Returns the content hash of a stored upload.
         
-        # Save the file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        Args:
+            file_path: The document path returned by `save_uploaded_file`.
             
-        return document_id, file_path
+        Returns:
+            The SHA-256 hex digest, or None for uploads stored before
+            content addressing was introduced.
+        """
+        if not file_path.is_symlink():
+            return None
+        return Path(os.readlink(file_path)).stem
 
-    def extract_text_from_file(self, file_path: Path) -> str:
+    def iter_text_chunks(self, file_path: Path) -> Iterator[str]:
         """
-        Extracts text content from a file (PDF, DOCX, TXT).
+        Yields the text of a file piece by piece (PDF, DOCX, TXT).
+        
+        PDFs yield one chunk per page (ending with PAGE_BREAK), DOCX files
+        one per paragraph and TXT files fixed-size reads, so callers can stop
+        early without touching the rest of the document.
         
         Args:
             file_path: The path to the file.
             
-        Returns:
-            The extracted text as a single string.
+        Yields:
+            Consecutive pieces of the document text.
             
         Raises:
-            ValueError: If the file format is unsupported.
+            ValueError: If the file format is unsupported or cannot be read.
         """
         extension = file_path.suffix.lower()
-        text = ""
         
+        # pypdf and python-docx are imported on first use, keeping them out of startup
         if extension == ".pdf":
+            import pypdf
+
             try:
                 with open(file_path, "rb") as f:
                     reader = pypdf.PdfReader(f)
                     for page in reader.pages:
-                        text += page.extract_text() or ""
+                        yield (page.extract_text() or "") + PAGE_BREAK
             except Exception as e:
                 raise ValueError(f"Failed to process PDF file: {e}")
                 
         elif extension == ".docx":
+            import docx
+
             try:
                 doc = docx.Document(file_path)
                 for para in doc.paragraphs:
-                    text += para.text + "\n"
+                    yield para.text + "\n"
             except Exception as e:
                 raise ValueError(f"Failed to process DOCX file: {e}")
 
         elif extension == ".txt":
             try:
                 with open(file_path, "r", encoding="utf-8") as f:
-                    text = f.read()
+                    while chunk := f.read(TXT_READ_SIZE):
+                        yield chunk
             except Exception as e:
                 raise ValueError(f"Failed to read TXT file: {e}")
                 
         else:
             raise ValueError(f"Unsupported file format: {extension}")
+
+    def extract_text_from_file(
+        self,
+        file_path: Path,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Extracts text content from a file (PDF, DOCX, TXT).
+        
+        Extraction stops as soon as the character or token budget is reached,
+        so the cost depends on the budget rather than on the document size.
+        
+        Args:
+            file_path: The path to the file.
+            max_chars: Character budget; defaults to `settings.extract_max_chars`.
+            max_tokens: Token budget; defaults to `settings.extract_max_tokens`.
+            
+        Returns:
+            The extracted text as a single string.
             
-        return text
+        Raises:
+            ValueError: If the file format is unsupported.
+        """
+        budget = _TextBudget(max_chars, max_tokens)
+        chunks = self.iter_text_chunks(file_path)
+        try:
+            for chunk in chunks:
+                if budget.add(chunk):
+                    break
+        finally:
+            # Close the file right away when stopping early
+            chunks.close()
+            
+        return budget.text()
+
+    async def extract_text(
+        self,
+        file_path: Path,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Extracts text off the event loop, in parallel for large PDFs.
+        
+        PDFs with at least `settings.pdf_parallel_min_pages` pages are split
+        into ranges of `settings.pdf_pages_per_task` pages that worker
+        processes extract independently; the pages are reassembled in order.
+        Ranges are dispatched one pool-sized wave at a time so extraction still
+        stops once the budget is reached. Other files, small PDFs, and setups
+        without a process pool go through `extract_text_from_file`.
+        
+        Args:
+            file_path: The path to the file.
+            max_chars: Character budget; defaults to `settings.extract_max_chars`.
+            max_tokens: Token budget; defaults to `settings.extract_max_tokens`.
+            
+        Returns:
+            The extracted text as a single string.
+            
+        Raises:
+            ValueError: If the file format is unsupported or cannot be read.
+        """
+        if (
+            file_path.suffix.lower() != ".pdf"
+            or not settings.pdf_parallel_min_pages
+            or not executor_service.uses_processes
+        ):
+            return await executor_service.run(self.extract_text_from_file, file_path, max_chars, max_tokens)
+
+        try:
+            page_count = await executor_service.run(count_pdf_pages, file_path)
+        except Exception as e:
+            raise ValueError(f"Failed to process PDF file: {e}")
+        if page_count < settings.pdf_parallel_min_pages:
+            return await executor_service.run(self.extract_text_from_file, file_path, max_chars, max_tokens)
+
+        step = settings.pdf_pages_per_task
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        wave_size = executor_service.pool_size
+
+        budget = _TextBudget(max_chars, max_tokens)
+        for wave_start in range(0, len(ranges), wave_size):
+            wave = ranges[wave_start:wave_start + wave_size]
+            try:
+                results = await asyncio.gather(*(
+                    executor_service.run(extract_pdf_pages, file_path, start, stop)
+                    for start, stop in wave
+                ))
+            except Exception as e:
+                raise ValueError(f"Failed to process PDF file: {e}")
+            for pages in results:
+                for page_text in pages:
+                    if budget.add(page_text):
+                        return budget.text()
+        return budget.text()
 
 # Create a singleton instance
 document_service = DocumentService()
@@ -0,0 +1,96 @@
+# app/services/executor_service.py
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _warm_up():
+    """Imports the heavy document libraries once per worker process."""
+    import pypdf  # noqa: F401
+    import docx  # noqa: F401
+    import pptx  # noqa: F401
+
+class ExecutorService:
+    """
+    Runs CPU-bound work (text extraction, PPTX rendering) off the event loop.
+
+    Work goes to a process pool of `pool_size` workers so it does not hold the
+    GIL of the serving process. With `pool_size` set to 0, or when a process
+    pool cannot be created or breaks, a thread pool is used instead.
+    """
+
+    def __init__(self, pool_size: int, thread_pool_size: Optional[int] = None):
+        self.pool_size = pool_size
+        self.thread_pool_size = thread_pool_size
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool_failed = False
+
+    @property
+    def uses_processes(self) -> bool:
+        """Whether work is currently dispatched to worker processes."""
+        return self.pool_size > 0 and not self._process_pool_failed
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_pool_size,
+                thread_name_prefix="cpu-worker"
+            )
+        return self._thread_pool
+
+    def _get_executor(self) -> Executor:
+        if not self.uses_processes:
+            return self._get_thread_pool()
+        if self._process_pool is None:
+            try:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up
+                )
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"Process pool unavailable, falling back to threads: {str(e)}")
+                self._process_pool_failed = True
+                return self._get_thread_pool()
+        return self._process_pool
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs `func(*args, **kwargs)` in the pool and awaits its result.
+
+        The callable and its arguments must be picklable when a process pool
+        is in use (module-level functions or methods of module-level singletons).
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed by the OOM killer); stop using processes.
+            logger.error(f"Process pool broke, falling back to threads: {str(e)}")
+            self._process_pool_failed = True
+            pool, self._process_pool = self._process_pool, None
+            if pool is not None:
+                # Stops its management thread and any workers still alive
+                pool.shutdown(wait=False, cancel_futures=True)
+            return await loop.run_in_executor(self._get_thread_pool(), call)
+
+    def shutdown(self):
+        """Shuts down the pools, cancelling work that has not started."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+
+# Create a singleton instance
+executor_service = ExecutorService(pool_size=settings.cpu_pool_size)
@@ -0,0 +1,436 @@
+# app/services/generation_service.py
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, NamedTuple, Optional
+
+import aiofiles
+import aiofiles.os
+
+from app.config import settings
+from app.services.document_service import document_service, shard_path, EXTRACTION_VERSION, UPLOAD_DIR, OBJECT_DIR
+from app.services.presentation_service import presentation_service
+from app.services.renderers import RENDERERS
+from app.services.storage_services import storage, storage_key, ObjectNotFoundError
+from app.services.azure_service import azure_service, PROMPT_VERSION
+from app.services.cache_service import result_cache
+from app.services.executor_service import executor_service
+from app.services.registry_service import registry_service
+from app.services.preprocessing_service import preprocessing_service, PREPROCESSING_VERSION
+from app.services.metrics_service import GENERATIONS_IN_PROGRESS, record_prompt_reduction, track_stage
+from app.models.document_models import PresentationResponse, ProcessingStatus, PromptStats
+from app.utils.access_times import mark_accessed
+from app.utils.atomic_files import write_bytes_atomic
+from app.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Extensions of uploads stored flat in UPLOAD_DIR before the registry existed
+LEGACY_EXTENSIONS = (".pdf", ".docx", ".txt")
+
+class DocumentNotFoundError(Exception):
+    """Raised when no uploaded file exists for a document ID."""
+
+class StoredDocument(NamedTuple):
+    """Location and content hash of an uploaded document."""
+    file_path: Path
+    content_hash: Optional[str]
+
+class GenerationService:
+    """
+    Service that runs the document-to-presentation pipeline.
+
+    Concurrent requests for the same work share one run: generation per
+    document (and generation settings), extraction and LLM calls per
+    document content, and lazy renders per rendition. At most
+    `concurrency` pipelines run at once, however they were started (job
+    workers, batches, direct requests); the rest wait for a slot.
+    """
+
+    def __init__(self, concurrency: int):
+        self._flights = SingleFlight()
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def generate_presentation(
+        self,
+        document_id: str,
+        on_stage: Optional[Callable[[str], None]] = None,
+    ) -> PresentationResponse:
+        """
+        Generates a presentation from an uploaded document.
+
+        Joins the run already in progress for the same document, if any.
+
+        Args:
+            document_id: The ID of the uploaded document.
+            on_stage: Optional callback invoked with the name of each pipeline stage
+                ("extracting", "generating", "rendering") as it starts.
+
+        Returns:
+            The response describing the generated presentation.
+
+        Raises:
+            DocumentNotFoundError: If the document does not exist.
+            ValueError: If the document or the generated content is unusable.
+        """
+        file_path, content_hash = await self.find_document(document_id)
+        return await self._flights.run(
+            ("presentation", document_id, self._content_key(content_hash)),
+            lambda report: self._run_pipeline(document_id, file_path, content_hash, report),
+            on_stage,
+        )
+
+    async def _run_pipeline(
+        self,
+        document_id: str,
+        file_path: Path,
+        content_hash: Optional[str],
+        report: Callable[[str], None],
+    ) -> PresentationResponse:
+        """Generates the presentation, recording the document's status in the registry."""
+        async with self._slots:
+            await registry_service.set_status(document_id, ProcessingStatus.PROCESSING)
+            try:
+                with GENERATIONS_IN_PROGRESS.track_inprogress():
+                    response = await self._generate(document_id, file_path, content_hash, report)
+            except Exception as e:
+                await registry_service.set_status(document_id, ProcessingStatus.FAILED, str(e))
+                raise
+            await registry_service.set_status(document_id, ProcessingStatus.COMPLETED)
+            return response
+
+    async def _generate(
+        self,
+        document_id: str,
+        file_path: Path,
+        content_hash: Optional[str],
+        report: Callable[[str], None],
+    ) -> PresentationResponse:
+        """Runs extraction, content generation and rendering for a located document."""
+        # Identical documents reuse earlier results and skip extraction and the LLM
+        content_key = self._content_key(content_hash)
+        presentation_content = await result_cache.get(content_key) if content_key else None
+        prompt_stats = None
+
+        if presentation_content is None:
+            if content_key:
+                # Other documents with the same content share the LLM call
+                presentation_content, prompt_stats = await self._flights.run(
+                    ("content", content_key),
+                    lambda shared_report: self._create_content(file_path, content_hash, content_key, shared_report),
+                    report,
+                )
+            else:
+                presentation_content, prompt_stats = await self._create_content(file_path, content_hash, None, report)
+
+        # 3. Create presentation
+        report("rendering")
+        return await self._render(document_id, presentation_content, prompt_stats)
+
+    async def _create_content(
+        self,
+        file_path: Path,
+        content_hash: Optional[str],
+        content_key: Optional[str],
+        report: Callable[[str], None],
+    ) -> tuple[str, Optional[PromptStats]]:
+        """Extracts a document's text and has the LLM turn it into presentation content."""
+        # 1. Extract text
+        report("extracting")
+        text = await self._extract_text(file_path, content_hash)
+        text, prompt_stats = await self._prepare_text(text)
+
+        # 2. Generate presentation content
+        report("generating")
+        with track_stage("llm"):
+            presentation_content = await azure_service.create_presentation_content(
+                document_text=text,
+                max_tokens=settings.azure_openai_max_tokens
+            )
+        if not presentation_content.strip():
+            raise RuntimeError("Failed to generate presentation content.")
+        if content_key:
+            await result_cache.set(content_key, presentation_content)
+        return presentation_content, prompt_stats
+
+    async def stream_presentation(
+        self,
+        document_id: str,
+        build_pptx: bool = True,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Generates a presentation while streaming slides as they are produced.
+
+        Args:
+            document_id: The ID of the uploaded document.
+            build_pptx: Whether to store the presentation (HTML preview now, other
+                formats on download) once all slides are known.
+
+        Yields:
+            `("title", str)`, then `("slide", dict)` per slide, and finally
+            `("done", PresentationResponse)` when the presentation was stored or
+            `("done", None)` otherwise.
+
+        Raises:
+            DocumentNotFoundError: If the document does not exist.
+            ValueError: If the document or the generated content is unusable.
+        """
+        file_path, content_hash = await self.find_document(document_id)
+        content_key = self._content_key(content_hash)
+        presentation_content = await result_cache.get(content_key) if content_key else None
+        prompt_stats = None
+
+        if presentation_content is not None:
+            # Cached: replay the stored slides straight away
+            content = json.loads(presentation_content)
+            yield "title", content.get("title", "Presentation")
+            for slide in content.get("slides", []):
+                yield "slide", slide
+        else:
+            text = await self._extract_text(file_path, content_hash)
+            text, prompt_stats = await self._prepare_text(text)
+            # Includes time the client takes to consume the slides
+            with track_stage("llm"):
+                async for event, data in azure_service.stream_presentation_content(
+                    document_text=text,
+                    max_tokens=settings.azure_openai_max_tokens
+                ):
+                    if event == "content":
+                        presentation_content = data
+                    else:
+                        yield event, data
+            if not presentation_content:
+                raise RuntimeError("Failed to generate presentation content.")
+            if content_key:
+                await result_cache.set(content_key, presentation_content)
+
+        if build_pptx:
+            yield "done", await self._render(document_id, presentation_content, prompt_stats)
+        else:
+            yield "done", None
+
+    async def find_document(self, document_id: str) -> StoredDocument:
+        """
+        Returns the path and content hash of an uploaded document.
+
+        Uploads received by another worker are fetched from the shared storage
+        into the local object directory first.
+
+        Raises:
+            DocumentNotFoundError: If the document does not exist.
+        """
+        record = await registry_service.get(document_id)
+        if record is not None:
+            file_path = UPLOAD_DIR / record.path
+            if await aiofiles.os.path.exists(file_path) or not record.content_hash:
+                mark_accessed(file_path)
+                return StoredDocument(file_path, record.content_hash)
+            object_path = shard_path(OBJECT_DIR, record.content_hash, f"{record.content_hash}{record.extension}")
+            if not await aiofiles.os.path.exists(object_path):
+                try:
+                    await storage.get_file(storage_key(object_path), object_path)
+                except ObjectNotFoundError:
+                    raise DocumentNotFoundError("Document not found.")
+            return StoredDocument(object_path, record.content_hash)
+
+        # Older uploads are not registered and sit directly in the upload directory
+        for extension in LEGACY_EXTENSIONS:
+            file_path = UPLOAD_DIR / f"{document_id}{extension}"
+            if file_path.exists():
+                mark_accessed(file_path)
+                return StoredDocument(file_path, document_service.get_content_hash(file_path))
+        raise DocumentNotFoundError("Document not found.")
+
+    def _content_key(self, content_hash: Optional[str]) -> Optional[str]:
+        """Cache key of the LLM output for a document's content, if it is known."""
+        if not content_hash:
+            return None
+        return result_cache.make_key(
+            "presentation-content",
+            content_hash,
+            EXTRACTION_VERSION,
+            PROMPT_VERSION,
+            azure_service.deployment_name,
+            settings.azure_openai_max_tokens,
+            PREPROCESSING_VERSION if settings.prompt_preprocessing else None,
+            settings.prompt_max_tokens,
+            settings.prompt_boilerplate_min_share,
+        )
+
+    async def _render(
+        self,
+        document_id: str,
+        presentation_content: str,
+        prompt_stats: Optional[PromptStats] = None,
+    ) -> PresentationResponse:
+        """
+        Stores the generated content with its HTML preview and returns the response describing it.
+
+        The .pptx and PDF are rendered when first downloaded. The JSON and the
+        preview are published to the shared storage, and renditions of earlier
+        content are removed from it.
+        """
+        with track_stage("render"):
+            html_path = await executor_service.run(
+                presentation_service.store_content,
+                document_id,
+                presentation_content
+            )
+        with track_stage("save"):
+            # The JSON goes last: a worker that sees the new JSON also sees its
+            # preview and none of the renditions of earlier content
+            for format in RENDERERS:
+                if format != "html":
+                    await storage.delete(storage_key(presentation_service.rendition_path(document_id, format)))
+            await storage.put_file(storage_key(html_path), html_path)
+            content_path = presentation_service.content_path(document_id)
+            await storage.put_file(storage_key(content_path), content_path)
+            if storage.shared:
+                info = await storage.stat(storage_key(content_path))
+                await self._write_version(document_id, info.etag if info else None)
+
+        # Create response with download URL
+        download_url = f"/api/v1/document/download/presentation/{document_id}"
+        return PresentationResponse(
+            document_id=document_id,
+            file_name=presentation_service.rendition_path(document_id, "pptx").name,
+            download_url=download_url,
+            preview_url=f"{download_url}?format=html",
+            prompt_stats=prompt_stats
+        )
+
+    async def get_rendition(self, document_id: str, format: str) -> Path:
+        """
+        Returns a local copy of a presentation in `format`.
+
+        Local files are used if they are current; otherwise the rendition is
+        fetched from the shared storage, or rendered from the stored JSON and
+        published so other workers can reuse it. Concurrent requests for a
+        rendition share one check, fetch or render.
+
+        With shared storage another worker may have regenerated the
+        presentation, so local files are first checked against the published
+        JSON (see `_drop_stale_copies`).
+
+        Raises:
+            FileNotFoundError: If the presentation has not been generated.
+        """
+        file_path = presentation_service.rendition_path(document_id, format)
+        if not storage.shared and await aiofiles.os.path.exists(file_path):
+            mark_accessed(file_path)
+            return file_path
+        return await self._flights.run(
+            ("rendition", document_id, format),
+            lambda report: self._fetch_or_render(document_id, format),
+        )
+
+    async def _fetch_or_render(self, document_id: str, format: str) -> Path:
+        file_path = presentation_service.rendition_path(document_id, format)
+        if storage.shared:
+            await self._drop_stale_copies(document_id)
+            if await aiofiles.os.path.exists(file_path):
+                mark_accessed(file_path)
+                return file_path
+        try:
+            return await storage.get_file(storage_key(file_path), file_path)
+        except ObjectNotFoundError:
+            pass
+
+        content_path = presentation_service.content_path(document_id)
+        if not await aiofiles.os.path.exists(content_path):
+            await storage.get_file(storage_key(content_path), content_path)
+        with track_stage("render"):
+            file_path = await executor_service.run(presentation_service.render, document_id, format)
+        with track_stage("save"):
+            await storage.put_file(storage_key(file_path), file_path)
+        return file_path
+
+    async def _drop_stale_copies(self, document_id: str):
+        """
+        Removes the local JSON and renditions of a presentation if the shared JSON has changed.
+
+        Local files are tagged with the ETag of the shared JSON they derive
+        from (see `PresentationService.version_path`). Without a matching
+        ETag they are dropped, to be fetched or rendered again.
+
+        Raises:
+            ObjectNotFoundError: If no presentation has been published.
+        """
+        content_path = presentation_service.content_path(document_id)
+        info = await storage.stat(storage_key(content_path))
+        if info is None:
+            raise ObjectNotFoundError(storage_key(content_path))
+        try:
+            async with aiofiles.open(presentation_service.version_path(document_id), "r") as f:
+                version = await f.read()
+        except FileNotFoundError:
+            version = None
+        if info.etag is not None and version == info.etag:
+            return
+
+        for path in [content_path, *(presentation_service.rendition_path(document_id, format) for format in RENDERERS)]:
+            try:
+                await aiofiles.os.remove(path)
+            except FileNotFoundError:
+                pass
+        await self._write_version(document_id, info.etag)
+
+    async def _write_version(self, document_id: str, etag: Optional[str]):
+        """Notes the ETag of the shared JSON that the local files derive from."""
+        version_path = presentation_service.version_path(document_id)
+        if etag is None:
+            # Without ETags local copies cannot be validated and are always refreshed
+            try:
+                await aiofiles.os.remove(version_path)
+            except FileNotFoundError:
+                pass
+            return
+        await asyncio.to_thread(write_bytes_atomic, version_path, etag.encode("utf-8"))
+
+    async def _extract_text(self, file_path: Path, content_hash: Optional[str]) -> str:
+        """Extracts text from a document, reusing cached text for known content."""
+        text_key = None
+        text = None
+        if content_hash:
+            text_key = result_cache.make_key(
+                "text",
+                content_hash,
+                EXTRACTION_VERSION,
+                settings.extract_max_chars,
+                settings.extract_max_tokens,
+            )
+            text = await result_cache.get(text_key)
+
+        if text is None:
+            with track_stage("extract"):
+                text = await document_service.extract_text(file_path)
+            if text_key:
+                await result_cache.set(text_key, text)
+
+        if not text.strip():
+            raise ValueError("Extracted text is empty.")
+        return text
+
+    async def _prepare_text(self, text: str) -> tuple[str, Optional[PromptStats]]:
+        """Reduces extracted text to what is worth sending to the LLM (see `PreprocessingService`)."""
+        if not settings.prompt_preprocessing:
+            return text, None
+        with track_stage("preprocess"):
+            prepared = await executor_service.run(preprocessing_service.prepare, text)
+        record_prompt_reduction(prepared.original_tokens, prepared.tokens)
+        reduction = 1 - prepared.tokens / prepared.original_tokens if prepared.original_tokens else 0.0
+        logger.info(
+            f"Prompt text reduced from {prepared.original_tokens} to {prepared.tokens} tokens "
+            f"({reduction:.0%}; {prepared.boilerplate_lines} boilerplate lines, sampled: {prepared.sampled})"
+        )
+        return prepared.text, PromptStats(
+            original_tokens=prepared.original_tokens,
+            prompt_tokens=prepared.tokens,
+            reduction=round(reduction, 4),
+            boilerplate_lines=prepared.boilerplate_lines,
+            sampled=prepared.sampled,
+        )
+
+# Create a singleton instance
+generation_service = GenerationService(concurrency=settings.generation_concurrency)
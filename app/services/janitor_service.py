@@ -0,0 +1,325 @@
+# app/services/janitor_service.py
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from app.config import settings
+from app.services.document_service import UPLOAD_DIR
+from app.services.presentation_service import PRESENTATION_DIR
+from app.services.registry_service import registry_service
+from app.services.storage_services import storage
+
+logger = logging.getLogger(__name__)
+
+# Hidden temporary files (partial uploads, downloads) older than this were left by a crash
+STALE_TEMP_AGE = 3600.0
+
+class StoredGroup(NamedTuple):
+    """Files that are kept or deleted together, e.g. a presentation and its renditions."""
+    area: str
+    # Plain strings and tuples: a scan holds one group per file, and these
+    # are not tracked by the garbage collector, whose full passes would
+    # otherwise stall the event loop
+    paths: tuple[str, ...]
+    size: int
+    last_access: float
+    # Registry entries that go away with the files
+    document_ids: tuple[str, ...]
+
+class _UploadScan(NamedTuple):
+    """What one directory of the upload tree contains."""
+    # object path -> (size, last access)
+    objects: dict[str, tuple[int, float]]
+    # object path -> links pointing at it
+    links: dict[str, list[str]]
+    legacy: list[StoredGroup]
+    stale: list[str]
+
+def _is_stale_temp(entry: os.DirEntry, now: float) -> bool:
+    return entry.name.startswith(".") and now - entry.stat(follow_symlinks=False).st_mtime > STALE_TEMP_AGE
+
+def _scan_upload_dir(path: str, now: float) -> tuple[_UploadScan, list[str]]:
+    """Scans one directory of the upload tree; returns what it holds and its subdirectories."""
+    scan = _UploadScan({}, defaultdict(list), [], [])
+    subdirectories = []
+    # Regular files at the top level are uploads stored before content addressing
+    top_level = path == str(UPLOAD_DIR)
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.name.startswith("."):
+                if _is_stale_temp(entry, now):
+                    scan.stale.append(entry.path)
+            elif entry.is_symlink():
+                target = os.path.normpath(os.path.join(path, os.readlink(entry.path)))
+                scan.links[target].append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                if top_level:
+                    scan.legacy.append(StoredGroup("uploads", (entry.path,), stat.st_size, stat.st_atime, (Path(entry.name).stem,)))
+                else:
+                    scan.objects[os.path.normpath(entry.path)] = (stat.st_size, stat.st_atime)
+    return scan, subdirectories
+
+def _scan_presentations(root: Path, now: float) -> tuple[list[StoredGroup], list[str]]:
+    """Groups presentation files (JSON and renditions) by document ID."""
+    files: dict[str, list[str]] = defaultdict(list)
+    sizes: dict[str, int] = defaultdict(int)
+    accessed: dict[str, float] = defaultdict(float)
+    stale = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if entry.name.startswith("."):
+                if _is_stale_temp(entry, now):
+                    stale.append(entry.path)
+                continue
+            stat = entry.stat()
+            document_id = entry.name.split(".", 1)[0]
+            files[document_id].append(entry.path)
+            sizes[document_id] += stat.st_size
+            accessed[document_id] = max(accessed[document_id], stat.st_atime)
+    groups = [
+        StoredGroup("presentations", tuple(paths), sizes[document_id], accessed[document_id], ())
+        for document_id, paths in files.items()
+    ]
+    return groups, stale
+
+def _group_uploads(objects: dict[str, tuple[int, float]], links: dict[str, list[str]]) -> tuple[list[StoredGroup], list[str]]:
+    """Groups each object with the links pointing at it; also returns links to missing objects."""
+    groups = []
+    for object_path, (size, last_access) in objects.items():
+        object_links = links.get(object_path, [])
+        groups.append(StoredGroup(
+            "uploads",
+            # Links first, so a document never points at a missing object
+            (*object_links, object_path),
+            size,
+            last_access,
+            tuple(os.path.basename(link).split(".", 1)[0] for link in object_links),
+        ))
+    dangling = [link for target, paths in links.items() if target not in objects for link in paths]
+    return groups, dangling
+
+def _usage_by_area(groups: list[StoredGroup]) -> dict[str, int]:
+    usage = {"uploads": 0, "presentations": 0}
+    for group in groups:
+        usage[group.area] += group.size
+    return usage
+
+def _last_access(paths: tuple[str, ...]) -> float:
+    latest = 0.0
+    for path in paths:
+        try:
+            latest = max(latest, os.stat(path).st_atime)
+        except OSError:
+            pass
+    return latest
+
+def _delete_groups(groups: list[StoredGroup]) -> tuple[list[StoredGroup], int]:
+    """Deletes groups not used since they were scanned; returns those deleted and the file count."""
+    deleted, files = [], 0
+    for group in groups:
+        if _last_access(group.paths) > group.last_access:
+            continue
+        for path in group.paths:
+            try:
+                os.unlink(path)
+                files += 1
+            except FileNotFoundError:
+                pass
+        deleted.append(group)
+    return deleted, files
+
+def _delete_orphans(paths: list[str]) -> tuple[int, int]:
+    """Deletes stale temporary files and dangling links; returns the file and byte counts."""
+    files = size = 0
+    for path in paths:
+        try:
+            is_link = os.path.islink(path)
+            # A dangling link may have been repaired by a new upload of the same content
+            if is_link and os.path.exists(path):
+                continue
+            size += 0 if is_link else os.lstat(path).st_size
+            os.unlink(path)
+            files += 1
+        except FileNotFoundError:
+            pass
+    return files, size
+
+class JanitorService:
+    """
+    Background task that bounds the disk used by uploads and presentations.
+
+    Each pass scans both directories and groups files that belong together:
+    an upload's content-addressed object with the links of every document
+    sharing it, and a presentation's JSON with its renditions. Groups not
+    accessed within their area's TTL are deleted; if the rest still exceeds
+    the quota, the least recently accessed groups go next. Access times are
+    set explicitly on use (see `mark_accessed`).
+
+    Passes are incremental: directories are scanned and files deleted in
+    small steps on worker threads, so request handling never waits on them.
+    With the local storage backend, deleted uploads are also removed from the
+    registry. With shared (S3) storage, local files are only a cache and the
+    shared objects stay; expire those with bucket lifecycle rules.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        upload_ttl: float,
+        presentation_ttl: float,
+        quota_bytes: int,
+        min_idle: float,
+        batch_size: int,
+    ):
+        self.interval = interval
+        self.ttls = {"uploads": upload_ttl, "presentations": presentation_ttl}
+        self.quota_bytes = quota_bytes
+        self.min_idle = min_idle
+        self.batch_size = batch_size
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration = 0.0
+        self.usage_bytes = {"uploads": 0, "presentations": 0}
+        self.bytes_reclaimed = {"uploads": 0, "presentations": 0}
+        self.files_deleted = 0
+        # Deleted groups by reason: "ttl", "quota"; stale temporary files and dangling links: "orphan"
+        self.evictions = {"ttl": 0, "quota": 0, "orphan": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Starts the periodic passes, unless disabled."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="storage-janitor")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Storage janitor pass failed")
+            await asyncio.sleep(self.interval)
+
+    async def _scan_uploads(self, now: float) -> tuple[list[StoredGroup], list[str]]:
+        objects: dict[str, tuple[int, float]] = {}
+        links: dict[str, list[str]] = defaultdict(list)
+        groups: list[StoredGroup] = []
+        orphans: list[str] = []
+        # One directory per step; with sharding each holds a small slice of the uploads
+        pending = [str(UPLOAD_DIR)]
+        while pending:
+            scan, subdirectories = await asyncio.to_thread(_scan_upload_dir, pending.pop(), now)
+            pending.extend(subdirectories)
+            objects.update(scan.objects)
+            for target, paths in scan.links.items():
+                links[target].extend(paths)
+            groups.extend(scan.legacy)
+            orphans.extend(scan.stale)
+
+        object_groups, dangling = await asyncio.to_thread(_group_uploads, objects, links)
+        return groups + object_groups, orphans + dangling
+
+    def _select(self, groups: list[StoredGroup], now: float) -> tuple[list[StoredGroup], list[StoredGroup]]:
+        """Splits off the groups to delete: (expired, evicted for the quota)."""
+        expired, kept = [], []
+        for group in groups:
+            ttl = self.ttls[group.area]
+            (expired if ttl and now - group.last_access > ttl else kept).append(group)
+
+        evicted = []
+        total = sum(group.size for group in kept)
+        if self.quota_bytes and total > self.quota_bytes:
+            for group in sorted(kept, key=lambda g: g.last_access):
+                if total <= self.quota_bytes:
+                    break
+                if now - group.last_access < self.min_idle:
+                    logger.warning(
+                        f"Storage over quota ({total} of {self.quota_bytes} bytes), "
+                        f"but everything left was used in the last {self.min_idle:.0f}s"
+                    )
+                    break
+                evicted.append(group)
+                total -= group.size
+        return expired, evicted
+
+    async def _delete(self, groups: list[StoredGroup], reason: str):
+        for start in range(0, len(groups), self.batch_size):
+            deleted, files = await asyncio.to_thread(_delete_groups, groups[start:start + self.batch_size])
+            self.files_deleted += files
+            self.evictions[reason] += len(deleted)
+            for group in deleted:
+                self.bytes_reclaimed[group.area] += group.size
+                self.usage_bytes[group.area] -= group.size
+            if not storage.shared:
+                await registry_service.delete([document_id for group in deleted for document_id in group.document_ids])
+
+    async def run_once(self):
+        """Runs one pass: scan, then delete expired, over-quota and orphaned files."""
+        started = time.monotonic()
+        now = time.time()
+        upload_groups, upload_orphans = await self._scan_uploads(now)
+        presentation_groups, presentation_orphans = await asyncio.to_thread(_scan_presentations, PRESENTATION_DIR, now)
+        groups = upload_groups + presentation_groups
+        # Work proportional to the number of files runs off the event loop
+        self.usage_bytes = await asyncio.to_thread(_usage_by_area, groups)
+
+        reclaimed_before = sum(self.bytes_reclaimed.values())
+        expired, evicted = await asyncio.to_thread(self._select, groups, now)
+        await self._delete(expired, "ttl")
+        await self._delete(evicted, "quota")
+        for area, orphans in (("uploads", upload_orphans), ("presentations", presentation_orphans)):
+            for start in range(0, len(orphans), self.batch_size):
+                files, size = await asyncio.to_thread(_delete_orphans, orphans[start:start + self.batch_size])
+                self.files_deleted += files
+                self.evictions["orphan"] += files
+                self.bytes_reclaimed[area] += size
+
+        self.runs += 1
+        self.last_run_at = datetime.now()
+        self.last_duration = time.monotonic() - started
+        reclaimed = sum(self.bytes_reclaimed.values()) - reclaimed_before
+        orphans = len(upload_orphans) + len(presentation_orphans)
+        if reclaimed or orphans:
+            logger.info(
+                f"Storage janitor reclaimed {reclaimed} bytes "
+                f"({len(expired)} expired, {len(evicted)} over quota, {orphans} orphaned files) "
+                f"in {self.last_duration:.2f}s"
+            )
+
+    def stats(self) -> dict:
+        """Returns reclaimed bytes, deletion counters and current usage."""
+        return {
+            "runs": self.runs,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_seconds": self.last_duration,
+            "usage_bytes": dict(self.usage_bytes),
+            "quota_bytes": self.quota_bytes,
+            "bytes_reclaimed": dict(self.bytes_reclaimed),
+            "files_deleted": self.files_deleted,
+            "evictions": dict(self.evictions),
+        }
+
+# Create a singleton instance
+janitor_service = JanitorService(
+    interval=settings.janitor_interval,
+    upload_ttl=settings.upload_ttl,
+    presentation_ttl=settings.presentation_ttl,
+    quota_bytes=settings.storage_quota_bytes,
+    min_idle=settings.janitor_min_idle,
+    batch_size=settings.janitor_batch_size,
+)
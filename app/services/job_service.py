@@ -0,0 +1,496 @@
+# app/services/job_service.py
+import asyncio
+import logging
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Optional
+
+from app.config import settings
+from app.models.document_models import GenerationJob, ProcessingStatus
+from app.services.generation_service import generation_service, DocumentNotFoundError
+from app.utils.resilience import retry_delay
+
+logger = logging.getLogger(__name__)
+
+# Failures that another attempt cannot fix
+PERMANENT_ERRORS = (DocumentNotFoundError, ValueError)
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue has no room for another job."""
+
+class JobService(ABC):
+    """
+    Queue of presentation generation jobs, consumed by a pool of workers.
+
+    A fixed number of workers take jobs from a bounded queue, so at most
+    `workers` pipelines (and therefore LLM calls) run at once per process.
+    When the queue is full, new submissions are rejected instead of piling up.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+
+    @abstractmethod
+    async def start(self):
+        """Starts the worker pool if it is not already running."""
+
+    @abstractmethod
+    async def stop(self):
+        """Stops the workers."""
+
+    @abstractmethod
+    async def submit(self, document_id: str) -> GenerationJob:
+        """
+        Queues a generation job for a document.
+
+        Args:
+            document_id: The ID of the uploaded document.
+
+        Returns:
+            The newly created job.
+
+        Raises:
+            JobQueueFullError: If the queue is at capacity.
+        """
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[GenerationJob]:
+        """Returns the job with the given ID, or None if it is unknown."""
+
+    @property
+    @abstractmethod
+    def queued(self) -> int:
+        """Number of jobs waiting for a worker."""
+
+    async def aclose(self):
+        """Releases connections held by the queue."""
+        pass
+
+    async def _execute(self, job: GenerationJob, on_stage: Callable[[str], None]):
+        """Runs a job's pipeline; returns the presentation."""
+        return await generation_service.generate_presentation(job.document_id, on_stage=on_stage)
+
+class LocalJobService(JobService):
+    """
+    In-process job queue; jobs and their status are lost on restart and only
+    visible to the process that queued them.
+    """
+
+    def __init__(self, workers: int, queue_size: int, history_size: int):
+        # Jobs would be accepted but never run; only a shared queue can have
+        # API-only replicas
+        if workers < 1:
+            raise ValueError("The local job backend needs JOB_WORKERS of at least 1; use JOB_BACKEND=redis for API-only replicas.")
+        super().__init__(workers, queue_size)
+        self.history_size = history_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"generation-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Cancels the workers. Jobs still in the queue are marked as failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue and not self._queue.empty():
+            job_id = self._queue.get_nowait()
+            self._update(job_id, status=ProcessingStatus.FAILED, error_message="Server shutting down.")
+
+    async def submit(self, document_id: str) -> GenerationJob:
+        await self.start()
+        job = GenerationJob(job_id=str(uuid.uuid4()), document_id=document_id, stage="queued")
+        try:
+            self._queue.put_nowait(job.job_id)
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Too many presentation jobs are queued. Please retry later.")
+        self._remember(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self._jobs.get(job_id)
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def _remember(self, job: GenerationJob):
+        self._jobs[job.job_id] = job
+        # Drop the oldest finished jobs once the history is full
+        while len(self._jobs) > self.history_size:
+            for job_id, old in self._jobs.items():
+                if old.status in (ProcessingStatus.COMPLETED, ProcessingStatus.FAILED):
+                    del self._jobs[job_id]
+                    break
+            else:
+                break
+
+    def _update(self, job_id: str, **changes):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        for field, value in changes.items():
+            setattr(job, field, value)
+        job.updated_at = datetime.now()
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                self._update(job_id, status=ProcessingStatus.PROCESSING, stage="starting", attempts=1)
+                try:
+                    result = await self._execute(job, lambda stage: self._update(job_id, stage=stage))
+                except Exception as e:
+                    logger.error(f"Generation job {job_id} failed: {str(e)}")
+                    self._update(job_id, status=ProcessingStatus.FAILED, error_message=str(e))
+                else:
+                    self._update(job_id, status=ProcessingStatus.COMPLETED, stage="completed", result=result)
+            finally:
+                self._queue.task_done()
+
+# Queues a job unless the queue is full. KEYS: queue, job; ARGV: job JSON, queue size, job ID
+SUBMIT_SCRIPT = """
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[1])
+redis.call('LPUSH', KEYS[1], ARGV[3])
+return 1
+"""
+
+# Moves due retries to the queue, then leases the next job until the deadline.
+# KEYS: queue, processing, delayed; ARGV: now, deadline
+CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, job_id in ipairs(due) do
+    redis.call('ZREM', KEYS[3], job_id)
+    redis.call('LPUSH', KEYS[1], job_id)
+end
+local job_id = redis.call('RPOP', KEYS[1])
+if job_id then
+    redis.call('ZADD', KEYS[2], ARGV[2], job_id)
+end
+return job_id
+"""
+
+# Puts jobs whose lease expired (their worker died or stalled) back at the
+# head of the queue. KEYS: processing, queue; ARGV: now
+REQUEUE_EXPIRED_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, job_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], job_id)
+    redis.call('RPUSH', KEYS[2], job_id)
+end
+return expired
+"""
+
+class RedisJobService(JobService):
+    """
+    Job queue and job status shared by all replicas through Redis.
+
+    Any replica can queue a job and report its status, and workers can run
+    in separate processes (`python -m app.worker`), so API and generation
+    capacity scale independently. The workers need the same registry
+    database and shared storage (`STORAGE_BACKEND=s3`) as the API.
+
+    Keys (under `prefix`):
+        jobs:queue: List of job IDs waiting for a worker.
+        jobs:processing: Sorted set of leased job IDs by lease deadline. A
+            running job's lease is renewed every third of the visibility
+            timeout; if it lapses, the job is queued again.
+        jobs:delayed: Sorted set of job IDs waiting to be retried, by time.
+        job:<id>: The job as JSON; finished jobs expire after `result_ttl`.
+
+    Each lease counts as an attempt; jobs fail for good after `max_attempts`,
+    or at once for errors another attempt cannot fix.
+
+    Args:
+        redis: A `redis.asyncio.Redis` client (or a compatible fake) with
+            `decode_responses=True`; if None, one is created from `url` on
+            first use.
+        workers: Workers in this process (0 for API-only replicas).
+        queue_size: Jobs allowed to wait in the queue.
+        visibility_timeout: Seconds a job stays leased without a renewal.
+        max_attempts: Attempts per job, including the first.
+        result_ttl: Seconds finished jobs are kept.
+        retry_base_delay: Base of the exponential backoff between attempts.
+        poll_interval: Seconds an idle worker waits before checking the queue again.
+        prefix: Prefix of all keys.
+    """
+
+    def __init__(
+        self,
+        redis,
+        workers: int,
+        queue_size: int,
+        url: Optional[str] = None,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        result_ttl: float = 24 * 3600.0,
+        retry_base_delay: float = 5.0,
+        poll_interval: float = 0.5,
+        prefix: str = "",
+    ):
+        super().__init__(workers, queue_size)
+        self.url = url
+        self._redis = redis
+        # Lua scripts by source, registered with the client on first use
+        self._scripts: dict = {}
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.retry_base_delay = retry_base_delay
+        self.poll_interval = poll_interval
+        self.queue_key = f"{prefix}jobs:queue"
+        self.processing_key = f"{prefix}jobs:processing"
+        self.delayed_key = f"{prefix}jobs:delayed"
+        self.job_prefix = f"{prefix}job:"
+        self._tasks: list[asyncio.Task] = []
+        self._queued = 0
+
+    @property
+    def redis(self):
+        """The Redis client, created on first use so importing the app opens no connection pool."""
+        if self._redis is None:
+            from redis.asyncio import Redis
+
+            self._redis = Redis.from_url(self.url, decode_responses=True)
+        return self._redis
+
+    def _script(self, source: str):
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = self.redis.register_script(source)
+        return script
+
+    async def start(self):
+        """Starts the workers and the task that requeues jobs with expired leases."""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._maintain(), name="generation-job-reaper")]
+        self._tasks += [
+            asyncio.create_task(self._worker(), name=f"generation-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Cancels the workers; their running jobs go back to the queue for another worker."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def aclose(self):
+        """Closes the Redis connections, if the client was ever created."""
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def submit(self, document_id: str) -> GenerationJob:
+        job = GenerationJob(job_id=str(uuid.uuid4()), document_id=document_id, stage="queued")
+        queued = await self._script(SUBMIT_SCRIPT)(
+            keys=[self.queue_key, self._job_key(job.job_id)],
+            args=[job.model_dump_json(), self.queue_size, job.job_id],
+        )
+        if not queued:
+            raise JobQueueFullError("Too many presentation jobs are queued. Please retry later.")
+        return job
+
+    async def get(self, job_id: str) -> Optional[GenerationJob]:
+        data = await self.redis.get(self._job_key(job_id))
+        return GenerationJob.model_validate_json(data) if data else None
+
+    @property
+    def queued(self) -> int:
+        """Queue length as of the last maintenance pass."""
+        return self._queued
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.job_prefix}{job_id}"
+
+    async def _save(self, job: GenerationJob):
+        job.updated_at = datetime.now()
+        await self.redis.set(self._job_key(job.job_id), job.model_dump_json())
+
+    async def _maintain(self):
+        interval = min(5.0, self.visibility_timeout / 3)
+        while True:
+            try:
+                expired = await self._script(REQUEUE_EXPIRED_SCRIPT)(
+                    keys=[self.processing_key, self.queue_key], args=[time.time()]
+                )
+                for job_id in expired:
+                    logger.warning(f"Generation job {job_id} lease expired; queued again")
+                self._queued = await self.redis.llen(self.queue_key)
+            except Exception as e:
+                logger.error(f"Generation job maintenance failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    async def _worker(self):
+        while True:
+            try:
+                job_id = await self._script(CLAIM_SCRIPT)(
+                    keys=[self.queue_key, self.processing_key, self.delayed_key],
+                    args=[time.time(), time.time() + self.visibility_timeout],
+                )
+            except Exception as e:
+                logger.error(f"Claiming a generation job failed: {str(e)}")
+                await asyncio.sleep(retry_delay(0, self.poll_interval * 4, 30.0))
+                continue
+            if job_id is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis failed mid-job; the lease lapses and the job is retried
+                logger.error(f"Generation job {job_id} could not be recorded: {str(e)}")
+
+    async def _run(self, job_id: str):
+        job = await self.get(job_id)
+        if job is None:
+            # Expired or deleted while queued
+            await self.redis.zrem(self.processing_key, job_id)
+            return
+        job.attempts += 1
+        if job.attempts > self.max_attempts:
+            job.status = ProcessingStatus.FAILED
+            job.error_message = f"Gave up after {self.max_attempts} attempts."
+            await self._finish(job)
+            return
+        job.status = ProcessingStatus.PROCESSING
+        job.stage = "starting"
+        await self._save(job)
+
+        changed = asyncio.Event()
+
+        def on_stage(stage: str):
+            job.stage = stage
+            changed.set()
+
+        keepalive = asyncio.create_task(self._keep_leased(job, changed))
+        try:
+            result = await self._execute(job, on_stage)
+        except asyncio.CancelledError:
+            await self._stop_keepalive(keepalive)
+            await asyncio.shield(self._release(job))
+            raise
+        except Exception as e:
+            await self._stop_keepalive(keepalive)
+            job.error_message = str(e)
+            if isinstance(e, PERMANENT_ERRORS) or job.attempts >= self.max_attempts:
+                logger.error(f"Generation job {job_id} failed: {str(e)}")
+                job.status = ProcessingStatus.FAILED
+                await self._finish(job)
+            else:
+                logger.warning(f"Generation job {job_id} attempt {job.attempts} failed, retrying: {str(e)}")
+                await self._retry(job)
+        else:
+            await self._stop_keepalive(keepalive)
+            job.status = ProcessingStatus.COMPLETED
+            job.stage = "completed"
+            job.error_message = None
+            job.result = result
+            await self._finish(job)
+
+    async def _keep_leased(self, job: GenerationJob, changed: asyncio.Event):
+        """Renews the job's lease and saves stage changes, one write at a time."""
+        interval = self.visibility_timeout / 3
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                if changed.is_set():
+                    changed.clear()
+                    await self._save(job)
+                renewed = await self.redis.zadd(
+                    self.processing_key, {job.job_id: time.time() + self.visibility_timeout}, xx=True, ch=True
+                )
+                if not renewed:
+                    logger.warning(f"Generation job {job.job_id} lost its lease; another worker may run it too")
+            except Exception as e:
+                logger.error(f"Renewing generation job {job.job_id} failed: {str(e)}")
+
+    async def _stop_keepalive(self, task: asyncio.Task):
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _finish(self, job: GenerationJob):
+        job.updated_at = datetime.now()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.job_id), job.model_dump_json(), ex=int(self.result_ttl))
+            pipe.zrem(self.processing_key, job.job_id)
+            await pipe.execute()
+
+    async def _retry(self, job: GenerationJob):
+        job.status = ProcessingStatus.PENDING
+        job.stage = "retrying"
+        job.updated_at = datetime.now()
+        ready_at = time.time() + retry_delay(job.attempts - 1, self.retry_base_delay, self.visibility_timeout)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._job_key(job.job_id), job.model_dump_json())
+            pipe.zrem(self.processing_key, job.job_id)
+            pipe.zadd(self.delayed_key, {job.job_id: ready_at})
+            await pipe.execute()
+
+    async def _release(self, job: GenerationJob):
+        """Hands an interrupted job back to the queue without counting the attempt."""
+        job.status = ProcessingStatus.PENDING
+        job.stage = "queued"
+        job.attempts -= 1
+        job.updated_at = datetime.now()
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(self._job_key(job.job_id), job.model_dump_json())
+                pipe.zrem(self.processing_key, job.job_id)
+                pipe.rpush(self.queue_key, job.job_id)
+                await pipe.execute()
+        except Exception as e:
+            # The lease lapses and the maintenance task requeues it
+            logger.error(f"Releasing generation job {job.job_id} failed: {str(e)}")
+
+def create_job_service() -> JobService:
+    """Builds the job queue selected by `settings.job_backend`."""
+    if settings.job_backend == "redis":
+        return RedisJobService(
+            None,
+            url=settings.redis_url,
+            workers=settings.job_workers,
+            queue_size=settings.job_queue_size,
+            visibility_timeout=settings.job_visibility_timeout,
+            max_attempts=settings.job_max_attempts,
+            result_ttl=settings.job_result_ttl,
+            retry_base_delay=settings.job_retry_base_delay,
+            poll_interval=settings.job_poll_interval,
+            prefix=settings.redis_prefix,
+        )
+    if settings.job_backend == "local":
+        return LocalJobService(
+            workers=settings.job_workers,
+            queue_size=settings.job_queue_size,
+            history_size=settings.job_history_size,
+        )
+    raise ValueError(f"Unknown job backend: {settings.job_backend}")
+
+# Create a singleton instance
+job_service = create_job_service()
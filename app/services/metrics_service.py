@@ -0,0 +1,191 @@
+# app/services/metrics_service.py
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.profiling_service import add_stage_time
+
+# Pipeline stages run from milliseconds (cached renders) to minutes (long LLM calls)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "pipeline_stage_duration_seconds",
+    "Time spent in each presentation pipeline stage.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+PIPELINE_STAGE_FAILURES = Counter(
+    "pipeline_stage_failures_total",
+    "Pipeline stages that raised an error.",
+    ["stage"],
+)
+PIPELINE_STAGE_IN_PROGRESS = Gauge(
+    "pipeline_stage_in_progress",
+    "Pipeline stages currently running.",
+    ["stage"],
+)
+GENERATIONS_IN_PROGRESS = Gauge(
+    "generations_in_progress",
+    "Presentation generations currently running (foreground and background).",
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens billed by Azure OpenAI, from the responses' usage.",
+    ["type"],
+)
+PROMPT_TOKENS = Counter(
+    "prompt_preprocessing_tokens_total",
+    "Document tokens before and after prompt preprocessing.",
+    ["phase"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled.",
+    ["method"],
+)
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """
+    Times a pipeline stage ("upload_write", "extract", "preprocess", "llm", "render", "save").
+
+    Works for both sync and async code, since only the wall time between
+    entering and leaving the block is measured.
+    """
+    in_progress = PIPELINE_STAGE_IN_PROGRESS.labels(stage)
+    in_progress.inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        # Cancellation and abandoned streams are not failures
+        PIPELINE_STAGE_FAILURES.labels(stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        PIPELINE_STAGE_SECONDS.labels(stage).observe(elapsed)
+        add_stage_time(stage, elapsed)
+        in_progress.dec()
+
+def record_token_usage(usage) -> None:
+    """Counts the tokens reported in a chat completion's `usage`, if present."""
+    if usage is None:
+        return
+    LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+
+def record_prompt_reduction(original_tokens: int, prompt_tokens: int) -> None:
+    """Counts the document tokens before and after preprocessing."""
+    PROMPT_TOKENS.labels("before").inc(original_tokens)
+    PROMPT_TOKENS.labels("after").inc(prompt_tokens)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+
+    Requests are labelled with the matched route's path (e.g.
+    `/api/v1/document/{document_id}`) rather than the raw URL, so the number
+    of series stays bounded. Latency runs until the response has been fully
+    sent, including streamed bodies.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(time.perf_counter() - start)
+            in_progress.dec()
+
+class ServiceStatsCollector(Collector):
+    """
+    Exposes counters the services already keep, read at scrape time.
+
+    Args:
+        caches: `stats()` callables of caches by name; each returns `hits` and `misses`.
+        storage: The storage janitor's `stats()`.
+        jobs_queued: Returns the number of generation jobs waiting for a worker.
+    """
+
+    def __init__(
+        self,
+        caches: dict[str, Callable[[], dict]],
+        storage: Callable[[], dict],
+        jobs_queued: Callable[[], int],
+    ):
+        self.caches = caches
+        self.storage = storage
+        self.jobs_queued = jobs_queued
+
+    def collect(self):
+        return self._families(read=True)
+
+    def describe(self):
+        # Without describe(), registering the collector calls collect(), which
+        # would read the services (and the cache directory) at import time
+        return self._families(read=False)
+
+    def _families(self, read: bool):
+        hits = CounterMetricFamily("cache_hits", "Cache lookups that found an entry.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that found nothing.", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Share of cache lookups that were hits since start.", labels=["cache"])
+        for name, stats in self.caches.items() if read else ():
+            values = stats()
+            lookups = values["hits"] + values["misses"]
+            hits.add_metric([name], values["hits"])
+            misses.add_metric([name], values["misses"])
+            ratio.add_metric([name], values["hits"] / lookups if lookups else 0.0)
+        yield hits
+        yield misses
+        yield ratio
+
+        usage = GaugeMetricFamily("storage_usage_bytes", "Disk used by stored files, as of the last janitor pass.", labels=["area"])
+        reclaimed = CounterMetricFamily("storage_reclaimed_bytes", "Bytes deleted by the storage janitor.", labels=["area"])
+        evictions = CounterMetricFamily("storage_evictions", "Deletions by the storage janitor.", labels=["reason"])
+        quota = GaugeMetricFamily("storage_quota_bytes", "Configured storage quota (0 = unlimited).")
+        queued = GaugeMetricFamily("generation_jobs_queued", "Generation jobs waiting for a worker.")
+        if read:
+            storage = self.storage()
+            for area, value in storage["usage_bytes"].items():
+                usage.add_metric([area], value)
+            for area, value in storage["bytes_reclaimed"].items():
+                reclaimed.add_metric([area], value)
+            for reason, value in storage["evictions"].items():
+                evictions.add_metric([reason], value)
+            quota.add_metric([], storage["quota_bytes"])
+            queued.add_metric([], self.jobs_queued())
+        yield usage
+        yield reclaimed
+        yield evictions
+        yield quota
+        yield queued
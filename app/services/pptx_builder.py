@@ -0,0 +1,200 @@
+# app/services/pptx_builder.py
+import io
+import re
+import threading
+import zipfile
+from pathlib import Path
+from typing import Optional
+from xml.sax.saxutils import escape
+
+# Placeholder texts used to cut the prototype slides into XML templates
+TITLE_MARK = "@@TITLE@@"
+SUBTITLE_MARK = "@@SUBTITLE@@"
+POINT_MARK = "@@POINT@@"
+
+# Every member gets the same timestamp so identical decks are identical bytes
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+SLIDE_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+SLIDE_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+def _runs(text: str) -> str:
+    """Text runs for `text`; line breaks become <a:br/> like python-pptx's `text` setters."""
+    lines = _INVALID_XML_CHARS.sub("", text.replace("\v", "\n")).split("\n")
+    return "<a:br/>".join(f"<a:r><a:t>{escape(line)}</a:t></a:r>" for line in lines)
+
+def _split(xml: str, mark: str) -> tuple[str, str]:
+    """Splits prototype XML around the run holding `mark`."""
+    run = f"<a:r><a:t>{mark}</a:t></a:r>"
+    if xml.count(run) != 1:
+        raise RuntimeError(f"Unexpected prototype slide XML around {mark}.")
+    before, _, after = xml.partition(run)
+    return before, after
+
+class PptxTemplate:
+    """
+    A base presentation, parsed once, from which decks are written directly.
+
+    python-pptx builds a small prototype deck (one title slide and one content
+    slide with marker texts) from the base template. Its static parts (masters,
+    layouts, theme, ...) are compressed once into an in-memory ZIP, and its
+    slide XML is cut into string templates around the markers. A deck is then
+    a copy of that ZIP plus the slide XML, content types and relationships,
+    written in one pass without building an object model.
+
+    Output is byte-stable: the same deck always produces the same bytes.
+    """
+
+    def __init__(self, template_path: Optional[Path] = None):
+        # python-pptx is only needed to parse the template, once per process
+        from pptx import Presentation
+        from pptx.util import Pt
+
+        prs = Presentation(str(template_path) if template_path else None)
+        if len(prs.slides):
+            raise ValueError("The presentation template must not contain slides.")
+
+        slide = prs.slides.add_slide(prs.slide_layouts[0])
+        slide.shapes.title.text = TITLE_MARK
+        if len(slide.placeholders) > 1:
+            slide.placeholders[1].text = SUBTITLE_MARK
+
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = TITLE_MARK
+        text_frame = slide.placeholders[1].text_frame
+        text_frame.clear()
+        paragraph = text_frame.paragraphs[0]
+        paragraph.text = POINT_MARK
+        paragraph.level = 0
+        paragraph.font.size = Pt(18)
+
+        buffer = io.BytesIO()
+        prs.save(buffer)
+        with zipfile.ZipFile(buffer) as prototype:
+            parts = {name: prototype.read(name) for name in prototype.namelist()}
+            order = prototype.namelist()
+
+        # Title slide: text before/between/after the title and subtitle runs
+        title_xml = parts["ppt/slides/slide1.xml"].decode("utf-8")
+        self._title_head, rest = _split(title_xml, TITLE_MARK)
+        if SUBTITLE_MARK in rest:
+            self._title_mid, self._title_tail = _split(rest, SUBTITLE_MARK)
+        else:
+            self._title_mid, self._title_tail = rest, None
+
+        # Content slide: text around the title run, and around the body paragraph
+        content_xml = parts["ppt/slides/slide2.xml"].decode("utf-8")
+        self._content_head, rest = _split(content_xml, TITLE_MARK)
+        paragraph_start = rest.rindex("<a:p>", 0, rest.index(POINT_MARK))
+        paragraph_end = rest.index("</a:p>", rest.index(POINT_MARK)) + len("</a:p>")
+        self._content_mid = rest[:paragraph_start]
+        self._content_tail = rest[paragraph_end:]
+        self._point_head, self._point_tail = _split(rest[paragraph_start:paragraph_end], POINT_MARK)
+
+        self._title_rels = parts["ppt/slides/_rels/slide1.xml.rels"]
+        self._content_rels = parts["ppt/slides/_rels/slide2.xml.rels"]
+
+        # Package-level parts, with the prototype's slide entries cut out
+        content_types = parts["[Content_Types].xml"].decode("utf-8")
+        content_types = re.sub(r'<Override PartName="/ppt/slides/slide\d+\.xml"[^>]*/>', "", content_types)
+        self._content_types_head, _, self._content_types_tail = content_types.rpartition("</Types>")
+        self._content_types_tail = "</Types>" + self._content_types_tail
+
+        rels = parts["ppt/_rels/presentation.xml.rels"].decode("utf-8")
+        rels = re.sub(rf'<Relationship [^>]*Type="{re.escape(SLIDE_REL_TYPE)}"[^>]*/>', "", rels)
+        # Slide relationships are numbered above every other one, so they
+        # cannot collide with the ids of a template's masters, theme, ...
+        self._first_slide_rel_id = max(map(int, re.findall(r'Id="rId(\d+)"', rels)), default=0) + 1
+        self._rels_head, _, self._rels_tail = rels.rpartition("</Relationships>")
+        self._rels_tail = "</Relationships>" + self._rels_tail
+
+        presentation = parts["ppt/presentation.xml"].decode("utf-8")
+        self._presentation_head, _, rest = presentation.partition("<p:sldIdLst>")
+        _, _, self._presentation_tail = rest.partition("</p:sldIdLst>")
+
+        dynamic = {
+            "[Content_Types].xml",
+            "ppt/presentation.xml",
+            "ppt/_rels/presentation.xml.rels",
+            "ppt/slides/slide1.xml",
+            "ppt/slides/slide2.xml",
+            "ppt/slides/_rels/slide1.xml.rels",
+            "ppt/slides/_rels/slide2.xml.rels",
+        }
+        base = io.BytesIO()
+        with zipfile.ZipFile(base, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name in order:
+                if name not in dynamic:
+                    self._write(archive, name, parts[name])
+        self._base = base.getvalue()
+
+    @staticmethod
+    def _write(archive: zipfile.ZipFile, name: str, data: bytes):
+        info = zipfile.ZipInfo(name, date_time=ZIP_TIMESTAMP)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.create_system = 0
+        info.external_attr = 0o600 << 16
+        archive.writestr(info, data)
+
+    def title_slide_xml(self, title: str, subtitle: str) -> str:
+        if self._title_tail is None:
+            return self._title_head + _runs(title) + self._title_mid
+        return self._title_head + _runs(title) + self._title_mid + _runs(subtitle) + self._title_tail
+
+    def content_slide_xml(self, title: str, points: list[str]) -> str:
+        paragraphs = "".join(self._point_head + _runs(point) + self._point_tail for point in points)
+        # A text body needs at least one paragraph
+        return self._content_head + _runs(title) + self._content_mid + (paragraphs or "<a:p/>") + self._content_tail
+
+    def build(self, title: str, subtitle: str, slides: list[tuple[str, list[str]]]) -> bytes:
+        """
+        Returns the .pptx bytes for a title slide followed by content slides.
+
+        Args:
+            title: Text of the title slide's title.
+            subtitle: Text of the title slide's subtitle.
+            slides: `(title, bullet points)` for each content slide.
+        """
+        slide_xml = [self.title_slide_xml(title, subtitle)]
+        slide_xml.extend(self.content_slide_xml(slide_title, points) for slide_title, points in slides)
+
+        overrides = "".join(
+            f'<Override PartName="/ppt/slides/slide{i}.xml" ContentType="{SLIDE_CONTENT_TYPE}"/>'
+            for i in range(1, len(slide_xml) + 1)
+        )
+        relationships = "".join(
+            f'<Relationship Id="rId{self._first_slide_rel_id + i - 1}" Type="{SLIDE_REL_TYPE}" Target="slides/slide{i}.xml"/>'
+            for i in range(1, len(slide_xml) + 1)
+        )
+        slide_ids = "".join(
+            f'<p:sldId id="{255 + i}" r:id="rId{self._first_slide_rel_id + i - 1}"/>'
+            for i in range(1, len(slide_xml) + 1)
+        )
+
+        buffer = io.BytesIO(self._base)
+        with zipfile.ZipFile(buffer, "a", zipfile.ZIP_DEFLATED) as archive:
+            self._write(archive, "[Content_Types].xml", (self._content_types_head + overrides + self._content_types_tail).encode("utf-8"))
+            self._write(archive, "ppt/presentation.xml", (self._presentation_head + f"<p:sldIdLst>{slide_ids}</p:sldIdLst>" + self._presentation_tail).encode("utf-8"))
+            self._write(archive, "ppt/_rels/presentation.xml.rels", (self._rels_head + relationships + self._rels_tail).encode("utf-8"))
+            for i, xml in enumerate(slide_xml, start=1):
+                self._write(archive, f"ppt/slides/slide{i}.xml", xml.encode("utf-8"))
+                self._write(archive, f"ppt/slides/_rels/slide{i}.xml.rels", self._title_rels if i == 1 else self._content_rels)
+        return buffer.getvalue()
+
+# Parsed templates by path (None is python-pptx's default template)
+_templates: dict[Optional[Path], PptxTemplate] = {}
+_templates_lock = threading.Lock()
+
+def get_template(template_path: Optional[Path] = None) -> PptxTemplate:
+    """Returns the process-wide template for `template_path`, parsing it on first use."""
+    key = Path(template_path).resolve() if template_path else None
+    template = _templates.get(key)
+    if template is None:
+        with _templates_lock:
+            template = _templates.get(key)
+            if template is None:
+                template = _templates[key] = PptxTemplate(key)
+    return template
@@ -0,0 +1,226 @@
+# app/services/preprocessing_service.py
+import math
+import re
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from app.config import settings
+from app.services.document_service import PAGE_BREAK
+from app.utils.tokens import count_tokens, split_into_chunks
+
+# Part of the content cache key; bump when the output of `prepare` changes
+PREPROCESSING_VERSION = "1"
+
+# Lines at the top and bottom of each page checked for headers and footers
+EDGE_LINES = 3
+# Whitespace other than line breaks, including form feeds and no-break spaces
+INLINE_WHITESPACE = re.compile(r"[^\S\n]+")
+CONTROL_CHARACTERS = re.compile(r"[\x00-\x08\x0e-\x1f\x7f]")
+DIGITS = re.compile(r"\d+")
+# Page numbers on a line of their own: "12", "- 12 -", "Page 3 of 10", "Halaman 3 dari 10"
+PAGE_NUMBER = re.compile(
+    r"^[-–—|\s]*(?:(?:page|halaman|hal\.?|p\.)\s*)?\d+(?:\s*(?:of|dari|/)\s*\d+)?[-–—|\s]*$",
+    re.IGNORECASE,
+)
+# Numbered ("2.", "3.1 Method", "IV. Results", "BAB II") and markdown headings
+NUMBERED_HEADING = re.compile(r"^(?:#{1,6}\s|\d+(?:\.\d+)*\.?\s|[IVXLC]+\.\s|bab\s+[\dIVXLC]+\b)", re.IGNORECASE)
+HEADING_MAX_CHARS = 80
+# Stands in for paragraphs left out by sampling
+GAP_MARKER = "[...]"
+
+class PreparedText(NamedTuple):
+    """Text ready for the prompt, with how much it was reduced."""
+    text: str
+    original_tokens: int
+    tokens: int
+    boilerplate_lines: int
+    sampled: bool
+
+def _line_key(line: str) -> str:
+    """Compares lines regardless of case, spacing and numbers (e.g. "Page 3" and "Page 4")."""
+    return DIGITS.sub("#", INLINE_WHITESPACE.sub(" ", line).strip().lower())
+
+def _edge_lines(lines: list[str]) -> list[int]:
+    """Indices of the first and last few non-empty lines of a page."""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(filled[:EDGE_LINES] + filled[-EDGE_LINES:]))
+
+def _is_heading(paragraph: str) -> bool:
+    if "\n" in paragraph or len(paragraph) > HEADING_MAX_CHARS or paragraph[-1] in ".,;:!?":
+        return False
+    return bool(NUMBERED_HEADING.match(paragraph)) or (paragraph.isupper() and any(c.isalpha() for c in paragraph))
+
+def _spread(count: int) -> list[int]:
+    """0..count-1 ordered so that every prefix is spread evenly over the range."""
+    order = []
+    seen = set()
+    step = count
+    while step >= 1:
+        for i in range(0, count, step):
+            if i not in seen:
+                seen.add(i)
+                order.append(i)
+        step //= 2
+    return order
+
+class PreprocessingService:
+    """
+    Prepares extracted document text for the LLM prompt.
+
+    Runs between extraction and the LLM call and only removes what costs
+    tokens without informing the presentation:
+
+    1. Headers, footers and page numbers: lines at the top or bottom of a
+       page that recur (numbers aside) on at least `boilerplate_min_share`
+       of the pages are dropped. Needs page breaks, i.e. PDFs.
+    2. Whitespace: runs of spaces and blank lines are collapsed and control
+       characters removed.
+    3. Token budget: text over `max_tokens` is sampled section by section.
+       Every section keeps its heading and opening paragraph (spread evenly
+       over the document if not all fit), and the rest of the budget is
+       shared by the sections in proportion to their length. Left-out
+       paragraphs are marked with "[...]".
+    """
+
+    def prepare(
+        self,
+        text: str,
+        max_tokens: Optional[int] = None,
+        boilerplate_min_share: Optional[float] = None,
+    ) -> PreparedText:
+        """
+        Strips boilerplate, compacts whitespace and fits the text to a token budget.
+
+        Args:
+            text: Extracted text; PDF pages end with PAGE_BREAK.
+            max_tokens: Token budget; defaults to `settings.prompt_max_tokens` (0 disables it).
+            boilerplate_min_share: Share of pages a header or footer must appear on;
+                defaults to `settings.prompt_boilerplate_min_share`.
+
+        Returns:
+            The prepared text and its token counts before and after.
+        """
+        max_tokens = settings.prompt_max_tokens if max_tokens is None else max_tokens
+        min_share = settings.prompt_boilerplate_min_share if boilerplate_min_share is None else boilerplate_min_share
+        original_tokens = count_tokens(text)
+
+        pages = [page.splitlines() for page in text.split(PAGE_BREAK)]
+        if len(pages) > 1 and not any(line.strip() for line in pages[-1]):
+            pages.pop()
+        boilerplate_lines = self._strip_boilerplate(pages, min_share)
+        paragraphs = self._paragraphs(pages)
+        if not paragraphs:
+            # Nothing but boilerplate is still better sent than nothing
+            return PreparedText(text, original_tokens, original_tokens, 0, False)
+
+        prepared = "\n\n".join(paragraphs)
+        tokens = count_tokens(prepared)
+        sampled = bool(max_tokens) and tokens > max_tokens
+        if sampled:
+            prepared = self._sample(paragraphs, max_tokens)
+            tokens = count_tokens(prepared)
+        return PreparedText(prepared, original_tokens, tokens, boilerplate_lines, sampled)
+
+    def _strip_boilerplate(self, pages: list[list[str]], min_share: float) -> int:
+        """Blanks recurring header and footer lines in place; returns how many were removed."""
+        if len(pages) < 3:
+            return 0
+        edges = [_edge_lines(lines) for lines in pages]
+        page_counts: Counter[str] = Counter()
+        for lines, indices in zip(pages, edges):
+            page_counts.update({_line_key(lines[i]) for i in indices})
+        threshold = max(3, math.ceil(len(pages) * min_share))
+        recurring = {key for key, count in page_counts.items() if count >= threshold}
+
+        removed = 0
+        for lines, indices in zip(pages, edges):
+            for i in indices:
+                if _line_key(lines[i]) in recurring or PAGE_NUMBER.match(lines[i]):
+                    lines[i] = ""
+                    removed += 1
+        return removed
+
+    def _paragraphs(self, pages: list[list[str]]) -> list[str]:
+        """Compacts whitespace; blank lines and page ends separate paragraphs."""
+        paragraphs = []
+        for lines in pages:
+            current: list[str] = []
+            for line in lines:
+                line = INLINE_WHITESPACE.sub(" ", CONTROL_CHARACTERS.sub("", line)).strip()
+                if line:
+                    current.append(line)
+                elif current:
+                    paragraphs.append("\n".join(current))
+                    current = []
+            if current:
+                paragraphs.append("\n".join(current))
+        return paragraphs
+
+    def _sample(self, paragraphs: list[str], max_tokens: int) -> str:
+        """Picks paragraphs that fit in `max_tokens`, section by section, in document order."""
+        # Small pieces let the budget be shared finely, even in text without paragraphs
+        piece_tokens = max(64, max_tokens // 16)
+        pieces: list[str] = []
+        for paragraph in paragraphs:
+            if count_tokens(paragraph) > piece_tokens:
+                pieces.extend(split_into_chunks(paragraph, piece_tokens))
+            else:
+                pieces.append(paragraph)
+        # Each piece also costs its separator
+        costs = [count_tokens(piece) + 1 for piece in pieces]
+
+        sections: list[list[int]] = []
+        for i, piece in enumerate(pieces):
+            if not sections or _is_heading(piece):
+                sections.append([])
+            sections[-1].append(i)
+
+        # Reserve room for the gap markers: at most two per section, plus the
+        # pieces added from the leftover, which pay for their own
+        marker_cost = count_tokens(GAP_MARKER) + 1
+        budget = max_tokens - marker_cost * (2 * len(sections) + 1)
+        kept: set[int] = set()
+        used = 0
+
+        # 1. The heading and opening paragraph of each section
+        for s in _spread(len(sections)):
+            section = sections[s]
+            lead = section[:2] if _is_heading(pieces[section[0]]) else section[:1]
+            cost = sum(costs[i] for i in lead)
+            if used + cost <= budget:
+                kept.update(lead)
+                used += cost
+
+        # 2. The rest, shared in proportion to the length of each section
+        rest = [[i for i in section if i not in kept] for section in sections]
+        rest_cost = sum(costs[i] for section in rest for i in section)
+        available = budget - used
+        if rest_cost:
+            for section in rest:
+                share = available * sum(costs[i] for i in section) / rest_cost
+                for i in section:
+                    if costs[i] > share:
+                        break
+                    kept.add(i)
+                    share -= costs[i]
+                    used += costs[i]
+            # Whatever is left over goes to the earliest pieces that fit
+            for section in rest:
+                for i in section:
+                    if i not in kept and used + costs[i] + marker_cost <= budget:
+                        kept.add(i)
+                        used += costs[i] + marker_cost
+
+        parts = []
+        previous = -1
+        for i in sorted(kept):
+            if i != previous + 1:
+                parts.append(GAP_MARKER)
+            parts.append(pieces[i])
+            previous = i
+        if previous != len(pieces) - 1:
+            parts.append(GAP_MARKER)
+        return "\n\n".join(parts)
+
+# Create a singleton instance
+preprocessing_service = PreprocessingService()
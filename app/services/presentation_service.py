@@ -2,12 +2,13 @@
 import re
 import json
 from pathlib import Path
-from pptx import Presentation
-from pptx.util import Inches, Pt
 
-# Define storage path
-PRESENTATION_DIR = Path("app/storage/presentations")
-PRESENTATION_DIR.mkdir(parents=True, exist_ok=True)
+from app.config import settings
+from app.services.renderers import Deck, RENDERERS
+from app.utils.atomic_files import write_bytes_atomic
+
+# Define storage path; created at startup by `ensure_storage_dirs`
+PRESENTATION_DIR = settings.presentations_dir
 
 class PresentationService:
     """Service for creating well-structured and paginated PowerPoint presentations."""
@@ -21,80 +22,158 @@ class PresentationService:
 
     def _paginate_content(self, lines: list[str], max_words: int, max_chars: int) -> list[list[str]]:
         """
-        Splits text content into multiple pages based on word and character limits,
-        ensuring no page is overly dense.
+        Splits bullet points into pages that stay within word and character limits.
+
+        Bullets are kept whole where possible: a bullet that does not fit on the
+        current page starts the next one. Only a bullet longer than a full page
+        is split, at word boundaries. Word and character counts are kept as
+        running totals, so the work is linear in the length of the content.
+
+        Args:
+            lines: The bullet points of a slide.
+            max_words: Maximum number of words per page.
+            max_chars: Maximum number of characters per page, not counting
+                the breaks between bullets.
+
+        Returns:
+            The bullets of each page; empty if there is no text.
         """
         pages = []
-        # Join and clean all lines, then split into words to handle long paragraphs
-        full_text = " ".join(self._clean_text(line) for line in lines)
-        words = full_text.split()
-
-        if not words:
-            return []
-
-        current_page_words = []
-        for word in words:
-            # Check if adding the next word would exceed the limits
-            if current_page_words and (
-                len(" ".join(current_page_words) + " " + word) > max_chars or
-                len(current_page_words) + 1 > max_words
+        page: list[str] = []
+        page_words = 0
+        page_chars = 0
+
+        for line in lines:
+            words = self._clean_text(line).split()
+            if not words:
+                continue
+            bullet = " ".join(words)
+
+            fits_empty_page = len(words) <= max_words and len(bullet) <= max_chars
+            if page and fits_empty_page and (
+                page_words + len(words) > max_words or page_chars + len(bullet) > max_chars
             ):
-                # Finalize the current page and start a new one
-                pages.append([" ".join(current_page_words)])
-                current_page_words = [word]
-            else:
-                current_page_words.append(word)
+                pages.append(page)
+                page, page_words, page_chars = [], 0, 0
+
+            if fits_empty_page and page_words + len(words) <= max_words and page_chars + len(bullet) <= max_chars:
+                page.append(bullet)
+                page_words += len(words)
+                page_chars += len(bullet)
+                continue
 
-        # Add the last remaining page
-        if current_page_words:
-            pages.append([" ".join(current_page_words)])
+            # Longer than a page: fill the current page word by word, then continue on new ones
+            piece: list[str] = []
+            piece_chars = 0
+            for word in words:
+                added_chars = len(word) + (1 if piece else 0)
+                if (piece or page) and (
+                    page_words + len(piece) + 1 > max_words or page_chars + piece_chars + added_chars > max_chars
+                ):
+                    if piece:
+                        page.append(" ".join(piece))
+                    pages.append(page)
+                    page, page_words, page_chars = [], 0, 0
+                    piece, piece_chars, added_chars = [], 0, len(word)
+                piece.append(word)
+                piece_chars += added_chars
+            page.append(" ".join(piece))
+            page_words += len(piece)
+            page_chars += piece_chars
 
+        if page:
+            pages.append(page)
         return pages
 
-    def create_presentation_from_content(self, document_id: str, json_content: str) -> Path:
+    def _build_deck(self, document_id: str, content: dict) -> Deck:
+        """Cleans and paginates the LLM's JSON into the slides every format renders."""
+        # Content that would overflow its placeholder continues on "(cont.)" slides
+        slides = []
+        for slide_data in content.get("slides", []):
+            slide_title = slide_data.get("title", "")
+            pages = self._paginate_content(
+                slide_data.get("content", []),
+                max_words=settings.slide_max_words,
+                max_chars=settings.slide_max_chars
+            )
+            slides.append((slide_title, pages[0] if pages else []))
+            slides.extend((f"{slide_title} (cont.)", page) for page in pages[1:])
+        return Deck(
+            title=content.get("title", "Presentation"),
+            subtitle=f"Generated from document: {document_id}",
+            slides=slides
+        )
+
+    def rendition_path(self, document_id: str, format: str) -> Path:
+        """Where the rendition of a presentation in `format` is stored."""
+        return PRESENTATION_DIR / f"{document_id}{RENDERERS[format].extension}"
+
+    def content_path(self, document_id: str) -> Path:
+        """Where the generated JSON of a presentation is stored."""
+        return PRESENTATION_DIR / f"{document_id}.json"
+
+    def version_path(self, document_id: str) -> Path:
         """
-        Creates a .pptx presentation from a JSON structure containing the title and slides.
+        Where the version of the shared JSON that local files derive from is noted.
+
+        Only used with shared storage; see `GenerationService.get_rendition`.
+        """
+        return PRESENTATION_DIR / f"{document_id}.version"
+
+    def store_content(self, document_id: str, json_content: str) -> Path:
+        """
+        Stores the JSON of a generated presentation and renders its HTML preview.
+
+        Renditions left from earlier content are removed; other formats are
+        rendered from the stored JSON on first request (see `render`).
+
+        Args:
+            document_id: The ID of the source document.
+            json_content: The LLM output (`{"title", "slides"}`).
+
+        Returns:
+            The path of the HTML rendition.
+
+        Raises:
+            ValueError: If `json_content` is not valid JSON.
         """
         try:
             content = json.loads(json_content)
         except json.JSONDecodeError:
             raise ValueError("Invalid JSON content received for presentation.")
 
-        prs = Presentation()
-        
-        # --- Title Slide ---
-        title_slide_layout = prs.slide_layouts[0]
-        slide = prs.slides.add_slide(title_slide_layout)
-        title = slide.shapes.title
-        subtitle = slide.placeholders[1] if len(slide.placeholders) > 1 else None
-        
-        title.text = content.get("title", "Presentation")
-        if subtitle:
-            subtitle.text = f"Generated from document: {document_id}"
-
-        # --- Content Slides ---
-        content_slide_layout = prs.slide_layouts[1]
-        for slide_data in content.get("slides", []):
-            slide = prs.slides.add_slide(content_slide_layout)
-            title_shape = slide.shapes.title
-            body_shape = slide.placeholders[1]
-            
-            title_shape.text = slide_data.get("title", "")
-            
-            text_frame = body_shape.text_frame
-            text_frame.clear()
-            
-            for point in slide_data.get("content", []):
-                p = text_frame.add_paragraph()
-                p.text = self._clean_text(point)
-                p.level = 0
-                p.font.size = Pt(18)
-
-        # --- Save Presentation ---
-        file_path = PRESENTATION_DIR / f"{document_id}.pptx"
-        prs.save(file_path)
-        
+        write_bytes_atomic(self.content_path(document_id), json_content.encode("utf-8"))
+        for format in RENDERERS:
+            self.rendition_path(document_id, format).unlink(missing_ok=True)
+        return self._write_rendition(document_id, "html", content)
+
+    def render(self, document_id: str, format: str) -> Path:
+        """
+        Returns the rendition of a presentation in `format`, rendering it on first request.
+
+        Raises:
+            FileNotFoundError: If the presentation has not been generated.
+        """
+        file_path = self.rendition_path(document_id, format)
+        if file_path.exists():
+            return file_path
+        json_content = self.content_path(document_id).read_text(encoding="utf-8")
+        return self._write_rendition(document_id, format, json.loads(json_content))
+
+    def _write_rendition(self, document_id: str, format: str, content: dict) -> Path:
+        data = RENDERERS[format].render(self._build_deck(document_id, content))
+        file_path = self.rendition_path(document_id, format)
+        write_bytes_atomic(file_path, data)
         return file_path
 
+    def create_presentation_from_content(self, document_id: str, json_content: str) -> Path:
+        """
+        Creates a .pptx presentation from a JSON structure containing the title and slides.
+
+        The same content always produces a byte-identical file.
+        """
+        self.store_content(document_id, json_content)
+        return self.render(document_id, "pptx")
+
 # Create a singleton instance
 presentation_service = PresentationService()
\ No newline at end of file
@@ -0,0 +1,240 @@
+# app/services/profiling_service.py
+import cProfile
+import heapq
+import io
+import itertools
+import marshal
+import pstats
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+# Seconds per pipeline stage for the request being handled; None unless
+# profiling is enabled, so `track_stage` only pays for a context variable lookup
+_request_stages: ContextVar[Optional[dict[str, float]]] = ContextVar("request_stages", default=None)
+
+PROFILE_SORT_KEYS = ("cumulative", "tottime", "calls", "ncalls", "name", "filename")
+
+class ProfileNotFoundError(Exception):
+    """Raised when a profile is unknown or has been dropped from the store."""
+    pass
+
+@dataclass
+class RequestTiming:
+    """Timing of one request, with the time spent in each pipeline stage."""
+    request_id: str
+    method: str
+    route: str
+    path: str
+    status: int
+    duration_seconds: float
+    started_at: datetime
+    stages: dict[str, float] = field(default_factory=dict)
+    profile_id: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "route": self.route,
+            "path": self.path,
+            "status": self.status,
+            "duration_seconds": round(self.duration_seconds, 6),
+            "started_at": self.started_at.isoformat(),
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.stages.items()},
+            "profile_id": self.profile_id,
+        }
+
+def add_stage_time(stage: str, seconds: float):
+    """Adds a stage's duration to the breakdown of the request being handled, if any."""
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+def is_admin(token: Optional[str]) -> bool:
+    """
+    Whether a request may use the admin surface (profiles and the profiling flag).
+
+    The request must present `settings.admin_token`; without one configured,
+    access is denied to everyone.
+    """
+    if not settings.admin_token or token is None:
+        return False
+    return secrets.compare_digest(token, settings.admin_token)
+
+class ProfilingService:
+    """
+    Keeps the slowest requests and the cProfile captures of flagged requests.
+
+    Args:
+        slowest_count: Number of slowest requests kept (a min-heap on duration).
+        max_profiles: Number of captured profiles kept; the oldest is dropped first.
+    """
+
+    def __init__(self, slowest_count: int, max_profiles: int):
+        self.slowest_count = slowest_count
+        self.max_profiles = max_profiles
+        self._slowest: list[tuple[float, int, RequestTiming]] = []
+        self._order = itertools.count()
+        self._profiles: OrderedDict[str, tuple[RequestTiming, pstats.Stats]] = OrderedDict()
+        # cProfile hooks the whole thread, so only one request is profiled at a time
+        self.profiling = False
+
+    def record(self, timing: RequestTiming):
+        """Keeps the request if it is among the slowest seen."""
+        if self.slowest_count <= 0:
+            return
+        entry = (timing.duration_seconds, next(self._order), timing)
+        if len(self._slowest) < self.slowest_count:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def add_profile(self, timing: RequestTiming, profiler: cProfile.Profile):
+        """Stores a finished request's profile under `timing.profile_id`."""
+        self._profiles[timing.profile_id] = (timing, pstats.Stats(profiler))
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def slowest(self) -> list[dict]:
+        """The slowest requests kept, slowest first."""
+        return [timing.as_dict() for _, _, timing in sorted(self._slowest, reverse=True)]
+
+    def profiles(self) -> list[dict]:
+        """The requests with a stored profile, newest first."""
+        return [timing.as_dict() for timing, _ in reversed(self._profiles.values())]
+
+    def _get(self, profile_id: str) -> tuple[RequestTiming, pstats.Stats]:
+        try:
+            return self._profiles[profile_id]
+        except KeyError:
+            raise ProfileNotFoundError(f"Profile {profile_id} not found.")
+
+    def profile_text(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> str:
+        """
+        Formats a profile as `pstats` prints it.
+
+        Args:
+            profile_id: The profile's ID (the `X-Profile-Id` response header).
+            sort: One of `PROFILE_SORT_KEYS`.
+            limit: Number of functions listed.
+        """
+        if sort not in PROFILE_SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{sort}'. Use one of: {', '.join(PROFILE_SORT_KEYS)}.")
+        timing, stats = self._get(profile_id)
+        output = io.StringIO()
+        stats.stream = output
+        output.write(f"{timing.method} {timing.path} -> {timing.status} in {timing.duration_seconds:.3f}s\n")
+        for stage, seconds in timing.stages.items():
+            output.write(f"  {stage}: {seconds:.3f}s\n")
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def profile_dump(self, profile_id: str) -> bytes:
+        """A profile in the binary format of `cProfile.Profile.dump_stats`, for snakeviz and friends."""
+        _, stats = self._get(profile_id)
+        return marshal.dumps(stats.stats)
+
+def _wants_profile(scope: Scope) -> tuple[bool, Optional[str]]:
+    """Reads the profiling flag and the admin token from the request."""
+    flag = None
+    token = None
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            flag = value.decode("latin-1")
+        elif name == b"x-admin-token":
+            token = value.decode("latin-1")
+    if flag is None and b"profile" in scope.get("query_string", b""):
+        values = parse_qs(scope["query_string"].decode("latin-1")).get("profile")
+        flag = values[0] if values else None
+    return flag is not None and flag.lower() in ("1", "true", "yes"), token
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware feeding `ProfilingService`.
+
+    Every request is timed with its per-stage breakdown and offered to the
+    slowest-requests store. Requests sent with `X-Profile: 1` (or
+    `?profile=1`) by an admin also run under cProfile; the response carries
+    an `X-Profile-Id` header naming the stored profile. As cProfile traces
+    the whole event loop thread, concurrent requests show up in the profile
+    too, and a request flagged while another is being profiled is not
+    profiled (`X-Profile: busy`).
+
+    Only installed when `settings.profiling_enabled` is on.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        wants_profile, token = _wants_profile(scope)
+        profiler = None
+        profile_header = None
+        if wants_profile and is_admin(token):
+            if profiling_service.profiling:
+                profile_header = (b"x-profile", b"busy")
+            else:
+                profiler = cProfile.Profile()
+                profile_id = uuid.uuid4().hex
+                profile_header = (b"x-profile-id", profile_id.encode())
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile_header:
+                    message = {**message, "headers": [*message.get("headers", []), profile_header]}
+            await send(message)
+
+        stages: dict[str, float] = {}
+        reset = _request_stages.set(stages)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        if profiler:
+            profiling_service.profiling = True
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiling_service.profiling = False
+            duration = time.perf_counter() - start
+            _request_stages.reset(reset)
+            timing = RequestTiming(
+                request_id=uuid.uuid4().hex,
+                method=scope["method"],
+                route=getattr(scope.get("route"), "path", None) or "unmatched",
+                path=scope["path"],
+                status=status,
+                duration_seconds=duration,
+                started_at=started_at,
+                stages=stages,
+                profile_id=profile_id if profiler else None,
+            )
+            profiling_service.record(timing)
+            if profiler:
+                profiling_service.add_profile(timing, profiler)
+
+# Create a singleton instance
+profiling_service = ProfilingService(
+    slowest_count=settings.profiling_slowest_count,
+    max_profiles=settings.profiling_max_profiles,
+)
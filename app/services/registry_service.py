@@ -0,0 +1,109 @@
+# app/services/registry_service.py
+import asyncio
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, event, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.document_models import ProcessingStatus
+from app.models.registry_models import Base, DocumentRecord
+
+class RegistryService:
+    """
+    Service for the document registry: one row per upload, keyed by document ID.
+
+    Lookups go through the primary key instead of scanning the upload
+    directory. Queries are short and indexed, but run in a worker thread so
+    the event loop never waits on SQLite's file locks.
+    """
+
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self._engine: Optional[Engine] = None
+        self._sessions: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        """The database engine; created, with its tables, on first use."""
+        with self._lock:
+            if self._engine is None:
+                connect_args = {}
+                if self.database_url.startswith("sqlite"):
+                    connect_args["check_same_thread"] = False
+                engine = create_engine(self.database_url, connect_args=connect_args)
+                if engine.dialect.name == "sqlite":
+                    event.listen(engine, "connect", _configure_sqlite)
+                Base.metadata.create_all(engine)
+                self._sessions = sessionmaker(engine, expire_on_commit=False)
+                self._engine = engine
+        return self._engine
+
+    def _session(self):
+        if self._sessions is None:
+            self.engine  # creates the engine and the session factory
+        return self._sessions()
+
+    def _add(self, record: DocumentRecord) -> DocumentRecord:
+        with self._session() as session, session.begin():
+            session.add(record)
+        return record
+
+    def _get(self, document_id: str) -> Optional[DocumentRecord]:
+        with self._session() as session:
+            return session.get(DocumentRecord, document_id)
+
+    def _set_status(self, document_id: str, status: ProcessingStatus, error_message: Optional[str]):
+        with self._session() as session, session.begin():
+            session.execute(
+                update(DocumentRecord)
+                .where(DocumentRecord.document_id == document_id)
+                .values(status=status, error_message=error_message, updated_at=datetime.now())
+            )
+
+    def _delete(self, document_ids: list[str]) -> int:
+        with self._session() as session, session.begin():
+            result = session.execute(delete(DocumentRecord).where(DocumentRecord.document_id.in_(document_ids)))
+        return result.rowcount
+
+    async def add(self, record: DocumentRecord) -> DocumentRecord:
+        """Registers an uploaded document."""
+        return await asyncio.to_thread(self._add, record)
+
+    async def get(self, document_id: str) -> Optional[DocumentRecord]:
+        """Returns the registry entry for a document, or None if it is unknown."""
+        return await asyncio.to_thread(self._get, document_id)
+
+    async def set_status(
+        self,
+        document_id: str,
+        status: ProcessingStatus,
+        error_message: Optional[str] = None
+    ):
+        """Records the processing status of a document."""
+        await asyncio.to_thread(self._set_status, document_id, status, error_message)
+
+    async def delete(self, document_ids: list[str]) -> int:
+        """Removes registry entries; returns how many existed."""
+        if not document_ids:
+            return 0
+        return await asyncio.to_thread(self._delete, document_ids)
+
+    def close(self):
+        """Releases pooled database connections."""
+        if self._engine is not None:
+            self._engine.dispose()
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers proceed while an upload is being registered
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+# Create a singleton instance
+registry_service = RegistryService(settings.database_url)
@@ -0,0 +1,119 @@
+# app/services/renderers.py
+import html
+import io
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from app.config import settings
+from app.services.pptx_builder import get_template
+
+class Deck(NamedTuple):
+    """A presentation ready for rendering: already cleaned and paginated."""
+    title: str
+    subtitle: str
+    # (title, bullet points) for each content slide
+    slides: list[tuple[str, list[str]]]
+
+class Renderer(ABC):
+    """Turns a Deck into the bytes of one output format."""
+    format: str
+    extension: str
+    media_type: str
+
+    @abstractmethod
+    def render(self, deck: Deck) -> bytes:
+        """Returns the deck in this renderer's format."""
+
+class PptxRenderer(Renderer):
+    """PowerPoint, written from the cached base template."""
+    format = "pptx"
+    extension = ".pptx"
+    media_type = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+    def render(self, deck: Deck) -> bytes:
+        return get_template(settings.presentation_template).build(deck.title, deck.subtitle, deck.slides)
+
+class HtmlRenderer(Renderer):
+    """A single self-contained HTML page with one section per slide; cheap enough to build eagerly."""
+    format = "html"
+    extension = ".html"
+    media_type = "text/html; charset=utf-8"
+
+    STYLE = (
+        "body{margin:0;background:#eee;font-family:system-ui,sans-serif}"
+        "section{box-sizing:border-box;width:min(960px,100%);aspect-ratio:4/3;margin:24px auto;"
+        "padding:48px 64px;background:#fff;box-shadow:0 1px 4px rgba(0,0,0,.2);overflow:hidden}"
+        "section.title{display:flex;flex-direction:column;justify-content:center;text-align:center}"
+        "h1{font-size:2.4em;margin:0 0 .5em}h2{font-size:1.8em;margin:0 0 .8em}"
+        "li{font-size:1.15em;margin:.4em 0}p.subtitle{color:#666;font-size:1.2em}"
+    )
+
+    def render(self, deck: Deck) -> bytes:
+        escape = html.escape
+        parts = [
+            "<!DOCTYPE html>",
+            '<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">',
+            f"<title>{escape(deck.title)}</title><style>{self.STYLE}</style></head><body>",
+            f'<section class="title"><h1>{escape(deck.title)}</h1><p class="subtitle">{escape(deck.subtitle)}</p></section>',
+        ]
+        for title, points in deck.slides:
+            items = "".join(f"<li>{escape(point)}</li>" for point in points)
+            parts.append(f"<section><h2>{escape(title)}</h2><ul>{items}</ul></section>")
+        parts.append("</body></html>")
+        return "\n".join(parts).encode("utf-8")
+
+class PdfRenderer(Renderer):
+    """One landscape 4:3 page per slide, laid out with reportlab."""
+    format = "pdf"
+    extension = ".pdf"
+    media_type = "application/pdf"
+
+    def render(self, deck: Deck) -> bytes:
+        # reportlab is only needed when a PDF is actually requested
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import ListFlowable, ListItem, PageBreak, Paragraph, SimpleDocTemplate, Spacer
+
+        styles = getSampleStyleSheet()
+        title_style = ParagraphStyle("DeckTitle", parent=styles["Title"], fontSize=36, leading=44, spaceBefore=2 * inch)
+        subtitle_style = ParagraphStyle("DeckSubtitle", parent=styles["Normal"], fontSize=16, leading=20, alignment=1)
+        heading_style = ParagraphStyle("SlideTitle", parent=styles["Heading1"], fontSize=28, leading=34, spaceAfter=18)
+        bullet_style = ParagraphStyle("SlideBullet", parent=styles["Normal"], fontSize=18, leading=23)
+
+        escape = html.escape
+        story = [
+            Paragraph(escape(deck.title), title_style),
+            Spacer(1, 12),
+            Paragraph(escape(deck.subtitle), subtitle_style),
+        ]
+        for title, points in deck.slides:
+            story.append(PageBreak())
+            story.append(Paragraph(escape(title), heading_style))
+            if points:
+                story.append(ListFlowable(
+                    [ListItem(Paragraph(escape(point), bullet_style), spaceAfter=6) for point in points],
+                    bulletType="bullet",
+                    start="•",
+                    leftIndent=18
+                ))
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=(10 * inch, 7.5 * inch),
+            leftMargin=0.6 * inch,
+            rightMargin=0.6 * inch,
+            topMargin=0.5 * inch,
+            bottomMargin=0.5 * inch,
+            title=deck.title,
+            # Fixed creation date and document ID, so the same deck gives the same bytes
+            invariant=True
+        )
+        doc.build(story)
+        return buffer.getvalue()
+
+# Output formats by name
+RENDERERS: dict[str, Renderer] = {
+    renderer.format: renderer
+    for renderer in (PptxRenderer(), PdfRenderer(), HtmlRenderer())
+}
@@ -0,0 +1,506 @@
+# app/services/storage_services.py
+import asyncio
+import hashlib
+import hmac
+import uuid
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, NamedTuple, Optional, Union
+from urllib.parse import quote, urlsplit
+
+import aiofiles
+import aiofiles.os
+import httpx
+
+from app.config import settings
+from app.utils.resilience import retry_delay
+
+# Bytes per read when copying or streaming local files
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# S3 rejects multipart parts below 5 MiB (except the last one)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_RETRIES = 3
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+class StorageError(Exception):
+    """Raised when the storage backend fails a request."""
+    pass
+
+class ObjectNotFoundError(FileNotFoundError):
+    """Raised when a key does not exist in storage."""
+    pass
+
+class ObjectInfo(NamedTuple):
+    """Metadata of a stored object."""
+    key: str
+    size: int
+    etag: Optional[str]
+
+def storage_key(path: Path) -> str:
+    """
+    Returns the storage key of a file under `settings.storage_dir`.
+
+    Keys mirror the local layout (e.g. `presentations/<id>.pptx`), so the
+    local directory doubles as a cache of the shared storage.
+    """
+    return Path(path).resolve().relative_to(settings.storage_dir.resolve()).as_posix()
+
+class StorageBackend(ABC):
+    """
+    Async interface to artifact storage shared by all workers.
+
+    Files move in fixed-size chunks in both directions, so memory use does
+    not depend on object size.
+    """
+    # True when objects live outside storage_dir, so local files are only a cache
+    shared = False
+
+    @abstractmethod
+    async def put_file(self, key: str, file_path: Path):
+        """Stores the content of a local file under `key`."""
+
+    @abstractmethod
+    async def put_bytes(self, key: str, data: bytes):
+        """Stores `data` under `key`."""
+
+    @abstractmethod
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        Yields the content of an object, optionally only bytes `start` to `end` (inclusive).
+
+        Raises:
+            ObjectNotFoundError: If the key does not exist.
+        """
+
+    async def get_file(self, key: str, file_path: Path) -> Path:
+        """
+        Copies an object to a local file, replacing it atomically.
+
+        Raises:
+            ObjectNotFoundError: If the key does not exist.
+        """
+        await aiofiles.os.makedirs(file_path.parent, exist_ok=True)
+        temp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.part")
+        try:
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for chunk in self.iter_bytes(key):
+                    await f.write(chunk)
+            await aiofiles.os.replace(temp_path, file_path)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return file_path
+
+    async def get_bytes(self, key: str) -> bytes:
+        """Returns the whole content of a (small) object."""
+        return b"".join([chunk async for chunk in self.iter_bytes(key)])
+
+    @abstractmethod
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        """Returns an object's metadata, or None if it does not exist."""
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Deletes an object; deleting a missing key is not an error."""
+
+    async def aclose(self):
+        """Releases network resources."""
+        pass
+
+class LocalStorage(StorageBackend):
+    """Stores objects as files under a root directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root).resolve()
+
+    def path_for(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Storage key escapes the storage root: {key}")
+        return path
+
+    async def put_file(self, key: str, file_path: Path):
+        target = self.path_for(key)
+        # Files written under storage_dir are already in place
+        if Path(file_path).resolve() == target:
+            return
+        await aiofiles.os.makedirs(target.parent, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+        try:
+            async with aiofiles.open(file_path, "rb") as src, aiofiles.open(temp_path, "wb") as dst:
+                while chunk := await src.read(COPY_CHUNK_SIZE):
+                    await dst.write(chunk)
+            await aiofiles.os.replace(temp_path, target)
+        except BaseException:
+            try:
+                await aiofiles.os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    async def put_bytes(self, key: str, data: bytes):
+        target = self.path_for(key)
+        await aiofiles.os.makedirs(target.parent, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+        async with aiofiles.open(temp_path, "wb") as f:
+            await f.write(data)
+        await aiofiles.os.replace(temp_path, target)
+
+    async def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            f = await aiofiles.open(self.path_for(key), "rb")
+        except FileNotFoundError:
+            raise ObjectNotFoundError(key)
+        try:
+            await f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = await f.read(COPY_CHUNK_SIZE if remaining is None else min(COPY_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await f.close()
+
+    async def get_file(self, key: str, file_path: Path) -> Path:
+        if Path(file_path).resolve() == self.path_for(key):
+            if not await aiofiles.os.path.exists(file_path):
+                raise ObjectNotFoundError(key)
+            return file_path
+        return await super().get_file(key, file_path)
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            result = await aiofiles.os.stat(self.path_for(key))
+        except FileNotFoundError:
+            return None
+        return ObjectInfo(key, result.st_size, None)
+
+    async def delete(self, key: str):
+        try:
+            await aiofiles.os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+class FileRange(NamedTuple):
+    """
+    A byte range of a local file, sent as a request body straight from disk.
+
+    The SHA-256 needed for signing is computed up front in a first pass, so
+    the range is never held in memory and can be re-read for retries.
+    """
+    path: Path
+    offset: int
+    length: int
+    sha256: str
+
+    @classmethod
+    async def hashed(cls, path: Path, offset: int, length: int) -> "FileRange":
+        def digest() -> str:
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as f:
+                f.seek(offset)
+                remaining = length
+                while remaining and (chunk := f.read(min(COPY_CHUNK_SIZE, remaining))):
+                    sha256.update(chunk)
+                    remaining -= len(chunk)
+            return sha256.hexdigest()
+
+        return cls(path, offset, length, await asyncio.to_thread(digest))
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.offset)
+            remaining = self.length
+            while remaining and (chunk := await f.read(min(COPY_CHUNK_SIZE, remaining))):
+                remaining -= len(chunk)
+                yield chunk
+
+class S3Storage(StorageBackend):
+    """
+    Stores objects in an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    Requests are signed with AWS Signature Version 4 and sent over a pooled
+    httpx client. Files larger than one part are uploaded with a multipart
+    upload, several parts at a time; downloads are streamed.
+    """
+    shared = True
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        prefix: str = "",
+        addressing_style: str = "path",
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+    ):
+        endpoint = urlsplit(endpoint_url.rstrip("/"))
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.part_size = max(part_size, S3_MIN_PART_SIZE)
+        self.max_concurrency = max_concurrency
+        if addressing_style == "virtual":
+            self.host = f"{bucket}.{endpoint.netloc}"
+            self._bucket_path = ""
+        else:
+            self.host = endpoint.netloc
+            self._bucket_path = f"/{bucket}"
+        self._base_url = f"{endpoint.scheme}://{self.host}"
+        self._signing_keys: dict[str, bytes] = {}
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled HTTP client, created on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(self.timeout, connect=10.0))
+        return self._client
+
+    def _path(self, key: str) -> str:
+        return f"{self._bucket_path}/{self.prefix}{key}"
+
+    def _signing_key(self, date: str) -> bytes:
+        key = self._signing_keys.get(date)
+        if key is None:
+            key = f"AWS4{self.secret_key}".encode()
+            for part in (date, self.region, "s3", "aws4_request"):
+                key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+            self._signing_keys = {date: key}
+        return key
+
+    def sign(
+        self,
+        method: str,
+        path: str,
+        query: dict[str, str],
+        headers: dict[str, str],
+        payload_hash: str,
+        now: Optional[datetime] = None,
+    ) -> dict[str, str]:
+        """Returns `headers` plus the SigV4 `Authorization`, `x-amz-date` and `x-amz-content-sha256` headers."""
+        amz_date = (now or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        headers = {name.lower(): str(value) for name, value in headers.items()}
+        headers.update({"host": self.host, "x-amz-date": amz_date, "x-amz-content-sha256": payload_hash})
+
+        signed_names = sorted(headers)
+        canonical_headers = "".join(f"{name}:{' '.join(headers[name].split())}\n" for name in signed_names)
+        signed_headers = ";".join(signed_names)
+        canonical_request = "\n".join([
+            method,
+            quote(path, safe="/-_.~"),
+            _canonical_query(query),
+            canonical_headers,
+            signed_headers,
+            payload_hash,
+        ])
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        signature = hmac.new(self._signing_key(date), string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+
+    def _build_request(
+        self,
+        method: str,
+        key: str,
+        query: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        content: Union[bytes, FileRange] = b"",
+    ) -> httpx.Request:
+        query = query or {}
+        path = self._path(key)
+        headers = dict(headers or {})
+        if isinstance(content, FileRange):
+            payload_hash = content.sha256
+            # A known length keeps httpx from switching to chunked encoding, which S3 rejects
+            headers["content-length"] = str(content.length)
+            body = content.iter_chunks()
+        else:
+            payload_hash = hashlib.sha256(content).hexdigest() if content else EMPTY_SHA256
+            body = content
+        signed = self.sign(method, path, query, headers, payload_hash)
+        url = self._base_url + quote(path, safe="/-_.~")
+        if query:
+            url += "?" + _canonical_query(query)
+        return self.client.build_request(method, url, headers=signed, content=body)
+
+    async def _send(
+        self,
+        method: str,
+        key: str,
+        query: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        content: Union[bytes, FileRange] = b"",
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Sends a signed request, retrying transient failures; raises on error responses."""
+        for attempt in range(S3_MAX_RETRIES + 1):
+            # Re-signed on every attempt so the timestamp stays fresh
+            request = self._build_request(method, key, query, headers, content)
+            try:
+                response = await self.client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt == S3_MAX_RETRIES:
+                    raise StorageError(f"{method} {key} failed: {e}")
+                await asyncio.sleep(retry_delay(attempt, 0.2, 5.0))
+                continue
+
+            if response.status_code < 300:
+                return response
+            if stream:
+                await response.aread()
+                await response.aclose()
+            if response.status_code == 404:
+                raise ObjectNotFoundError(key)
+            if (response.status_code >= 500 or response.status_code == 429) and attempt < S3_MAX_RETRIES:
+                await asyncio.sleep(retry_delay(attempt, 0.2, 5.0))
+                continue
+            raise StorageError(f"{method} {key} failed with {response.status_code}: {response.text[:300]}")
+
+    async def put_bytes(self, key: str, data: bytes):
+        await self._send("PUT", key, content=data)
+
+    async def put_file(self, key: str, file_path: Path):
+        size = (await aiofiles.os.stat(file_path)).st_size
+        if size <= self.part_size:
+            await self._send("PUT", key, content=await FileRange.hashed(file_path, 0, size))
+            return
+
+        response = await self._send("POST", key, query={"uploads": ""})
+        upload_id = _xml_text(response.content, "UploadId")
+        try:
+            etags = await self._upload_parts(key, upload_id, file_path, size)
+            parts = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in enumerate(etags, start=1)
+            )
+            body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode()
+            response = await self._send("POST", key, query={"uploadId": upload_id}, content=body)
+            # S3 can report a failed completion with status 200 and an error body
+            if b"<Error>" in response.content:
+                raise StorageError(f"Completing the upload of {key} failed: {response.text[:300]}")
+        except BaseException:
+            try:
+                await self._send("DELETE", key, query={"uploadId": upload_id})
+            except Exception:
+                pass
+            raise
+
+    async def _upload_parts(self, key: str, upload_id: str, file_path: Path, size: int) -> list[str]:
+        """Uploads a file's parts, at most `max_concurrency` at a time; returns their ETags in order."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def upload(number: int, offset: int) -> str:
+            async with semaphore:
+                part = await FileRange.hashed(file_path, offset, min(self.part_size, size - offset))
+                response = await self._send(
+                    "PUT", key, query={"partNumber": str(number), "uploadId": upload_id}, content=part
+                )
+                return response.headers["etag"]
+
+        tasks = [
+            asyncio.create_task(upload(number, offset))
+            for number, offset in enumerate(range(0, size, self.part_size), start=1)
+        ]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers["range"] = f"bytes={start}-{'' if end is None else end}"
+        response = await self._send("GET", key, headers=headers, stream=True)
+        try:
+            async for chunk in response.aiter_bytes(COPY_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            response = await self._send("HEAD", key)
+        except ObjectNotFoundError:
+            return None
+        return ObjectInfo(key, int(response.headers.get("content-length", 0)), response.headers.get("etag"))
+
+    async def delete(self, key: str):
+        try:
+            await self._send("DELETE", key)
+        except ObjectNotFoundError:
+            pass
+
+    async def aclose(self):
+        """Closes the HTTP client, if it was ever created."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+def _canonical_query(query: dict[str, str]) -> str:
+    return "&".join(
+        f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+        for name, value in sorted(query.items())
+    )
+
+def _xml_text(document: bytes, tag: str) -> str:
+    """Returns the text of the first element named `tag`, ignoring namespaces."""
+    for element in ET.fromstring(document).iter():
+        if element.tag.rsplit("}", 1)[-1] == tag:
+            return element.text or ""
+    raise StorageError(f"Missing <{tag}> in storage response.")
+
+def create_storage() -> StorageBackend:
+    """Builds the storage backend selected by `settings.storage_backend`."""
+    if settings.storage_backend == "s3":
+        if not (settings.s3_endpoint_url and settings.s3_bucket and settings.s3_access_key and settings.s3_secret_key):
+            raise ValueError("S3 storage needs S3_ENDPOINT_URL, S3_BUCKET, S3_ACCESS_KEY and S3_SECRET_KEY.")
+        return S3Storage(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key,
+            region=settings.s3_region,
+            prefix=settings.s3_prefix,
+            addressing_style=settings.s3_addressing_style,
+            part_size=settings.s3_part_size,
+            max_concurrency=settings.s3_max_concurrency,
+            timeout=settings.s3_timeout,
+        )
+    if settings.storage_backend == "local":
+        return LocalStorage(settings.storage_dir)
+    raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+
+# Create a singleton instance
+storage = create_storage()
@@ -0,0 +1,170 @@
+# app/services/token_service.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+import jwt
+
+from app.config import settings
+from app.schemas.auth_schemas import AuthenticatedUser
+
+logger = logging.getLogger(__name__)
+
+# Supabase issues HS256 tokens for projects on the legacy JWT secret and
+# ES256/RS256 tokens for projects using asymmetric signing keys
+SYMMETRIC_ALGORITHMS = {"HS256"}
+ASYMMETRIC_ALGORITHMS = {"ES256", "RS256", "EdDSA"}
+
+# An unknown `kid` triggers an early JWKS refresh, but at most this often
+JWKS_MIN_REFRESH_SECONDS = 30.0
+
+class InvalidTokenError(Exception):
+    """Raised when an access token is malformed, expired or not signed by Supabase."""
+    pass
+
+class TokenVerificationUnavailableError(Exception):
+    """Raised when the signing keys cannot be fetched and none are cached."""
+    pass
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally.
+
+    Signatures are checked against the project's JWT secret or its JWKS, which
+    is fetched once and refreshed every `settings.supabase_jwks_ttl` seconds.
+    Recently validated tokens are kept in an LRU so repeated requests with the
+    same token skip signature verification entirely.
+    """
+
+    def __init__(self, cache_size: int, jwks_ttl: float):
+        self.cache_size = cache_size
+        self.jwks_ttl = jwks_ttl
+        self._validated: OrderedDict[str, AuthenticatedUser] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._keys_expire_at = 0.0
+        self._next_refresh_at = 0.0
+        self._lock = asyncio.Lock()
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def jwks_url(self) -> str:
+        return f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+    async def verify(self, token: str) -> AuthenticatedUser:
+        """
+        Returns the user a token was issued to.
+
+        Raises:
+            InvalidTokenError: If the token fails signature, expiry or audience checks.
+            TokenVerificationUnavailableError: If no signing key is available to check it.
+        """
+        user = self._validated.get(token)
+        if user is not None:
+            if user.expires_at > time.time() - settings.supabase_jwt_leeway:
+                self._validated.move_to_end(token)
+                self.hits += 1
+                return user
+            del self._validated[token]
+        self.misses += 1
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise InvalidTokenError(f"Malformed token: {e}")
+
+        algorithm = header.get("alg")
+        if algorithm in SYMMETRIC_ALGORITHMS:
+            if not settings.supabase_jwt_secret:
+                raise InvalidTokenError("Symmetric tokens are not accepted without a JWT secret.")
+            key = settings.supabase_jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            key = await self._get_signing_key(header.get("kid"))
+        else:
+            raise InvalidTokenError(f"Unsupported token algorithm: {algorithm}")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=settings.supabase_jwt_audience,
+                leeway=settings.supabase_jwt_leeway,
+                options={"require": ["exp", "sub"]}
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e))
+
+        user = AuthenticatedUser(
+            id=claims["sub"],
+            email=claims.get("email"),
+            role=claims.get("role"),
+            expires_at=int(claims["exp"])
+        )
+        self._remember(token, user)
+        return user
+
+    def _remember(self, token: str, user: AuthenticatedUser):
+        self._validated[token] = user
+        self._validated.move_to_end(token)
+        while len(self._validated) > self.cache_size:
+            self._validated.popitem(last=False)
+
+    async def _get_signing_key(self, kid: Optional[str]):
+        """Returns the JWKS key for `kid`, refreshing the key set when stale or when `kid` is unknown."""
+        now = time.monotonic()
+        if now >= self._next_refresh_at and (now >= self._keys_expire_at or kid not in self._keys):
+            await self._refresh_keys()
+
+        if kid in self._keys:
+            return self._keys[kid].key
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values())).key
+        if not self._keys:
+            raise TokenVerificationUnavailableError("No signing keys available to verify the token.")
+        raise InvalidTokenError(f"Unknown signing key: {kid}")
+
+    async def _refresh_keys(self):
+        async with self._lock:
+            # Another request may have refreshed the keys while we waited
+            if time.monotonic() < self._next_refresh_at:
+                return
+            self._next_refresh_at = time.monotonic() + JWKS_MIN_REFRESH_SECONDS
+            if self._http_client is None:
+                self._http_client = httpx.AsyncClient(timeout=settings.supabase_timeout)
+            try:
+                response = await self._http_client.get(self.jwks_url, headers={"apikey": settings.supabase_key})
+                response.raise_for_status()
+                key_set = jwt.PyJWKSet.from_dict(response.json())
+            except (httpx.HTTPError, ValueError, jwt.PyJWTError) as e:
+                # Keep using the previous keys until the next attempt
+                logger.warning(f"Failed to refresh JWKS from {self.jwks_url}: {type(e).__name__} - {e}")
+                return
+            self._keys = {key.key_id: key for key in key_set.keys}
+            self._keys_expire_at = time.monotonic() + self.jwks_ttl
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters of the validated-token cache."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._validated)}
+
+    def clear(self):
+        """Forgets validated tokens and cached keys."""
+        self._validated.clear()
+        self._keys = {}
+        self._keys_expire_at = 0.0
+        self._next_refresh_at = 0.0
+
+    async def aclose(self):
+        """Closes the HTTP client used to fetch the JWKS."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+token_verifier = TokenVerifier(
+    cache_size=settings.auth_token_cache_size,
+    jwks_ttl=settings.supabase_jwks_ttl
+)
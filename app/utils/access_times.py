@@ -0,0 +1,18 @@
+# app/utils/access_times.py
+import os
+import time
+from pathlib import Path
+
+def mark_accessed(path: Path):
+    """
+    Records that a stored file was just used, for the storage janitor's LRU.
+
+    Only the access time is set (explicitly, since filesystems mounted with
+    relatime or noatime barely update it); the modification time stays put,
+    so ETags and Last-Modified of served files do not change. Symlinks are
+    followed, so marking an upload's link marks the shared object.
+    """
+    try:
+        os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+    except OSError:
+        pass
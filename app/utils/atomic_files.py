@@ -0,0 +1,22 @@
+# app/utils/atomic_files.py
+import os
+import uuid
+from pathlib import Path
+
+def write_bytes_atomic(path: Path, data: bytes):
+    """
+    Writes a file so that readers see either the old or the new content.
+
+    The data goes to a hidden temporary file in the same directory, which
+    then replaces `path`; concurrent writers each use their own temporary
+    file and the last rename wins. Leftovers of a crash are removed by the
+    storage janitor.
+    """
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,129 @@
+# app/utils/file_responses.py
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Mapping, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# File digests by (path, mtime, size); a rewritten file gets a new entry
+_DIGEST_CACHE_SIZE = 4096
+_digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+
+def _hash_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+async def file_digest(path: Path, stat_result: Optional[os.stat_result] = None) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content.
+
+    Digests are remembered per path, modification time and size, so each
+    version of a file is read only once.
+    """
+    stat_result = stat_result or await asyncio.to_thread(os.stat, path)
+    key = (str(path), stat_result.st_mtime_ns, stat_result.st_size)
+    digest = _digests.get(key)
+    if digest is None:
+        digest = await asyncio.to_thread(_hash_file, str(path))
+        _digests[key] = digest
+        while len(_digests) > _DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    else:
+        _digests.move_to_end(key)
+    return digest
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an entity tag (RFC 9110, 13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def is_not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+    """
+    Whether a GET can be answered with 304 Not Modified.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the client sent no entity tags.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(mtime) <= since
+    return False
+
+class CachedFileResponse(FileResponse):
+    """
+    A FileResponse with a strong, content-derived ETag and conditional GET.
+
+    - `If-None-Match` / `If-Modified-Since` are answered with 304 and no body.
+    - `Range` / `If-Range` requests are served by FileResponse (206/416).
+    - Full responses use the ASGI `http.response.pathsend` extension when the
+      server offers it, letting the server send the file with zero-copy
+      `sendfile`; otherwise the file is streamed in chunks.
+
+    Build instances with `CachedFileResponse.create`, which computes the ETag.
+    """
+
+    @classmethod
+    async def create(
+        cls,
+        path: Path,
+        cache_control: str,
+        headers: Optional[Mapping[str, str]] = None,
+        **kwargs
+    ) -> "CachedFileResponse":
+        """
+        Stats and hashes the file, then builds the response.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        stat_result = await asyncio.to_thread(os.stat, path)
+        digest = await file_digest(path, stat_result)
+        headers = {
+            **(headers or {}),
+            "etag": f'"{digest}"',
+            "cache-control": cache_control,
+        }
+        return cls(path, headers=headers, stat_result=stat_result, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        request_headers = Headers(scope=scope)
+        method = scope["method"].upper()
+
+        if method in ("GET", "HEAD") and is_not_modified(request_headers, self.headers["etag"], self.stat_result.st_mtime):
+            not_modified_headers = {
+                name: self.headers[name]
+                for name in ("etag", "last-modified", "cache-control")
+                if name in self.headers
+            }
+            await Response(status_code=304, headers=not_modified_headers)(scope, receive, send)
+            return
+
+        if (
+            method == "GET"
+            and "http.response.pathsend" in scope.get("extensions", {})
+            and "range" not in request_headers
+        ):
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            if self.background is not None:
+                await self.background()
+            return
+
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,118 @@
+# app/utils/json_stream.py
+import json
+from typing import Optional
+
+class SlideStreamParser:
+    """
+    Incrementally parses a streamed `{"title": ..., "slides": [...]}` document.
+
+    Text is fed in arbitrary pieces as it arrives from the model. Each call to
+    `feed` returns the slide objects that became complete, and the top-level
+    title is available as soon as its string has been received.
+    """
+
+    def __init__(self):
+        # Pieces of the whole document, joined only when `text` is read
+        self._chunks: list[str] = []
+        # Text from absolute offset `_window_start` on, kept while a string or
+        # slide that began there is still open
+        self._window: list[str] = []
+        self._window_start = 0
+        self.title: Optional[str] = None
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        # One entry per open container: [bracket, key it belongs to, expecting a key]
+        self._stack: list[list] = []
+        self._key: Optional[str] = None
+        self._slide_start: Optional[int] = None
+
+    @property
+    def text(self) -> str:
+        """The text fed so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        """Returns the fed text between absolute offsets `start` and `end`."""
+        if len(self._window) > 1:
+            self._window = ["".join(self._window)]
+        return self._window[0][start - self._window_start:end - self._window_start]
+
+    def _trim_window(self, end: int):
+        """Drops the text no open string or slide still needs."""
+        if self._slide_start is not None:
+            keep = self._slide_start
+        elif self._in_string:
+            keep = self._string_start
+        else:
+            keep = end
+        if keep >= end:
+            self._window = []
+        elif keep > self._window_start:
+            self._window = [self._slice(keep, end)]
+        self._window_start = keep
+
+    def _in_slides_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1][0] == "[" and self._stack[1][1] == "slides"
+
+    def feed(self, delta: str) -> list[dict]:
+        """Adds a piece of streamed text and returns newly completed slides."""
+        self._chunks.append(delta)
+        self._window.append(delta)
+        slides = []
+        for pos, char in enumerate(delta, self._pos):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(self._slice(self._string_start, pos + 1))
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                if char == "{" and self._in_slides_array():
+                    self._slide_start = pos
+                self._stack.append([char, self._key, char == "{"])
+                self._key = None
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._slide_start is not None and self._in_slides_array():
+                    try:
+                        slide = json.loads(self._slice(self._slide_start, pos + 1))
+                        if isinstance(slide, dict):
+                            slides.append(slide)
+                    except json.JSONDecodeError:
+                        pass
+                    self._slide_start = None
+            elif char == ",":
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][2] = True
+                    self._key = None
+            elif char == ":":
+                if self._stack and self._stack[-1][0] == "{":
+                    self._stack[-1][2] = False
+        self._pos += len(delta)
+        self._trim_window(self._pos)
+        return slides
+
+    def _end_string(self, raw: str):
+        if not self._stack or self._stack[-1][0] != "{":
+            return
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        if self._stack[-1][2]:
+            # A string where a key is expected is the key of the next value
+            self._key = value
+        elif len(self._stack) == 1 and self._key == "title" and self.title is None:
+            self.title = value
@@ -0,0 +1,157 @@
+# app/utils/resilience.py
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Service temporarily unavailable; retry in {retry_after:.0f}s.")
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens per second.
+
+    `acquire` waits until enough tokens are available, so callers are paced
+    to the configured rate instead of being rejected.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1):
+        """Waits until `amount` tokens can be taken (capped at the bucket capacity)."""
+        amount = min(amount, self.capacity)
+        # The lock keeps waiters in FIFO order so large requests are not starved
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+class RateLimiter:
+    """
+    Paces calls to a requests-per-minute and tokens-per-minute quota.
+
+    Azure OpenAI enforces quotas over short windows, so bursts are limited to
+    a tenth of a minute's quota rather than the whole minute. A limit of 0
+    disables that dimension.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self._requests = self._bucket(requests_per_minute)
+        self._tokens = self._bucket(tokens_per_minute)
+
+    @staticmethod
+    def _bucket(per_minute: int) -> Optional[TokenBucket]:
+        if not per_minute:
+            return None
+        return TokenBucket(per_minute / 60, max(1, per_minute / 6))
+
+    async def acquire(self, tokens: int):
+        """Waits for quota for one request using about `tokens` tokens."""
+        if self._requests:
+            await self._requests.acquire(1)
+        if self._tokens:
+            await self._tokens.acquire(tokens)
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused for `reset_timeout` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    A trial that ends without an outcome (e.g. it was cancelled) must be
+    handed back with `release_trial`, or no further trial is let through.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        """
+        Raises CircuitOpenError if the call must not be attempted.
+        """
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(self.reset_timeout - (time.monotonic() - self._opened_at))
+        if state == "half-open":
+            if self._trial_in_flight:
+                raise CircuitOpenError(self.reset_timeout)
+            self._trial_in_flight = True
+
+    def release_trial(self):
+        """Ends a half-open trial without an outcome, so the next call becomes the trial."""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+def retry_delay(attempt: int, base: float, maximum: float, retry_after: Optional[float] = None) -> float:
+    """
+    Returns how long to wait before retry number `attempt` (starting at 0).
+
+    Uses exponential backoff with full jitter, capped at `maximum`. A
+    server-provided `retry_after` is honoured in full as the lower bound,
+    even above `maximum`; callers that cannot wait that long should give up
+    instead of retrying early.
+    """
+    delay = random.uniform(0, min(maximum, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Reads the server's requested wait (in seconds) from response headers.
+
+    Supports `retry-after-ms` (sent by Azure OpenAI) and `retry-after` as
+    seconds or an HTTP date. Returns None if neither is present or valid.
+    """
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,83 @@
+# app/utils/single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+Progress = Callable[[str], None]
+
+class _Flight:
+    """One running call and the progress callbacks of everyone waiting for it."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.listeners: list[Progress] = []
+        self.last_progress: Optional[str] = None
+
+    def report(self, progress: str):
+        self.last_progress = progress
+        for listener in list(self.listeners):
+            listener(progress)
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one.
+
+    The first caller starts the work in a task; callers arriving while it
+    runs wait for the same result or exception instead of starting their
+    own. Waiters are shielded from each other: a caller that is cancelled
+    (e.g. its client disconnected) stops waiting, but the work carries on
+    for the rest, and finishes even if everyone has left. Once the call
+    completes, the next caller starts afresh.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        # Calls that joined a running flight instead of starting one
+        self.coalesced = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable[[Progress], Awaitable[T]],
+        on_progress: Optional[Progress] = None,
+    ) -> T:
+        """
+        Runs `fn(report)` unless a call with the same key is running, then waits for its result.
+
+        Args:
+            key: Identifies calls that produce the same result.
+            fn: Starts the work; `report` forwards progress to all waiters.
+            on_progress: Called with each progress report; a caller joining
+                late first gets the latest report.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.create_task(fn(flight.report))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda task: self._land(key, flight))
+        else:
+            self.coalesced += 1
+            if on_progress and flight.last_progress is not None:
+                on_progress(flight.last_progress)
+
+        if on_progress:
+            flight.listeners.append(on_progress)
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            if on_progress:
+                flight.listeners.remove(on_progress)
+
+    def _land(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Nobody may be left to see the error; retrieve it so asyncio does not log it
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls running."""
+        return len(self._flights)
@@ -0,0 +1,102 @@
+# app/utils/tokens.py
+import logging
+import math
+import re
+from functools import lru_cache
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=None)
+def _get_encoding():
+    """Loads the tiktoken encoding once, or returns None if it is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(settings.tokenizer_encoding)
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, estimating token counts: {str(e)}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """
+    Counts the tokens in a text.
+
+    Uses tiktoken when installed (and its encoding can be loaded), otherwise
+    estimates from the character count.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def _split_units(text: str) -> list[str]:
+    """Splits text into paragraphs, falling back to lines and then sentences."""
+    paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    if len(paragraphs) > 1:
+        return paragraphs
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) > 1:
+        return lines
+    return [s for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+
+def _split_hard(text: str, max_tokens: int) -> list[str]:
+    """Splits a single oversized unit on word boundaries."""
+    pieces = []
+    current: list[str] = []
+    current_tokens = 0
+    for word in text.split():
+        word_tokens = count_tokens(word) + 1
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Splits text into chunks of at most `max_tokens` tokens.
+
+    Chunks break on paragraph boundaries where possible, so each chunk stays
+    readable on its own. Units that are too large by themselves are split
+    further on line, sentence and finally word boundaries.
+
+    Args:
+        text: The text to split.
+        max_tokens: Maximum tokens per chunk.
+
+    Returns:
+        The chunks, in document order.
+    """
+    chunks = []
+    current: list[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("\n\n".join(current))
+        current, current_tokens = [], 0
+
+    for unit in _split_units(text):
+        unit_tokens = count_tokens(unit)
+        if unit_tokens > max_tokens:
+            flush()
+            sub_units = _split_units(unit)
+            if len(sub_units) > 1:
+                chunks.extend(split_into_chunks(unit, max_tokens))
+            else:
+                chunks.extend(_split_hard(unit, max_tokens))
+            continue
+        if current and current_tokens + unit_tokens > max_tokens:
+            flush()
+        current.append(unit)
+        current_tokens += unit_tokens
+    flush()
+    return chunks
@@ -0,0 +1,53 @@
+# app/worker.py
+"""
+Standalone presentation generation worker.
+
+Consumes the shared job queue (JOB_BACKEND=redis) without serving the API,
+so generation capacity scales separately from the API replicas:
+
+    JOB_BACKEND=redis JOB_WORKERS=4 python -m app.worker
+
+API replicas then run with JOB_WORKERS=0. On SIGTERM or SIGINT the running
+jobs are handed back to the queue and the process exits.
+"""
+import asyncio
+import logging
+import signal
+
+from app.config import settings, ensure_storage_dirs
+from app.services.job_service import job_service
+from app.services.executor_service import executor_service
+from app.services.azure_service import azure_service
+from app.services.registry_service import registry_service
+from app.services.storage_services import storage
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    if settings.job_backend == "local":
+        raise SystemExit("The standalone worker needs a shared queue; set JOB_BACKEND=redis.")
+    if settings.job_workers <= 0:
+        raise SystemExit("JOB_WORKERS must be at least 1 for a worker process.")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    ensure_storage_dirs()
+    await job_service.start()
+    logger.info(f"Generation worker started with {settings.job_workers} workers")
+    try:
+        await stopping.wait()
+    finally:
+        logger.info("Generation worker stopping")
+        await job_service.stop()
+        executor_service.shutdown()
+        await azure_service.aclose()
+        registry_service.close()
+        await storage.aclose()
+        await job_service.aclose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# benchmarks/bench_auth_login.py
+"""
+Load-tests POST /api/v1/auth/login against the local fake GoTrue server.
+
+Reports login throughput at increasing concurrency for the async AuthService
+and, for comparison, for the previous approach of calling the synchronous
+Supabase client from the async handler (which blocks the event loop).
+
+Usage (needs the same environment variables as the app; the Supabase URL is
+overridden to point at the fake server):
+    python -m benchmarks.bench_auth_login --requests 200 --concurrency 1,10,50
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import uvicorn
+
+from app.config import settings
+from benchmarks import fake_gotrue_server
+
+PORT = 9999
+
+async def run_load(client: httpx.AsyncClient, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(i: int):
+        async with semaphore:
+            response = await client.post(
+                "/api/v1/auth/login",
+                json={"email": f"user{i % 20}@example.com", "password": "secret"}
+            )
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="1,10,50")
+    args = parser.parse_args()
+
+    settings.supabase_url = f"http://127.0.0.1:{PORT}"
+    from app.main import app
+    from app.services.auth_service import auth_service
+
+    server = uvicorn.Server(uvicorn.Config(fake_gotrue_server.app, port=PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            print(f"fake GoTrue latency {fake_gotrue_server.LATENCY * 1000:.0f} ms")
+            for concurrency in levels:
+                rps = await run_load(client, args.requests, concurrency)
+                print(f"async client    concurrency {concurrency:>3}: {rps:>7.1f} logins/s")
+    finally:
+        await auth_service.aclose()
+        server.should_exit = True
+        await server_task
+
+    # The blocking baseline needs the fake server in another thread, since the
+    # synchronous client stalls this event loop while it waits.
+    import threading
+    from supabase import create_client
+
+    baseline_server = uvicorn.Server(uvicorn.Config(fake_gotrue_server.app, port=PORT, log_level="warning"))
+    thread = threading.Thread(target=baseline_server.run, daemon=True)
+    thread.start()
+    while not baseline_server.started:
+        await asyncio.sleep(0.05)
+    sync_client = create_client(settings.supabase_url, settings.supabase_key)
+    try:
+        for concurrency in levels:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def blocking_login(i: int):
+                async with semaphore:
+                    sync_client.auth.sign_in_with_password({"email": f"user{i % 20}@example.com", "password": "secret"})
+
+            start = time.perf_counter()
+            await asyncio.gather(*(blocking_login(i) for i in range(args.requests)))
+            rps = args.requests / (time.perf_counter() - start)
+            print(f"blocking client concurrency {concurrency:>3}: {rps:>7.1f} logins/s")
+    finally:
+        baseline_server.should_exit = True
+        thread.join()
+
+if __name__ == "__main__":
+    asyncio.run(main())
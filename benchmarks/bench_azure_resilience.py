@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# benchmarks/bench_azure_resilience.py
+"""
+Exercises AzureOpenAIService against the local fake OpenAI server.
+
+Scenarios:
+- burst: concurrent calls while the server throttles a share of requests;
+  all calls should succeed through jittered retries that honour Retry-After.
+- quota: calls paced by the RPM token bucket.
+- outage: the server fails every request; once the circuit breaker opens,
+  calls fail fast instead of waiting for retries.
+
+Usage (needs the same environment variables as the app; the endpoint is
+overridden to point at the fake server):
+    python -m benchmarks.bench_azure_resilience --calls 50 --throttle-rate 0.3
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+import uvicorn
+
+from app.config import settings
+from benchmarks import fake_openai_server
+
+PORT = 9998
+
+async def configure(**changes):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}") as client:
+        await client.post("/_fake/config", json=changes)
+        return (await client.get("/_fake/stats", params={"reset": True})).json()
+
+def make_service():
+    # Imported late so the settings overrides below are picked up
+    from app.services.azure_service import AzureOpenAIService
+    return AzureOpenAIService()
+
+async def timed_call(service) -> tuple[bool, float, str]:
+    start = time.perf_counter()
+    try:
+        await service.create_presentation_content("Dokumen uji singkat.", max_tokens=200)
+        return True, time.perf_counter() - start, ""
+    except Exception as e:
+        return False, time.perf_counter() - start, type(e).__name__
+
+async def burst(calls: int, throttle_rate: float):
+    await configure(latency=0.05, throttle_rate=throttle_rate, error_rate=0.0, retry_after_ms=200)
+    service = make_service()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed_call(service) for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    stats = await configure()
+    await service.aclose()
+    ok = sum(1 for success, _, _ in results if success)
+    print(
+        f"burst:  {ok}/{calls} succeeded in {elapsed:.2f}s; server saw {stats['requests']} requests, "
+        f"{stats['throttled']} throttled"
+    )
+
+async def quota(calls: int, rpm: int):
+    settings.azure_openai_rpm = rpm
+    await configure(latency=0.0, throttle_rate=0.0, error_rate=0.0)
+    service = make_service()
+    start = time.perf_counter()
+    await asyncio.gather(*(timed_call(service) for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    await service.aclose()
+    settings.azure_openai_rpm = 0
+    # Bursts of up to a tenth of the quota pass at once, the rest is paced
+    expected = max(0, calls - max(1, rpm / 6)) * 60 / rpm
+    print(f"quota:  {calls} calls at {rpm} RPM took {elapsed:.2f}s (expected about {expected:.2f}s)")
+
+async def outage(calls: int):
+    await configure(latency=0.0, throttle_rate=0.0, error_rate=1.0)
+    service = make_service()
+    results = []
+    for _ in range(calls):
+        results.append(await timed_call(service))
+    stats = await configure(error_rate=0.0)
+    await service.aclose()
+    fast = [elapsed for success, elapsed, _ in results[1:] if not success]
+    print(
+        f"outage: first call failed after {results[0][1]:.2f}s, later calls failed in "
+        f"{max(fast) * 1000:.1f} ms max; server saw {stats['requests']} requests for {calls} calls "
+        f"(circuit {service.circuit_breaker.state})"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--throttle-rate", type=float, default=0.3)
+    parser.add_argument("--rpm", type=int, default=120)
+    args = parser.parse_args()
+
+    settings.azure_openai_endpoint = f"http://127.0.0.1:{PORT}"
+    settings.azure_openai_retry_base_delay = 0.1
+    settings.azure_openai_retry_max_delay = 2.0
+    settings.azure_openai_max_retries = 6
+
+    server = uvicorn.Server(uvicorn.Config(fake_openai_server.app, port=PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    try:
+        await burst(args.calls, args.throttle_rate)
+        await quota(args.calls, args.rpm)
+        await outage(10)
+    finally:
+        server.should_exit = True
+        await server_task
+
+if __name__ == "__main__":
+    asyncio.run(main())
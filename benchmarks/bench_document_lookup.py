@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# benchmarks/bench_document_lookup.py
+"""
+Compares finding an upload by globbing a flat directory with a registry lookup.
+
+Creates N empty uploads in a temporary directory (flat, as before the
+registry) and registers the same documents in a temporary SQLite registry,
+then times lookups of random document IDs both ways.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_document_lookup --files 20000,100000
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from app.models.registry_models import DocumentRecord
+from app.services.registry_service import RegistryService
+
+async def bench(files: int, lookups: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        upload_dir = Path(tmp) / "uploads"
+        upload_dir.mkdir()
+        registry = RegistryService(f"sqlite:///{tmp}/registry.db")
+
+        document_ids = [str(uuid.uuid4()) for _ in range(files)]
+        for document_id in document_ids:
+            (upload_dir / f"{document_id}.pdf").touch()
+        with registry._session() as session, session.begin():
+            session.add_all(
+                DocumentRecord(
+                    document_id=document_id,
+                    file_name="doc.pdf",
+                    extension=".pdf",
+                    path=f"{document_id}.pdf",
+                    size_bytes=0,
+                    content_hash=uuid.uuid4().hex * 2
+                )
+                for document_id in document_ids
+            )
+
+        sample = random.sample(document_ids, lookups)
+
+        start = time.perf_counter()
+        for document_id in sample:
+            assert list(upload_dir.glob(f"{document_id}.*"))
+        glob_ms = (time.perf_counter() - start) / lookups * 1000
+
+        start = time.perf_counter()
+        for document_id in sample:
+            assert await registry.get(document_id) is not None
+        registry_ms = (time.perf_counter() - start) / lookups * 1000
+        registry.close()
+
+        print(f"{files:>7} uploads: glob {glob_ms:>8.3f} ms/lookup, registry {registry_ms:.3f} ms/lookup")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", default="1000,20000,100000")
+    parser.add_argument("--lookups", type=int, default=50)
+    args = parser.parse_args()
+    for files in (int(n) for n in args.files.split(",")):
+        await bench(files, args.lookups)
+
+if __name__ == "__main__":
+    asyncio.run(main())
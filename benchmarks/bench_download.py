@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# benchmarks/bench_download.py
+"""
+Measures repeat downloads of a presentation with and without revalidation.
+
+Serves the app with uvicorn and downloads a presentation of the given size
+N times, first unconditionally, then as a browser would on repeat views
+(If-None-Match with the ETag from the first response), and finally resumes
+a download from its midpoint with a Range request.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_download --size-mb 8 --downloads 50
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import uvicorn
+
+PORT = 8765
+
+async def run(client: httpx.AsyncClient, url: str, downloads: int, headers=None) -> tuple[float, int, int]:
+    received = 0
+    start = time.perf_counter()
+    for _ in range(downloads):
+        response = await client.get(url, headers=headers)
+        received += len(response.content)
+        status = response.status_code
+    return (time.perf_counter() - start) / downloads * 1000, received, status
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--downloads", type=int, default=50)
+    args = parser.parse_args()
+
+    from app.config import ensure_storage_dirs
+    from app.main import app
+    from app.services.presentation_service import PRESENTATION_DIR
+
+    ensure_storage_dirs()
+
+    document_id = "bench-download"
+    path = PRESENTATION_DIR / f"{document_id}.pptx"
+    path.write_bytes(os.urandom(int(args.size_mb * 1024 * 1024)))
+
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    url = f"http://127.0.0.1:{PORT}/api/v1/document/download/presentation/{document_id}"
+    try:
+        async with httpx.AsyncClient(timeout=60) as client:
+            etag = (await client.get(url)).headers["etag"]
+            full_ms, full_bytes, _ = await run(client, url, args.downloads)
+            cond_ms, cond_bytes, status = await run(client, url, args.downloads, {"If-None-Match": etag})
+            half = path.stat().st_size // 2
+            resume_ms, resume_bytes, _ = await run(client, url, 1, {"Range": f"bytes={half}-", "If-Range": etag})
+        print(f"{args.downloads} downloads of {args.size_mb:g} MB")
+        print(f"  unconditional:  {full_ms:>7.2f} ms each, {full_bytes / 1e6:>8.1f} MB transferred")
+        print(f"  If-None-Match:  {cond_ms:>7.2f} ms each, {cond_bytes / 1e6:>8.1f} MB transferred (status {status})")
+        print(f"  resumed at 50%: {resume_ms:>7.2f} ms, {resume_bytes / 1e6:.1f} MB transferred")
+    finally:
+        server.should_exit = True
+        await server_task
+        path.unlink()
+
+if __name__ == "__main__":
+    asyncio.run(main())
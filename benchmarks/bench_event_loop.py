@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# benchmarks/bench_event_loop.py
+"""
+Measures latency of light requests (GET /) while heavy PDF extractions run.
+
+Compares extracting inline on the event loop (the old behaviour) with the
+thread pool and process pool modes of ExecutorService.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_event_loop --pages 300 --heavy 4 --light-rate 100 --duration 5
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.main import app
+from app.services.document_service import document_service
+from app.services.executor_service import ExecutorService
+from benchmarks.fixtures import make_pdf
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_mode(mode: str, pdf_path: Path, heavy: int, light_rate: float, duration: float, pool_size: int) -> dict:
+    executor = ExecutorService(pool_size=pool_size if mode == "process" else 0)
+
+    async def heavy_request():
+        if mode == "inline":
+            document_service.extract_text_from_file(pdf_path)
+        else:
+            await executor.run(document_service.extract_text_from_file, pdf_path)
+
+    if mode != "inline":
+        # Warm up the pool so worker start-up is not measured
+        await executor.run(len, "warm-up")
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        deadline = start + duration
+
+        async def light_request(scheduled: float):
+            await client.get("/")
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        async def light_requests():
+            # Issue requests at a fixed rate and measure from the intended send
+            # time, so a blocked loop shows up as latency instead of fewer samples.
+            interval = 1 / light_rate
+            tasks = []
+            i = 0
+            while start + i * interval < deadline:
+                scheduled = start + i * interval
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                tasks.append(asyncio.create_task(light_request(scheduled)))
+                i += 1
+            await asyncio.gather(*tasks)
+
+        async def heavy_requests():
+            extractions = 0
+            while time.perf_counter() < deadline:
+                await heavy_request()
+                extractions += 1
+                await asyncio.sleep(0)
+            return extractions
+
+        _, *counts = await asyncio.gather(light_requests(), *(heavy_requests() for _ in range(heavy)))
+        wall = time.perf_counter() - start
+
+    executor.shutdown()
+    return {
+        "mode": mode,
+        "wall_s": wall,
+        "extractions": sum(counts),
+        "requests": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the generated PDF")
+    parser.add_argument("--heavy", type=int, default=4, help="Concurrent heavy extractions")
+    parser.add_argument("--light-rate", type=float, default=100, help="Light requests per second")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds to keep the heavy load running")
+    parser.add_argument("--pool-size", type=int, default=2, help="Process pool size for the 'process' mode")
+    parser.add_argument("--modes", default="inline,thread,process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_pdf(Path(tmp) / "bench.pdf", args.pages)
+        print(f"{'mode':<8} {'wall (s)':>9} {'heavy':>6} {'light':>6} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+        for mode in args.modes.split(","):
+            result = await run_mode(
+                mode, pdf_path, args.heavy, args.light_rate, args.duration, args.pool_size
+            )
+            print(
+                f"{result['mode']:<8} {result['wall_s']:>9.2f} {result['extractions']:>6} {result['requests']:>6} {result['p50_ms']:>9.2f} "
+                f"{result['p99_ms']:>9.2f} {result['max_ms']:>9.2f}"
+            )
+
+if __name__ == "__main__":
+    asyncio.run(main())
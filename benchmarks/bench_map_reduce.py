@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# benchmarks/bench_map_reduce.py
+"""
+Compares single-prompt and map-reduce presentation generation on a long PDF.
+
+The Azure OpenAI client is replaced by a simulated one whose latency grows with
+prompt size (prefill) and output size (decoding), so the benchmark shows how
+map-reduce latency tracks the slowest chunk plus the merge call.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_map_reduce --pages 300 --chunk-tokens 12000 --concurrency 40
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services.azure_service import AzureOpenAIService
+from app.services.document_service import document_service
+from app.utils.tokens import count_tokens
+from benchmarks.fixtures import make_pdf
+
+class SimulatedCompletions:
+    """Stands in for `client.chat.completions` with token-proportional latency."""
+
+    def __init__(self, prefill_tps: float, decode_tps: float):
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.calls = 0
+
+    async def create(self, model, messages, max_tokens, **kwargs):
+        self.calls += 1
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        output_tokens = max_tokens * 0.75
+        await asyncio.sleep(prompt_tokens / self.prefill_tps + output_tokens / self.decode_tps)
+        if "section_title" in messages[0]["content"]:
+            content = {"section_title": "Bagian", "key_points": ["Poin kunci."] * 8}
+        else:
+            content = {"title": "Presentasi", "slides": [{"title": "Slide", "content": ["Isi."]}]}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(content)))])
+
+async def run(text: str, chunk_tokens: int, concurrency: int, prefill_tps: float, decode_tps: float) -> tuple[float, int]:
+    settings.llm_chunk_tokens = chunk_tokens
+    settings.llm_map_concurrency = concurrency
+    service = AzureOpenAIService()
+    completions = SimulatedCompletions(prefill_tps, decode_tps)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    start = time.perf_counter()
+    await service.create_presentation_content(text, max_tokens=settings.azure_openai_max_tokens)
+    return time.perf_counter() - start, completions.calls
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--chunk-tokens", type=int, default=12000)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--prefill-tps", type=float, default=20000, help="Simulated prompt tokens/second")
+    parser.add_argument("--decode-tps", type=float, default=60, help="Simulated output tokens/second")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_pdf(Path(tmp) / "bench.pdf", args.pages)
+        text = document_service.extract_text_from_file(pdf_path)
+    print(f"document: {args.pages} pages, {count_tokens(text)} tokens")
+
+    single, _ = await run(text, 10**9, 1, args.prefill_tps, args.decode_tps)
+    print(f"single prompt: {single:.2f}s (1 call)")
+    mapped, calls = await run(text, args.chunk_tokens, args.concurrency, args.prefill_tps, args.decode_tps)
+    print(f"map-reduce:    {mapped:.2f}s ({calls} calls, concurrency {args.concurrency})")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# benchmarks/bench_paginate.py
+"""
+Compares the linear-time slide paginator with the previous quadratic one.
+
+The previous version re-joined every word of the current page for each new
+word; it is reproduced below. Both split one slide of N words (a single
+bullet, and the same text as 20-word bullets) with the app's page limits.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_paginate --words 1000,10000,50000
+"""
+import argparse
+import time
+
+from app.config import settings
+from app.services.presentation_service import presentation_service
+
+def legacy_paginate(lines: list[str], max_words: int, max_chars: int) -> list[list[str]]:
+    pages = []
+    full_text = " ".join(presentation_service._clean_text(line) for line in lines)
+    words = full_text.split()
+    if not words:
+        return []
+    current_page_words = []
+    for word in words:
+        if current_page_words and (
+            len(" ".join(current_page_words) + " " + word) > max_chars or
+            len(current_page_words) + 1 > max_words
+        ):
+            pages.append([" ".join(current_page_words)])
+            current_page_words = [word]
+        else:
+            current_page_words.append(word)
+    if current_page_words:
+        pages.append([" ".join(current_page_words)])
+    return pages
+
+def timed(paginate, lines: list[str]) -> tuple[float, int]:
+    start = time.perf_counter()
+    pages = paginate(lines, settings.slide_max_words, settings.slide_max_chars)
+    return (time.perf_counter() - start) * 1000, len(pages)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="1000,10000,50000")
+    args = parser.parse_args()
+
+    print(f"page limits: {settings.slide_max_words} words, {settings.slide_max_chars} characters")
+    for count in (int(n) for n in args.words.split(",")):
+        words = [f"kata{i % 97}" for i in range(count)]
+        single = [" ".join(words)]
+        bullets = [" ".join(words[i:i + 20]) for i in range(0, count, 20)]
+
+        legacy_ms, legacy_pages = timed(legacy_paginate, single)
+        single_ms, single_pages = timed(presentation_service._paginate_content, single)
+        bullets_ms, bullets_pages = timed(presentation_service._paginate_content, bullets)
+        print(
+            f"{count:>6} words: previous {legacy_ms:>9.1f} ms ({legacy_pages} pages) | "
+            f"linear {single_ms:>6.1f} ms ({single_pages} pages), "
+            f"as 20-word bullets {bullets_ms:>6.1f} ms ({bullets_pages} pages)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# benchmarks/bench_pdf_extract.py
+"""
+Reports PDF extraction throughput (pages/second), serial versus parallel.
+
+The serial path is DocumentService.extract_text_from_file in the calling
+process; the parallel path is DocumentService.extract_text with process pools
+of the given sizes.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_pdf_extract --pages 400 --workers 2,4,8
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.services import document_service as document_module
+from app.services.executor_service import ExecutorService
+from benchmarks.fixtures import make_pdf
+
+async def run_parallel(pdf_path: Path, workers: int) -> tuple[float, int]:
+    executor = ExecutorService(pool_size=workers)
+    # Warm up the pool so worker start-up is not measured
+    await asyncio.gather(*(executor.run(len, "warm-up") for _ in range(workers)))
+    original = document_module.executor_service
+    document_module.executor_service = executor
+    try:
+        start = time.perf_counter()
+        text = await document_module.document_service.extract_text(pdf_path, max_chars=0, max_tokens=0)
+        return time.perf_counter() - start, len(text)
+    finally:
+        document_module.executor_service = original
+        executor.shutdown()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", default="2,4,8", help="Comma-separated process pool sizes")
+    parser.add_argument("--pages-per-task", type=int, default=settings.pdf_pages_per_task)
+    args = parser.parse_args()
+
+    settings.pdf_parallel_min_pages = 1
+    settings.pdf_pages_per_task = args.pages_per_task
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = make_pdf(Path(tmp) / "bench.pdf", args.pages)
+        print(f"{args.pages} pages, {os.cpu_count()} CPUs")
+
+        start = time.perf_counter()
+        serial_text = document_module.document_service.extract_text_from_file(pdf_path, max_chars=0, max_tokens=0)
+        serial = time.perf_counter() - start
+        print(f"{'serial':<12} {serial:>7.2f}s {args.pages / serial:>8.1f} pages/s")
+
+        for workers in (int(w) for w in args.workers.split(",")):
+            elapsed, length = await run_parallel(pdf_path, workers)
+            assert length == len(serial_text), "parallel output differs from serial output"
+            print(
+                f"{f'{workers} workers':<12} {elapsed:>7.2f}s {args.pages / elapsed:>8.1f} pages/s "
+                f"({serial / elapsed:.1f}x)"
+            )
+
+if __name__ == "__main__":
+    asyncio.run(main())
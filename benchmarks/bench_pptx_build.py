@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# benchmarks/bench_pptx_build.py
+"""
+Compares the template-cached .pptx builder with the previous python-pptx one.
+
+The previous builder created a fresh Presentation per deck and added slides
+and paragraphs through the python-pptx object model; it is reproduced below.
+Reports slides/second, peak Python memory per deck (tracemalloc) and whether
+repeated builds of the same deck are byte-identical.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_pptx_build --slides 20 --decks 30
+"""
+import argparse
+import hashlib
+import io
+import time
+import tracemalloc
+
+from pptx import Presentation
+from pptx.util import Pt
+
+from app.services.presentation_service import presentation_service
+from app.services.pptx_builder import get_template
+
+def legacy_build(document_id: str, content: dict) -> bytes:
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = content.get("title", "Presentation")
+    slide.placeholders[1].text = f"Generated from document: {document_id}"
+    for slide_data in content.get("slides", []):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = slide_data.get("title", "")
+        text_frame = slide.placeholders[1].text_frame
+        text_frame.clear()
+        for point in slide_data.get("content", []):
+            p = text_frame.add_paragraph()
+            p.text = presentation_service._clean_text(point)
+            p.level = 0
+            p.font.size = Pt(18)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+def template_build(document_id: str, content: dict) -> bytes:
+    slides = [
+        (slide_data.get("title", ""), [presentation_service._clean_text(p) for p in slide_data.get("content", [])])
+        for slide_data in content.get("slides", [])
+    ]
+    return get_template().build(content.get("title", "Presentation"), f"Generated from document: {document_id}", slides)
+
+def measure(build, content: dict, decks: int) -> tuple[float, float, bool]:
+    build("warm-up", content)
+    start = time.perf_counter()
+    for _ in range(decks):
+        build("bench", content)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    first = build("bench", content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    time.sleep(1.1)  # ZIP timestamps have two-second resolution
+    stable = hashlib.sha256(first).digest() == hashlib.sha256(build("bench", content)).digest()
+    return elapsed, peak, stable
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=20)
+    parser.add_argument("--decks", type=int, default=30)
+    args = parser.parse_args()
+
+    content = {
+        "title": "Ringkasan Dokumen",
+        "slides": [
+            {"title": f"Bagian {i + 1}", "content": [f"- Poin **{j + 1}** dari bagian {i + 1} dokumen uji." for j in range(5)]}
+            for i in range(args.slides)
+        ]
+    }
+    slides_per_deck = args.slides + 1
+
+    start = time.perf_counter()
+    get_template()
+    print(f"template parsed once in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"{args.decks} decks of {slides_per_deck} slides")
+    for name, build in (("python-pptx", legacy_build), ("template", template_build)):
+        elapsed, peak, stable = measure(build, content, args.decks)
+        print(
+            f"  {name:<12} {args.decks * slides_per_deck / elapsed:>8.0f} slides/s, "
+            f"{elapsed / args.decks * 1000:>6.1f} ms/deck, peak {peak / 1024:>7.0f} KiB/deck, "
+            f"byte-stable: {stable}"
+        )
+
+if __name__ == "__main__":
+    main()
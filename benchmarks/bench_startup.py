@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# benchmarks/bench_startup.py
+"""
+Checks the cold start of the app against an import-time budget.
+
+Imports `app.main` in fresh interpreters with `python -X importtime` and
+fails (exit status 1) if:
+- the fastest import takes longer than the budget;
+- a library that should load on first use (openai, supabase, python-pptx,
+  pypdf, python-docx, reportlab, redis) is imported at startup;
+- importing creates storage directories or the registry database.
+
+Also lists the top-level packages that take the most import time.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_startup --runs 5 --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+# Imported on first use; importing any of these at startup is a regression
+LAZY_PACKAGES = ("openai", "supabase", "gotrue", "pptx", "pypdf", "docx", "reportlab", "redis")
+
+def import_times(env: dict[str, str]) -> dict[str, tuple[int, int]]:
+    """Imports app.main in a fresh interpreter; returns (self, cumulative) microseconds by module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing app.main failed:\n{result.stderr}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Maximum import time of app.main")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list by import time")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point every storage location somewhere that must stay empty
+        storage_dir = Path(tmp) / "storage"
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+            "STORAGE_DIR": str(storage_dir),
+            "TRANSCRIPTS_DIR": str(storage_dir / "transcripts"),
+            "CACHE_DIR": str(storage_dir / "cache"),
+            "UPLOADS_DIR": str(storage_dir / "uploads"),
+            "PRESENTATIONS_DIR": str(storage_dir / "presentations"),
+            "DATABASE_URL": f"sqlite:///{storage_dir / 'registry.db'}",
+        }
+        runs = [import_times(env) for _ in range(args.runs)]
+        if any(Path(tmp).iterdir()):
+            failures.append(f"importing app.main created files: {sorted(p.name for p in Path(tmp).rglob('*'))}")
+
+    totals = sorted(times["app.main"][1] / 1000 for times in runs)
+    print(f"app.main import: best {totals[0]:.0f} ms, median {totals[len(totals) // 2]:.0f} ms over {args.runs} runs")
+    if totals[0] > args.budget_ms:
+        failures.append(f"import took {totals[0]:.0f} ms, over the budget of {args.budget_ms:.0f} ms")
+
+    # Self time summed per top-level package, from the fastest run
+    fastest = min(runs, key=lambda times: times["app.main"][1])
+    packages: dict[str, int] = defaultdict(int)
+    for name, (own, _) in fastest.items():
+        packages[name.split(".")[0]] += own
+    for package, own in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {package:<24} {own / 1000:>7.1f} ms")
+
+    eager = sorted({name.split(".")[0] for name in fastest} & set(LAZY_PACKAGES))
+    if eager:
+        failures.append(f"imported at startup instead of on first use: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# benchmarks/bench_storage.py
+"""
+Measures the storage backends: upload and download throughput and peak
+Python memory (tracemalloc) for files of increasing size.
+
+The S3 backend runs against the local fake S3 server (in a subprocess, so
+only the client's memory is traced); files larger than one part go through
+a multipart upload. Each download is checked against
+the uploaded content, and a ranged read is checked against the file.
+
+Usage (needs the same environment variables as the app):
+    python -m benchmarks.bench_storage --sizes 1,32,128 --part-size 8
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import httpx
+
+from app.services.storage_services import LocalStorage, S3Storage, StorageBackend
+
+PORT = 9000
+MB = 1024 * 1024
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(MB):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def measure(storage: StorageBackend, source: Path, target: Path) -> tuple[float, float, int]:
+    """Returns upload and download seconds and the peak traced memory of both."""
+    key = f"bench/{source.name}"
+    tracemalloc.start()
+    start = time.perf_counter()
+    await storage.put_file(key, source)
+    uploaded = time.perf_counter()
+    await storage.get_file(key, target)
+    downloaded = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if file_hash(source) != file_hash(target):
+        raise RuntimeError(f"Downloaded content differs for {key}")
+    with open(source, "rb") as f:
+        f.seek(1000)
+        expected = f.read(5000)
+    if b"".join([chunk async for chunk in storage.iter_bytes(key, 1000, 5999)]) != expected:
+        raise RuntimeError(f"Ranged read differs for {key}")
+    await storage.delete(key)
+    return uploaded - start, downloaded - uploaded, peak
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,32,128", help="File sizes in MiB")
+    parser.add_argument("--part-size", type=int, default=8, help="Multipart part size in MiB")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parts uploaded at once")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        work = Path(work_dir)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.fake_s3_server:app", "--port", str(PORT), "--log-level", "warning"],
+            env={**os.environ, "FAKE_S3_ROOT": str(work / "fake-s3")},
+        )
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    await client.get(f"http://127.0.0.1:{PORT}/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+
+        backends = {
+            "local": LocalStorage(work / "bucket"),
+            "fake S3": S3Storage(
+                f"http://127.0.0.1:{PORT}", "bench", "bench-access-key", "bench-secret-key",
+                part_size=args.part_size * MB, max_concurrency=args.concurrency,
+            ),
+        }
+        try:
+            for size in (int(s) for s in args.sizes.split(",")):
+                source = work / f"source-{size}.bin"
+                with open(source, "wb") as f:
+                    for _ in range(size):
+                        f.write(os.urandom(MB))
+                for name, storage in backends.items():
+                    upload, download, peak = await measure(storage, source, work / f"copy-{size}.bin")
+                    print(
+                        f"{size:>5} MiB {name:<8} upload {size / upload:>7.1f} MiB/s, "
+                        f"download {size / download:>7.1f} MiB/s, peak memory {peak / MB:>6.1f} MiB"
+                    )
+                source.unlink()
+        finally:
+            for storage in backends.values():
+                await storage.aclose()
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# benchmarks/bench_token_verify.py
+"""
+Measures local access-token verification.
+
+Tokens are minted by the fake GoTrue server's signing helpers, and the JWKS is
+served by it in-process. Reports the per-token cost of a full signature check
+(HS256 and ES256) and of an LRU hit, and the latency an authenticated request
+adds to a document endpoint.
+
+Usage (needs the same environment variables as the app; the Supabase URL is
+overridden to point at the fake server):
+    python -m benchmarks.bench_token_verify --tokens 2000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+import uvicorn
+
+from app.config import settings
+from benchmarks import fake_gotrue_server
+
+PORT = 9999
+
+def mint(count: int, algorithm: str) -> list[str]:
+    fake_gotrue_server.ALGORITHM = algorithm
+    now = int(time.time())
+    return [
+        fake_gotrue_server.make_access_token({
+            "sub": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "exp": now + 3600,
+        })
+        for _ in range(count)
+    ]
+
+async def per_token_us(verifier, tokens: list[str]) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        await verifier.verify(token)
+    return (time.perf_counter() - start) / len(tokens) * 1e6
+
+async def request_latency_ms(client: httpx.AsyncClient, requests: int, token=None) -> float:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get("/api/v1/document/jobs/missing", headers=headers)
+        assert response.status_code == 404, response.text
+    return (time.perf_counter() - start) / requests * 1000
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    settings.supabase_url = f"http://127.0.0.1:{PORT}"
+    settings.supabase_jwt_secret = fake_gotrue_server.JWT_SECRET
+    from app.main import app
+    from app.services.token_service import TokenVerifier, token_verifier
+
+    server = uvicorn.Server(uvicorn.Config(fake_gotrue_server.app, port=PORT, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        for algorithm in ("HS256", "ES256"):
+            tokens = mint(args.tokens, algorithm)
+            verifier = TokenVerifier(cache_size=args.tokens, jwks_ttl=settings.supabase_jwks_ttl)
+            # The first ES256 token pays for the JWKS fetch; keep it out of the average
+            await verifier.verify(tokens[0])
+            cold = await per_token_us(verifier, tokens[1:])
+            cached = await per_token_us(verifier, tokens)
+            await verifier.aclose()
+            print(f"{algorithm}: signature check {cold:>7.1f} us/token, LRU hit {cached:>5.1f} us/token")
+
+        token = mint(1, "ES256")[0]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await request_latency_ms(client, 10, token)
+            anonymous = await request_latency_ms(client, args.requests)
+            authenticated = await request_latency_ms(client, args.requests, token)
+        print(
+            f"document endpoint: {anonymous:.3f} ms anonymous, {authenticated:.3f} ms with a bearer token "
+            f"(+{(authenticated - anonymous) * 1000:.0f} us)"
+        )
+    finally:
+        await token_verifier.aclose()
+        server.should_exit = True
+        await server_task
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+# benchmarks/fake_gotrue_server.py
+"""
+Local stand-in for the Supabase Auth (GoTrue) API.
+
+Implements password sign-in (`POST /auth/v1/token?grant_type=password`) and
+sign-up (`POST /auth/v1/signup`) with a fixed artificial latency, plus the
+project JWKS (`GET /auth/v1/.well-known/jwks.json`). Sessions are signed with
+a local HS256 secret, or with a generated ES256 key when
+FAKE_GOTRUE_ALG=ES256.
+
+Run it and point the app at it:
+    uvicorn benchmarks.fake_gotrue_server:app --port 9999
+    SUPABASE_URL=http://127.0.0.1:9999 uvicorn app.main:app
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+LATENCY = float(os.environ.get("FAKE_GOTRUE_LATENCY", "0.05"))
+JWT_SECRET = os.environ.get("FAKE_GOTRUE_JWT_SECRET", "super-secret-jwt-token-with-at-least-32-characters")
+ALGORITHM = os.environ.get("FAKE_GOTRUE_ALG", "HS256")
+
+SIGNING_KEY = ec.generate_private_key(ec.SECP256R1())
+SIGNING_KID = uuid.uuid4().hex
+
+app = FastAPI(title="Fake GoTrue")
+users: dict[str, dict] = {}
+
+def _user(email: str) -> dict:
+    if email not in users:
+        users[email] = {
+            "id": str(uuid.uuid4()),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {},
+            "created_at": "2024-01-01T00:00:00Z",
+        }
+    return users[email]
+
+def make_access_token(claims: dict) -> str:
+    """Signs claims the way the fake server's sessions are signed."""
+    if ALGORITHM == "ES256":
+        return jwt.encode(claims, SIGNING_KEY, algorithm="ES256", headers={"kid": SIGNING_KID})
+    return jwt.encode(claims, JWT_SECRET, algorithm="HS256")
+
+def _session(user: dict) -> dict:
+    now = int(time.time())
+    claims = {
+        "sub": user["id"],
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": user["email"],
+        "iat": now,
+        "exp": now + 3600,
+    }
+    return {
+        "access_token": make_access_token(claims),
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "expires_at": now + 3600,
+        "refresh_token": uuid.uuid4().hex,
+        "user": user,
+    }
+
+@app.post("/auth/v1/token")
+async def token(request: Request, grant_type: str = "password"):
+    body = await request.json()
+    await asyncio.sleep(LATENCY)
+    if grant_type != "password" or not body.get("password"):
+        return JSONResponse(status_code=400, content={"error": "invalid_grant", "error_description": "Invalid login credentials"})
+    return _session(_user(body["email"]))
+
+@app.post("/auth/v1/signup")
+async def signup(request: Request):
+    body = await request.json()
+    await asyncio.sleep(LATENCY)
+    if body["email"] in users:
+        return JSONResponse(status_code=422, content={"code": 422, "msg": "User already registered"})
+    return _session(_user(body["email"]))
+
+@app.get("/auth/v1/.well-known/jwks.json")
+async def jwks():
+    key = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(SIGNING_KEY.public_key()))
+    key.update({"kid": SIGNING_KID, "alg": "ES256", "use": "sig"})
+    return {"keys": [key]}
@@ -0,0 +1,139 @@
+# benchmarks/fake_openai_server.py
+"""
+Local stand-in for the Azure OpenAI chat completions API.
+
+Serves `POST /openai/deployments/{deployment}/chat/completions` with JSON or
+streamed (SSE) responses, plus injected latency, throttling (429 with
+`retry-after-ms`) and server errors. Behaviour can be changed at runtime
+through `POST /_fake/config`.
+
+Run it and point the app at it:
+    uvicorn benchmarks.fake_openai_server:app --port 9998
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:9998 uvicorn app.main:app
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+class FakeConfig(BaseModel):
+    """Runtime behaviour of the fake server."""
+    latency: float = 0.2
+    tokens_per_second: float = 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after_ms: int = 200
+    slides: int = 6
+
+config = FakeConfig()
+stats = {"requests": 0, "throttled": 0, "errors": 0, "completed": 0}
+
+app = FastAPI(title="Fake Azure OpenAI")
+
+def _content_for(messages: list[dict]) -> str:
+    system = messages[0]["content"] if messages else ""
+    if "section_title" in system:
+        return json.dumps({"section_title": "Bagian", "key_points": [f"Poin kunci {i}." for i in range(5)]})
+    return json.dumps({
+        "title": "Presentasi Uji",
+        "slides": [
+            {"title": f"Slide {i + 1}", "content": [f"Poin {i + 1}.{j + 1} dari dokumen." for j in range(4)]}
+            for i in range(config.slides)
+        ]
+    }, ensure_ascii=False)
+
+def _usage(messages: list[dict], content: str) -> dict:
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+@app.post("/openai/deployments/{deployment}/chat/completions")
+async def chat_completions(deployment: str, request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    roll = random.random()
+    if roll < config.throttle_rate:
+        stats["throttled"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"code": "429", "message": "Rate limit is exceeded."}},
+            headers={"retry-after-ms": str(config.retry_after_ms), "retry-after": str(max(1, config.retry_after_ms // 1000))}
+        )
+    if roll < config.throttle_rate + config.error_rate:
+        stats["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": {"code": "500", "message": "Internal error."}})
+
+    await asyncio.sleep(config.latency)
+    messages = body.get("messages", [])
+    content = _content_for(messages)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    if body.get("stream"):
+        async def events():
+            piece_size = 16
+            # Tokens are roughly 4 characters, so a piece is about 4 tokens
+            delay = 4 / config.tokens_per_second if config.tokens_per_second else 0
+            for start in range(0, len(content), piece_size):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": deployment,
+                    "choices": [{"index": 0, "delta": {"content": content[start:start + piece_size]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if delay:
+                    await asyncio.sleep(delay)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": deployment,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": _usage(messages, content),
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+            stats["completed"] += 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    if config.tokens_per_second:
+        await asyncio.sleep(len(content) / 4 / config.tokens_per_second)
+    stats["completed"] += 1
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": deployment,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(messages, content),
+    }
+
+@app.post("/_fake/config")
+async def update_config(changes: dict):
+    """Updates the fake server's behaviour; returns the new configuration."""
+    global config
+    config = config.model_copy(update=changes)
+    return config
+
+@app.get("/_fake/stats")
+async def get_stats(reset: Optional[bool] = False):
+    """Returns request counters, optionally resetting them."""
+    current = dict(stats)
+    if reset:
+        for key in stats:
+            stats[key] = 0
+    return current
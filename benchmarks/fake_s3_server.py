@@ -0,0 +1,136 @@
+# benchmarks/fake_s3_server.py
+"""
+Local MinIO-style stand-in for an S3-compatible bucket.
+
+Implements path-style object PUT, GET (with Range), HEAD and DELETE, plus
+multipart uploads (initiate, upload part, complete, abort). Objects are kept
+as files in a temporary directory and request bodies are streamed to disk,
+so large objects do not sit in memory. Requests must carry a SigV4
+Authorization header and an `x-amz-content-sha256` that matches the body;
+the signature itself is not checked.
+
+Run it and point the app at it:
+    uvicorn benchmarks.fake_s3_server:app --port 9000
+    STORAGE_BACKEND=s3 S3_ENDPOINT_URL=http://127.0.0.1:9000 S3_BUCKET=bench \\
+        S3_ACCESS_KEY=bench S3_SECRET_KEY=bench uvicorn app.main:app
+"""
+import hashlib
+import os
+import tempfile
+import uuid
+from pathlib import Path
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse
+
+ROOT = Path(os.environ.get("FAKE_S3_ROOT") or tempfile.mkdtemp(prefix="fake-s3-"))
+
+app = FastAPI(title="Fake S3")
+# upload ID -> (bucket, key)
+uploads: dict[str, tuple[str, str]] = {}
+
+def _error(status: int, code: str) -> Response:
+    return Response(f"<Error><Code>{code}</Code></Error>", status_code=status, media_type="application/xml")
+
+def _object_path(bucket: str, key: str) -> Path:
+    return ROOT / "objects" / bucket / key
+
+async def _receive(request: Request, path: Path) -> tuple[str, str]:
+    """Streams the request body to `path`; returns its MD5 and SHA-256 hex digests."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    md5 = hashlib.md5()
+    sha256 = hashlib.sha256()
+    with open(path, "wb") as f:
+        async for chunk in request.stream():
+            md5.update(chunk)
+            sha256.update(chunk)
+            f.write(chunk)
+    return md5.hexdigest(), sha256.hexdigest()
+
+def _unauthorized(request: Request) -> bool:
+    return not request.headers.get("authorization", "").startswith("AWS4-HMAC-SHA256 Credential=")
+
+@app.put("/{bucket}/{key:path}")
+async def put_object(bucket: str, key: str, request: Request):
+    if _unauthorized(request):
+        return _error(403, "AccessDenied")
+    upload_id = request.query_params.get("uploadId")
+    if upload_id is not None:
+        if upload_id not in uploads:
+            return _error(404, "NoSuchUpload")
+        target = ROOT / "uploads" / upload_id / request.query_params["partNumber"]
+    else:
+        target = _object_path(bucket, key)
+    temp_path = target.with_name(f".{uuid.uuid4().hex}")
+    md5, sha256 = await _receive(request, temp_path)
+    if request.headers.get("x-amz-content-sha256") != sha256:
+        temp_path.unlink()
+        return _error(400, "XAmzContentSHA256Mismatch")
+    temp_path.replace(target)
+    return Response(headers={"ETag": f'"{md5}"'})
+
+@app.post("/{bucket}/{key:path}")
+async def multipart(bucket: str, key: str, request: Request):
+    if _unauthorized(request):
+        return _error(403, "AccessDenied")
+    if "uploads" in request.query_params:
+        upload_id = uuid.uuid4().hex
+        uploads[upload_id] = (bucket, key)
+        (ROOT / "uploads" / upload_id).mkdir(parents=True)
+        return Response(
+            f"<InitiateMultipartUploadResult><Bucket>{bucket}</Bucket><Key>{key}</Key>"
+            f"<UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>",
+            media_type="application/xml",
+        )
+
+    upload_id = request.query_params.get("uploadId")
+    if upload_id not in uploads:
+        return _error(404, "NoSuchUpload")
+    body = (await request.body()).decode()
+    numbers = [int(part.split("</PartNumber>")[0]) for part in body.split("<PartNumber>")[1:]]
+    part_dir = ROOT / "uploads" / upload_id
+    target = _object_path(bucket, key)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    md5s = b""
+    with open(target, "wb") as out:
+        for number in numbers:
+            md5 = hashlib.md5()
+            with open(part_dir / str(number), "rb") as part:
+                while chunk := part.read(1024 * 1024):
+                    md5.update(chunk)
+                    out.write(chunk)
+            md5s += md5.digest()
+    for part in part_dir.iterdir():
+        part.unlink()
+    part_dir.rmdir()
+    del uploads[upload_id]
+    etag = f"{hashlib.md5(md5s).hexdigest()}-{len(numbers)}"
+    return Response(
+        f'<CompleteMultipartUploadResult><Key>{key}</Key><ETag>"{etag}"</ETag></CompleteMultipartUploadResult>',
+        media_type="application/xml",
+    )
+
+@app.api_route("/{bucket}/{key:path}", methods=["GET", "HEAD"])
+async def get_object(bucket: str, key: str, request: Request):
+    if _unauthorized(request):
+        return _error(403, "AccessDenied")
+    path = _object_path(bucket, key)
+    if not path.is_file():
+        return _error(404, "NoSuchKey")
+    return FileResponse(path, media_type="application/octet-stream")
+
+@app.delete("/{bucket}/{key:path}")
+async def delete_object(bucket: str, key: str, request: Request):
+    if _unauthorized(request):
+        return _error(403, "AccessDenied")
+    upload_id = request.query_params.get("uploadId")
+    if upload_id is not None:
+        if uploads.pop(upload_id, None) is None:
+            return _error(404, "NoSuchUpload")
+        part_dir = ROOT / "uploads" / upload_id
+        for part in part_dir.iterdir():
+            part.unlink()
+        part_dir.rmdir()
+    else:
+        _object_path(bucket, key).unlink(missing_ok=True)
+    return Response(status_code=204)
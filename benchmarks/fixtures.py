@@ -0,0 +1,26 @@
+# benchmarks/fixtures.py
+"""Helpers for generating sample documents used by the benchmark scripts."""
+from pathlib import Path
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua. Ut enim ad minim veniam, quis nostrud "
+    "exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat."
+)
+
+def make_pdf(path: Path, pages: int, lines_per_page: int = 45) -> Path:
+    """Writes a text-only PDF with `pages` pages of filler text."""
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+    _, height = A4
+    for page in range(pages):
+        pdf.setFont("Helvetica", 9)
+        pdf.drawString(40, height - 30, "Course Syllabus - Confidential")
+        for line in range(lines_per_page):
+            pdf.drawString(40, height - 50 - line * 16, f"{page}.{line} {LOREM[:110]}")
+        pdf.drawString(280, 20, str(page + 1))
+        pdf.showPage()
+    pdf.save()
+    return path
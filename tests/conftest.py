@@ -0,0 +1,13 @@
+# tests/conftest.py
+import os
+
+# Settings the app requires; the tests never reach these services
+for name, value in {
+    "SUPABASE_URL": "http://127.0.0.1:9",
+    "SUPABASE_KEY": "test",
+    "AZURE_OPENAI_API_KEY": "test",
+    "AZURE_OPENAI_API_VERSION": "2024-02-01",
+    "AZURE_OPENAI_ENDPOINT": "http://127.0.0.1:9",
+    "AZURE_OPENAI_DEPLOYMENT_NAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
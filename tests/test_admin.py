@@ -0,0 +1,26 @@
+# tests/test_admin.py
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+URL = f"{settings.api_v1_prefix}/admin/profiling/slowest"
+
+@pytest.fixture
+def client() -> TestClient:
+    # No lifespan: the admin guard needs none of the background services
+    return TestClient(app)
+
+def test_admin_is_denied_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", None)
+    monkeypatch.setattr(settings, "debug", True)
+    assert client.get(URL).status_code == 403
+    assert client.get(URL, headers={"X-Admin-Token": ""}).status_code == 403
+
+def test_admin_requires_the_configured_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    assert client.get(URL).status_code == 403
+    assert client.get(URL, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get(URL, headers={"X-Admin-Token": "secret"}).status_code == 200
@@ -0,0 +1,112 @@
+# tests/test_batch_service.py
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+
+from app.services import batch_service as batch_module
+from app.services.batch_service import BatchService
+from app.services import generation_service as generation_module
+from app.services.document_service import SavedUpload
+from app.services.generation_service import GenerationService
+from app.services.storage_services import StorageError
+
+@pytest.fixture
+def stored(monkeypatch) -> list[str]:
+    """Records the names of uploads that reach the document service."""
+    names = []
+
+    async def save_uploaded_file(file, owner_id=None):
+        names.append(file.filename)
+        data = await file.read()
+        return SavedUpload(f"id-{len(names)}", None, "hash", len(data))
+
+    monkeypatch.setattr(batch_module.document_service, "save_uploaded_file", save_uploaded_file)
+    return names
+
+def upload(name: str, data: bytes = b"text") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=name, size=len(data))
+
+def archive(*names: str) -> UploadFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name in names:
+            zf.writestr(name, "text")
+    return upload("docs.zip", buffer.getvalue())
+
+def make_service(max_files: int) -> BatchService:
+    return BatchService(default_concurrency=1, max_concurrency=1, max_files=max_files, history_size=10)
+
+def test_batch_over_the_limit_stores_nothing(stored):
+    service = make_service(max_files=3)
+    with pytest.raises(ValueError):
+        asyncio.run(service.save_files([upload("a.txt"), archive("b.txt", "c.txt", "d.txt")]))
+    assert stored == []
+
+def test_rejected_files_do_not_count_towards_the_limit(stored):
+    service = make_service(max_files=2)
+    documents, errors = asyncio.run(service.save_files([upload("a.txt"), upload("b.exe"), archive("c.txt", "d.png")]))
+    assert stored == ["a.txt", "c.txt"]
+    assert [document.document_id for document in documents] == ["id-1", "id-2"]
+    assert sorted(error.file_name for error in errors) == ["b.exe", "docs.zip/d.png"]
+
+def test_failure_mid_batch_removes_the_documents_stored_so_far(stored, monkeypatch):
+    save = batch_module.document_service.save_uploaded_file
+    deleted = []
+
+    async def save_uploaded_file(file, owner_id=None):
+        if file.filename == "c.txt":
+            raise StorageError("S3 PUT failed")
+        return await save(file, owner_id)
+
+    async def delete_uploaded_files(document_ids):
+        deleted.extend(document_ids)
+
+    monkeypatch.setattr(batch_module.document_service, "save_uploaded_file", save_uploaded_file)
+    monkeypatch.setattr(batch_module.document_service, "delete_uploaded_files", delete_uploaded_files)
+    service = make_service(max_files=5)
+    with pytest.raises(StorageError):
+        asyncio.run(service.save_files([upload("a.txt"), archive("b.txt", "c.txt", "d.txt")]))
+    assert stored == ["a.txt", "b.txt"]
+    assert deleted == ["id-1", "id-2"]
+
+def test_batches_share_the_process_wide_generation_slots(monkeypatch):
+    async def run():
+        generation = GenerationService(concurrency=2)
+        running = peak = 0
+
+        async def find_document(document_id):
+            return None, f"hash-{document_id}"
+
+        async def generate(document_id, file_path, content_hash, report):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return None
+
+        async def set_status(*args):
+            pass
+
+        monkeypatch.setattr(generation, "find_document", find_document)
+        monkeypatch.setattr(generation, "_generate", generate)
+        monkeypatch.setattr(generation_module.registry_service, "set_status", set_status)
+        monkeypatch.setattr(batch_module, "generation_service", generation)
+
+        async def get(document_id):
+            return None
+
+        monkeypatch.setattr(batch_module.registry_service, "get", get)
+        service = BatchService(default_concurrency=4, max_concurrency=4, max_files=10, history_size=10)
+        batches = [await service.create([f"{name}-{i}" for i in range(4)]) for name in "ab"]
+        # A direct request waits for a slot like everyone else
+        await generation.generate_presentation("direct")
+        while service._tasks:
+            await asyncio.sleep(0.01)
+        assert peak == 2
+        assert all(batch.completed == 4 for batch in batches)
+
+    asyncio.run(run())
@@ -0,0 +1,26 @@
+# tests/test_cache_service.py
+import asyncio
+
+from app.services import cache_service as cache_module
+from app.services.cache_service import ResultCache
+
+def test_entries_of_other_processes_count_towards_the_limit(tmp_path, monkeypatch):
+    async def run():
+        ours = ResultCache(tmp_path, max_bytes=10)
+        theirs = ResultCache(tmp_path, max_bytes=10)
+        await ours.set("a", "12345")
+        await theirs.set("b", "12345")
+        assert ours.stats()["bytes"] == 5
+
+        # Past the re-scan interval, the next store sees both entries on disk
+        monkeypatch.setattr(cache_module, "RESCAN_INTERVAL", 0)
+        await ours.set("c", "12345")
+        assert ours.stats()["bytes"] <= 10
+        assert len(list(tmp_path.glob("*.cache"))) == 2
+
+    asyncio.run(run())
+
+def test_stats_do_not_touch_the_disk(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_bytes=10)
+    assert cache.stats()["entries"] == 0
+    assert not (tmp_path / "cache").exists()
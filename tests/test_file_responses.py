@@ -0,0 +1,79 @@
+# tests/test_file_responses.py
+import os
+from email.utils import formatdate
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_document_user
+from app.api.v1.endpoints import document as document_module
+from app.config import settings
+from app.main import app
+from app.utils.file_responses import etag_matches
+
+URL = f"{settings.api_v1_prefix}/document/download/presentation/doc?format=html"
+CONTENT = b"<html>" + b"x" * 100 + b"</html>"
+
+@pytest.fixture
+def presentation(tmp_path, monkeypatch):
+    path = tmp_path / "doc.html"
+    path.write_bytes(CONTENT)
+
+    async def get_rendition(document_id: str, format: str):
+        return path
+
+    monkeypatch.setattr(document_module.generation_service, "get_rendition", get_rendition)
+    app.dependency_overrides[get_document_user] = lambda: None
+    yield path
+    app.dependency_overrides.pop(get_document_user, None)
+
+@pytest.fixture
+def client(presentation) -> TestClient:
+    # No lifespan: the endpoint under test needs none of the background services
+    return TestClient(app)
+
+def test_matching_if_none_match_is_not_modified(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    etag = response.headers["etag"]
+
+    response = client.get(URL, headers={"If-None-Match": f'"other", {etag}'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+def test_weak_tag_matches_the_strong_etag(client):
+    etag = client.get(URL).headers["etag"]
+    response = client.get(URL, headers={"If-None-Match": f"W/{etag}"})
+    assert response.status_code == 304
+    assert etag_matches(f"W/{etag}", etag)
+    assert not etag_matches('"other"', etag)
+
+def test_if_modified_since(client, presentation):
+    mtime = os.stat(presentation).st_mtime
+    assert client.get(URL, headers={"If-Modified-Since": formatdate(mtime + 1, usegmt=True)}).status_code == 304
+    assert client.get(URL, headers={"If-Modified-Since": formatdate(mtime - 60, usegmt=True)}).status_code == 200
+    # If-None-Match takes precedence over If-Modified-Since
+    response = client.get(URL, headers={
+        "If-None-Match": '"other"',
+        "If-Modified-Since": formatdate(mtime + 1, usegmt=True),
+    })
+    assert response.status_code == 200
+
+def test_range_returns_partial_content(client):
+    response = client.get(URL, headers={"Range": "bytes=0-5"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[:6]
+    assert response.headers["content-range"] == f"bytes 0-5/{len(CONTENT)}"
+
+def test_unsatisfiable_range(client):
+    response = client.get(URL, headers={"Range": f"bytes={len(CONTENT) + 10}-"})
+    assert response.status_code == 416
+
+def test_changed_file_gets_a_new_etag(client, presentation):
+    etag = client.get(URL).headers["etag"]
+    presentation.write_bytes(CONTENT + b"<!-- regenerated -->")
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
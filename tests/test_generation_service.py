@@ -0,0 +1,90 @@
+# tests/test_generation_service.py
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import pytest
+
+from app.config import settings
+from app.services import generation_service as generation_module
+from app.services import presentation_service as presentation_module
+from app.services.executor_service import ExecutorService
+from app.services.generation_service import generation_service
+from app.services.presentation_service import presentation_service
+from app.services.storage_services import ObjectInfo, ObjectNotFoundError, StorageBackend, storage_key
+
+class MemoryStorage(StorageBackend):
+    """Shared storage kept in memory, with content-derived ETags like S3."""
+    shared = True
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+
+    async def put_file(self, key: str, file_path: Path):
+        self.objects[key] = Path(file_path).read_bytes()
+
+    async def put_bytes(self, key: str, data: bytes):
+        self.objects[key] = data
+
+    async def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        if key not in self.objects:
+            raise ObjectNotFoundError(key)
+        yield self.objects[key][start:None if end is None else end + 1]
+
+    async def stat(self, key: str) -> Optional[ObjectInfo]:
+        data = self.objects.get(key)
+        if data is None:
+            return None
+        return ObjectInfo(key, len(data), f'"{hashlib.md5(data).hexdigest()}"')
+
+    async def delete(self, key: str):
+        self.objects.pop(key, None)
+
+@pytest.fixture
+def shared_storage(tmp_path, monkeypatch) -> MemoryStorage:
+    storage = MemoryStorage()
+    presentation_dir = tmp_path / "presentations"
+    presentation_dir.mkdir()
+    monkeypatch.setattr(settings, "storage_dir", tmp_path)
+    monkeypatch.setattr(presentation_module, "PRESENTATION_DIR", presentation_dir)
+    monkeypatch.setattr(generation_module, "storage", storage)
+    # Rendering in threads keeps the patched paths
+    executor = ExecutorService(pool_size=0)
+    monkeypatch.setattr(generation_module, "executor_service", executor)
+    yield storage
+    executor.shutdown()
+
+def deck(title: str) -> str:
+    return json.dumps({"title": title, "slides": [{"title": "Slide", "content": ["Point"]}]})
+
+def test_rendition_follows_presentation_regenerated_elsewhere(shared_storage):
+    async def run():
+        document_id = "doc"
+        await generation_service._render(document_id, deck("First"))
+        first = (await generation_service.get_rendition(document_id, "pptx")).read_bytes()
+        assert (await generation_service.get_rendition(document_id, "pptx")).read_bytes() == first
+
+        # Another worker regenerates: new JSON and preview, renditions removed
+        content_key = storage_key(presentation_service.content_path(document_id))
+        html_key = storage_key(presentation_service.rendition_path(document_id, "html"))
+        await shared_storage.put_bytes(html_key, b"<html>Second</html>")
+        await shared_storage.put_bytes(content_key, deck("Second").encode())
+        await shared_storage.delete(storage_key(presentation_service.rendition_path(document_id, "pptx")))
+
+        second = (await generation_service.get_rendition(document_id, "pptx")).read_bytes()
+        assert second != first
+        assert json.loads(presentation_service.content_path(document_id).read_text())["title"] == "Second"
+        assert (await generation_service.get_rendition(document_id, "html")).read_bytes() == b"<html>Second</html>"
+
+    asyncio.run(run())
+
+def test_unpublished_presentation_is_not_served_from_local_copies(shared_storage):
+    async def run():
+        await generation_service._render("doc", deck("First"))
+        shared_storage.objects.clear()
+        with pytest.raises(FileNotFoundError):
+            await generation_service.get_rendition("doc", "html")
+
+    asyncio.run(run())
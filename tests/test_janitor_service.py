@@ -0,0 +1,112 @@
+# tests/test_janitor_service.py
+import asyncio
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services import janitor_service as janitor_module
+from app.services.document_service import shard_path
+from app.services.janitor_service import STALE_TEMP_AGE, JanitorService
+
+DAY = 86400.0
+
+class Registry:
+    """Records the document IDs the janitor deletes from the registry."""
+
+    def __init__(self):
+        self.deleted: list[str] = []
+
+    async def delete(self, document_ids: list[str]):
+        self.deleted.extend(document_ids)
+
+class Storage:
+    def __init__(self, shared: bool):
+        self.shared = shared
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    uploads, presentations = tmp_path / "uploads", tmp_path / "presentations"
+    uploads.mkdir()
+    presentations.mkdir()
+    monkeypatch.setattr(janitor_module, "UPLOAD_DIR", uploads)
+    monkeypatch.setattr(janitor_module, "PRESENTATION_DIR", presentations)
+    monkeypatch.setattr(janitor_module, "storage", Storage(shared=False))
+    registry = Registry()
+    monkeypatch.setattr(janitor_module, "registry_service", registry)
+    return uploads, presentations, registry
+
+def touch(path: Path, size: int, age: float) -> Path:
+    """Writes `size` bytes at `path`, last accessed and modified `age` seconds ago."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+def upload(uploads: Path, document_id: str, size: int, age: float) -> Path:
+    """Stores an upload like document_service: a content-addressed object and a link to it."""
+    content_hash = hashlib.sha256(document_id.encode()).hexdigest()
+    object_path = touch(shard_path(uploads / "objects", content_hash, f"{content_hash}.pdf"), size, age)
+    link = shard_path(uploads, document_id, f"{document_id}.pdf")
+    link.parent.mkdir(parents=True, exist_ok=True)
+    link.symlink_to(os.path.relpath(object_path, link.parent))
+    return link
+
+def make_janitor(**kwargs) -> JanitorService:
+    options = dict(interval=0, upload_ttl=7 * DAY, presentation_ttl=7 * DAY, quota_bytes=0, min_idle=600, batch_size=2)
+    options.update(kwargs)
+    return JanitorService(**options)
+
+def test_groups_past_their_ttl_are_deleted(dirs):
+    uploads, presentations, registry = dirs
+    old, fresh = upload(uploads, "aa-old", 10, 8 * DAY), upload(uploads, "bb-fresh", 10, DAY)
+    old_deck = [touch(presentations / f"deck.{ext}", 10, 8 * DAY) for ext in ("json", "html", "pptx")]
+    janitor = make_janitor()
+    asyncio.run(janitor.run_once())
+
+    assert not old.is_symlink() and not old.resolve().exists()
+    assert fresh.exists()
+    assert not any(path.exists() for path in old_deck)
+    assert janitor.evictions["ttl"] == 2
+    assert janitor.bytes_reclaimed == {"uploads": 10, "presentations": 30}
+    assert registry.deleted == ["aa-old"]
+
+def test_quota_evicts_least_recently_used_but_not_recently_idle(dirs):
+    uploads, _, _ = dirs
+    oldest = upload(uploads, "aa-oldest", 100, 3000)
+    older = upload(uploads, "bb-older", 100, 2000)
+    recent = upload(uploads, "cc-recent", 100, 60)
+    newest = upload(uploads, "dd-newest", 100, 10)
+    janitor = make_janitor(quota_bytes=150)
+    asyncio.run(janitor.run_once())
+
+    # LRU order; the rest were used within min_idle, so stay over quota
+    assert not oldest.exists() and not older.exists()
+    assert recent.exists() and newest.exists()
+    assert janitor.evictions["quota"] == 2
+    assert janitor.usage_bytes["uploads"] == 200 > janitor.quota_bytes
+
+def test_stale_partial_files_are_removed(dirs):
+    uploads, presentations, _ = dirs
+    stale = touch(uploads / "aa" / ".upload-1.part", 5, STALE_TEMP_AGE + 60)
+    in_progress = touch(uploads / "aa" / ".upload-2.part", 5, 10)
+    stale_render = touch(presentations / ".deck.pptx.part", 5, STALE_TEMP_AGE + 60)
+    janitor = make_janitor()
+    asyncio.run(janitor.run_once())
+
+    assert not stale.exists() and not stale_render.exists()
+    assert in_progress.exists()
+    assert janitor.evictions["orphan"] == 2
+
+def test_registry_rows_stay_when_storage_is_shared(dirs, monkeypatch):
+    uploads, _, registry = dirs
+    link = upload(uploads, "aa-old", 10, 8 * DAY)
+    monkeypatch.setattr(janitor_module, "storage", Storage(shared=True))
+    asyncio.run(make_janitor().run_once())
+
+    # The local copy was only a cache of the shared object
+    assert not link.exists()
+    assert registry.deleted == []
@@ -0,0 +1,138 @@
+# tests/test_job_service.py
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa", reason="the queue's Lua scripts need fakeredis[lua]")
+
+from app.models.document_models import PresentationResponse, ProcessingStatus
+from app.services.job_service import CLAIM_SCRIPT, JobQueueFullError, RedisJobService
+
+class ScriptedJobService(RedisJobService):
+    """Runs `outcomes` in turn instead of the generation pipeline."""
+
+    def __init__(self, outcomes: list, **kwargs):
+        super().__init__(fakeredis.FakeAsyncRedis(decode_responses=True), **kwargs)
+        self.outcomes = outcomes
+        self.started = asyncio.Event()
+
+    async def _execute(self, job, on_stage):
+        self.started.set()
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, asyncio.Event):
+            await outcome.wait()
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return PresentationResponse(
+            document_id=job.document_id,
+            file_name=f"{job.document_id}.pptx",
+            download_url=f"/api/v1/document/download/presentation/{job.document_id}",
+        )
+
+def make_service(outcomes: list = (), **kwargs) -> ScriptedJobService:
+    options = dict(workers=1, queue_size=10, retry_base_delay=0, poll_interval=0.01, prefix="test:")
+    options.update(kwargs)
+    return ScriptedJobService(list(outcomes), **options)
+
+async def wait_for_status(service: RedisJobService, job_id: str, status: ProcessingStatus, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await service.get(job_id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not reach {status}: {job}")
+
+def test_submit_rejects_jobs_beyond_the_queue_size():
+    async def run():
+        service = make_service(workers=0, queue_size=2)
+        first = await service.submit("doc-1")
+        await service.submit("doc-2")
+        with pytest.raises(JobQueueFullError):
+            await service.submit("doc-3")
+
+        job = await service.get(first.job_id)
+        assert job.status == ProcessingStatus.PENDING
+        assert await service.redis.llen(service.queue_key) == 2
+        await service.aclose()
+
+    asyncio.run(run())
+
+def test_failed_attempt_is_retried_until_it_completes():
+    async def run():
+        service = make_service([RuntimeError("Azure OpenAI timed out"), None])
+        await service.start()
+        job = await service.submit("doc")
+        job = await wait_for_status(service, job.job_id, ProcessingStatus.COMPLETED)
+        assert job.attempts == 2
+        assert job.error_message is None
+        assert job.result.document_id == "doc"
+        assert await service.redis.zcard(service.processing_key) == 0
+        assert await service.redis.ttl(service._job_key(job.job_id)) > 0
+        await service.stop()
+        await service.aclose()
+
+    asyncio.run(run())
+
+def test_permanent_error_fails_without_retrying():
+    async def run():
+        service = make_service([ValueError("Document is empty"), None])
+        await service.start()
+        job = await service.submit("doc")
+        job = await wait_for_status(service, job.job_id, ProcessingStatus.FAILED)
+        assert job.attempts == 1
+        assert job.error_message == "Document is empty"
+        assert await service.redis.zcard(service.delayed_key) == 0
+        await service.stop()
+        await service.aclose()
+
+    asyncio.run(run())
+
+def test_expired_lease_is_queued_again():
+    async def run():
+        service = make_service(workers=0)
+        job = await service.submit("doc")
+        # A worker leased the job and died: its lease is already past
+        claimed = await service._script(CLAIM_SCRIPT)(
+            keys=[service.queue_key, service.processing_key, service.delayed_key],
+            args=[time.time(), time.time() - 1],
+        )
+        assert claimed == job.job_id
+        assert await service.redis.llen(service.queue_key) == 0
+
+        await service.start()
+        await asyncio.sleep(0.05)
+        assert await service.redis.lrange(service.queue_key, 0, -1) == [job.job_id]
+        assert await service.redis.zcard(service.processing_key) == 0
+        await service.stop()
+        await service.aclose()
+
+    asyncio.run(run())
+
+def test_cancelled_job_is_released_to_the_queue():
+    async def run():
+        service = make_service([asyncio.Event()])
+        await service.start()
+        job = await service.submit("doc")
+        await asyncio.wait_for(service.started.wait(), 5)
+        await service.stop()
+
+        job = await service.get(job.job_id)
+        assert job.status == ProcessingStatus.PENDING
+        assert job.stage == "queued"
+        # The interrupted attempt does not count
+        assert job.attempts == 0
+        assert await service.redis.lrange(service.queue_key, 0, -1) == [job.job_id]
+        assert await service.redis.zcard(service.processing_key) == 0
+        await service.aclose()
+
+    asyncio.run(run())
+
+def test_redis_client_is_created_on_first_use():
+    pytest.importorskip("redis")
+    service = RedisJobService(None, url="redis://localhost:6399/0", workers=0, queue_size=1)
+    assert service._redis is None
+    assert service.redis.connection_pool.connection_kwargs["port"] == 6399
+    asyncio.run(service.aclose())
@@ -0,0 +1,54 @@
+# tests/test_json_stream.py
+import json
+
+from app.utils.json_stream import SlideStreamParser
+
+DOCUMENT = {
+    "title": 'Quotes "inside" \\ and é',
+    "slides": [
+        {"title": "One", "content": ["a, b", "{not a slide}"]},
+        {"title": "Two \"}\" ]", "content": ["c\\"], "notes": {"nested": [1, 2]}},
+        {"title": "Three", "content": []},
+    ],
+}
+
+def feed_all(parser: SlideStreamParser, pieces) -> list[dict]:
+    slides = []
+    for piece in pieces:
+        slides.extend(parser.feed(piece))
+    return slides
+
+def test_every_chunk_boundary_yields_the_same_slides():
+    text = json.dumps(DOCUMENT)
+    # One character at a time splits every string and escape sequence
+    parser = SlideStreamParser()
+    assert feed_all(parser, text) == DOCUMENT["slides"]
+    assert parser.title == DOCUMENT["title"]
+    assert parser.text == text
+
+    for split in range(1, len(text)):
+        parser = SlideStreamParser()
+        assert feed_all(parser, [text[:split], text[split:]]) == DOCUMENT["slides"], split
+        assert parser.title == DOCUMENT["title"]
+
+def test_several_slides_complete_in_one_delta():
+    text = json.dumps(DOCUMENT)
+    start = text.index('{"title": "One"')
+    parser = SlideStreamParser()
+    assert parser.feed(text[:start]) == []
+    assert parser.title == DOCUMENT["title"]
+    assert parser.feed(text[start:]) == DOCUMENT["slides"]
+
+def test_malformed_input_skips_broken_slides():
+    text = '{"title": "Deck", "slides": [{"title": bad}, "loose", {"title": "Good"}, {"title": "Cut'
+    parser = SlideStreamParser()
+    assert parser.feed(text) == [{"title": "Good"}]
+    assert parser.title == "Deck"
+    # Unbalanced closers and trailing garbage do not raise
+    assert parser.feed("]]}}} trailing") == []
+    assert parser.text == text + "]]}}} trailing"
+
+def test_non_string_title_is_ignored():
+    parser = SlideStreamParser()
+    parser.feed('{"title": 3, "slides": [{"title": "S"}]}')
+    assert parser.title is None
@@ -0,0 +1,8 @@
+# tests/test_local_job_service.py
+import pytest
+
+from app.services.job_service import LocalJobService
+
+def test_local_backend_without_workers_is_rejected():
+    with pytest.raises(ValueError):
+        LocalJobService(workers=0, queue_size=10, history_size=10)
@@ -0,0 +1,48 @@
+# tests/test_pptx_builder.py
+import io
+import re
+import zipfile
+
+import pytest
+
+pptx = pytest.importorskip("pptx")
+
+from app.services.pptx_builder import SLIDE_REL_TYPE, get_template
+
+def make_template(path, rename: dict[str, str]):
+    """Saves python-pptx's default template with some relationship ids renamed."""
+    buffer = io.BytesIO()
+    pptx.Presentation().save(buffer)
+    with zipfile.ZipFile(buffer) as source, zipfile.ZipFile(path, "w") as target:
+        for name in source.namelist():
+            data = source.read(name)
+            if name == "ppt/_rels/presentation.xml.rels":
+                text = data.decode("utf-8")
+                for old, new in rename.items():
+                    text = text.replace(f'Id="{old}"', f'Id="{new}"')
+                data = text.encode("utf-8")
+            target.writestr(name, data)
+
+def test_slide_relationships_do_not_collide_with_template_ones(tmp_path):
+    # A gap below a high id: python-pptx gives the prototype slides rId5 and rId7
+    path = tmp_path / "gapped.pptx"
+    make_template(path, {"rId5": "rId8"})
+    deck = get_template(path).build("Deck", "Sub", [(f"Slide {i}", ["Point"]) for i in range(4)])
+
+    with zipfile.ZipFile(io.BytesIO(deck)) as archive:
+        rels = archive.read("ppt/_rels/presentation.xml.rels").decode("utf-8")
+    ids = re.findall(r'Id="(rId\d+)"', rels)
+    assert len(ids) == len(set(ids))
+    slide_ids = re.findall(rf'Id="rId(\d+)" Type="{re.escape(SLIDE_REL_TYPE)}"', rels)
+    assert min(map(int, slide_ids)) > 8
+
+    prs = pptx.Presentation(io.BytesIO(deck))
+    assert [slide.shapes.title.text for slide in prs.slides] == ["Deck"] + [f"Slide {i}" for i in range(4)]
+
+def test_templates_are_cached_per_path(tmp_path):
+    first, second = tmp_path / "first.pptx", tmp_path / "second.pptx"
+    make_template(first, {})
+    make_template(second, {})
+    assert get_template(first) is get_template(first)
+    assert get_template(first) is not get_template(second)
+    assert get_template(None) is not get_template(first)
@@ -0,0 +1,72 @@
+# tests/test_preprocessing_service.py
+from app.services.document_service import PAGE_BREAK
+from app.services.preprocessing_service import GAP_MARKER, preprocessing_service
+from app.utils.tokens import count_tokens
+
+def pdf_text(bodies: list[str]) -> str:
+    """Pages with a running header and footer, as PDF extraction returns them."""
+    return "".join(
+        f"ACME Corp Annual Report\n\n{body}\n\nConfidential - Page {i} of {len(bodies)}{PAGE_BREAK}"
+        for i, body in enumerate(bodies, start=1)
+    )
+
+def test_recurring_headers_and_footers_are_removed():
+    bodies = [
+        "Revenue grew in every region.\nMargins held steady.",
+        "Costs rose with the new plant.\nHiring slowed in spring.",
+        "The outlook remains cautious.",
+        "Dividends are unchanged.\nThe board was re-elected.\nQuestions followed.",
+    ]
+    prepared = preprocessing_service.prepare(pdf_text(bodies), max_tokens=0, boilerplate_min_share=0.5)
+    assert "ACME" not in prepared.text
+    assert "Confidential" not in prepared.text
+    assert prepared.text == "\n\n".join(bodies)
+    assert prepared.boilerplate_lines == 8
+    assert not prepared.sampled
+
+def test_documents_under_three_pages_keep_their_edges():
+    bodies = ["Revenue grew in every region.", "Costs rose with the new plant."]
+    prepared = preprocessing_service.prepare(pdf_text(bodies), max_tokens=0, boilerplate_min_share=0.5)
+    assert prepared.text.count("ACME Corp Annual Report") == 2
+    assert prepared.boilerplate_lines == 0
+
+def test_whitespace_is_compacted():
+    prepared = preprocessing_service.prepare("A  line\twith\xa0spaces\x00.\n\n\n\nNext   paragraph.", max_tokens=0)
+    assert prepared.text == "A line with spaces.\n\nNext paragraph."
+
+def test_sampled_text_stays_within_the_budget():
+    sections = [
+        f"{i}. SECTION {i}\n\n" + "\n\n".join(f"Paragraph {j} of section {i}" + " word" * 40 for j in range(10))
+        for i in range(1, 9)
+    ]
+    text = "\n\n".join(sections)
+    for max_tokens in (200, 500, 1500):
+        prepared = preprocessing_service.prepare(text, max_tokens=max_tokens)
+        assert prepared.sampled
+        assert prepared.tokens == count_tokens(prepared.text)
+        assert prepared.tokens <= max_tokens
+
+def test_gap_markers_stand_where_paragraphs_were_left_out():
+    paragraphs = ["1. INTRODUCTION"] + [f"Paragraph {j}" + " word" * 40 for j in range(20)]
+    prepared = preprocessing_service.prepare("\n\n".join(paragraphs), max_tokens=400)
+    parts = prepared.text.split("\n\n")
+
+    # The heading and opening paragraph lead; no two markers are adjacent
+    assert parts[:2] == paragraphs[:2]
+    assert GAP_MARKER in parts
+    assert all(not (a == b == GAP_MARKER) for a, b in zip(parts, parts[1:]))
+    # Each marker sits between paragraphs that were not adjacent in the original
+    kept = [paragraphs.index(part) if part in paragraphs else None for part in parts]
+    for i, index in enumerate(kept):
+        if index is None:
+            before = kept[i - 1]
+            after = kept[i + 1] if i + 1 < len(kept) else len(paragraphs)
+            assert after > before + 1
+        elif i and kept[i - 1] is not None:
+            assert index == kept[i - 1] + 1
+
+def test_text_within_the_budget_is_not_sampled():
+    prepared = preprocessing_service.prepare("Short.\n\nText.", max_tokens=1000)
+    assert prepared.text == "Short.\n\nText."
+    assert GAP_MARKER not in prepared.text
+    assert not prepared.sampled
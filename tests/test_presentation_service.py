@@ -0,0 +1,43 @@
+# tests/test_presentation_service.py
+from app.services.presentation_service import presentation_service
+
+def paginate(lines: list[str], max_words: int = 5, max_chars: int = 30) -> list[list[str]]:
+    return presentation_service._paginate_content(lines, max_words=max_words, max_chars=max_chars)
+
+def within_limits(pages: list[list[str]], max_words: int = 5, max_chars: int = 30) -> bool:
+    return all(
+        sum(len(bullet.split()) for bullet in page) <= max_words and sum(map(len, page)) <= max_chars
+        for page in pages
+    )
+
+def test_bullet_longer_than_a_page_is_split_at_word_boundaries():
+    words = [f"w{i}" for i in range(12)]
+    pages = paginate(["- intro", " ".join(words)])
+    assert within_limits(pages)
+    # The long bullet fills the rest of the current page, then continues
+    assert pages[0] == ["intro", "w0 w1 w2 w3"]
+    assert [bullet for page in pages for bullet in page] == ["intro", "w0 w1 w2 w3", "w4 w5 w6 w7 w8", "w9 w10 w11"]
+
+def test_character_limit_splits_long_bullets_too():
+    bullet = " ".join(["abcdefghij"] * 5)
+    pages = paginate([bullet], max_words=100, max_chars=25)
+    assert pages == [["abcdefghij abcdefghij"], ["abcdefghij abcdefghij"], ["abcdefghij"]]
+
+def test_bullets_that_exactly_fill_a_page_stay_together():
+    # Five words and thirty characters: both limits reached, neither exceeded
+    pages = paginate(["aaaaa bbbbbb", "ccccc ddddd eeeeee", "next"])
+    assert pages == [["aaaaa bbbbbb", "ccccc ddddd eeeeee"], ["next"]]
+
+    # One character or one word over moves the whole bullet to the next page
+    pages = paginate(["aaaaa bbbbbbb", "ccccc ddddd eeeeee"])
+    assert pages == [["aaaaa bbbbbbb"], ["ccccc ddddd eeeeee"]]
+    pages = paginate(["a b", "c d e f"])
+    assert pages == [["a b"], ["c d e f"]]
+
+def test_empty_slides_have_no_pages():
+    assert paginate([]) == []
+    assert paginate(["", "   ", "**", "- "]) == []
+
+def test_empty_slide_keeps_its_title_in_the_deck():
+    deck = presentation_service._build_deck("doc", {"slides": [{"title": "Empty", "content": []}]})
+    assert deck.slides == [("Empty", [])]
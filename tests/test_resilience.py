@@ -0,0 +1,108 @@
+# tests/test_resilience.py
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services.azure_service import AzureOpenAIService, AzureOpenAIUnavailableError
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, retry_delay
+
+class FakeCompletions:
+    """Stands in for `client.chat.completions`; `create` runs the given coroutine function."""
+
+    def __init__(self, create):
+        self.create = create
+
+def make_service(create) -> AzureOpenAIService:
+    service = AzureOpenAIService()
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(create)))
+    return service
+
+def open_circuit(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+def test_cancelled_half_open_trial_is_released():
+    async def run():
+        started = asyncio.Event()
+
+        async def hang(**kwargs):
+            started.set()
+            await asyncio.Event().wait()
+
+        service = make_service(hang)
+        service.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        open_circuit(service.circuit_breaker)
+        assert service.circuit_breaker.state == "half-open"
+
+        trial = asyncio.create_task(service._create_completion([{"role": "user", "content": "hi"}], max_tokens=10))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # The next call becomes the trial and closes the circuit
+        async def answer(**kwargs):
+            return SimpleNamespace(usage=None)
+
+        service.client.chat.completions.create = answer
+        await service._create_completion([{"role": "user", "content": "hi"}], max_tokens=10)
+        assert service.circuit_breaker.state == "closed"
+
+    asyncio.run(run())
+
+def test_half_open_admits_one_trial_at_a_time():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    open_circuit(breaker)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release_trial()
+    breaker.before_call()
+
+def test_retry_delay_honours_long_retry_after():
+    assert retry_delay(0, base=0.5, maximum=30, retry_after=120) == 120
+    assert retry_delay(5, base=0.5, maximum=30) <= 30
+
+def test_retry_after_above_cap_fails_fast():
+    async def run():
+        calls = 0
+
+        async def throttle(**kwargs):
+            nonlocal calls
+            calls += 1
+            response = httpx.Response(
+                429, headers={"retry-after": "120"}, request=httpx.Request("POST", "http://azure")
+            )
+            raise openai.RateLimitError("throttled", response=response, body=None)
+
+        service = make_service(throttle)
+        with pytest.raises(AzureOpenAIUnavailableError) as error:
+            await service._create_completion([{"role": "user", "content": "hi"}], max_tokens=10)
+        assert calls == 1
+        assert error.value.retry_after == 120
+
+    asyncio.run(run())
+
+def test_throttled_half_open_trial_keeps_the_circuit_half_open():
+    async def run():
+        async def throttle(**kwargs):
+            response = httpx.Response(
+                429, headers={"retry-after": "120"}, request=httpx.Request("POST", "http://azure")
+            )
+            raise openai.RateLimitError("throttled", response=response, body=None)
+
+        service = make_service(throttle)
+        service.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        open_circuit(service.circuit_breaker)
+        with pytest.raises(AzureOpenAIUnavailableError):
+            await service._create_completion([{"role": "user", "content": "hi"}], max_tokens=10)
+
+        # Not closed by the 429, and the trial is free for the next call
+        assert service.circuit_breaker.state == "half-open"
+        assert service.circuit_breaker.failures == 1
+        service.circuit_breaker.before_call()
+
+    asyncio.run(run())
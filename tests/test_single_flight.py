@@ -0,0 +1,82 @@
+# tests/test_single_flight.py
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+def test_concurrent_callers_share_one_execution():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def work(report):
+            nonlocal calls
+            calls += 1
+            report("started")
+            await release.wait()
+            return "result"
+
+        progress = [[] for _ in range(3)]
+        waiters = [asyncio.create_task(flights.run("key", work, seen.append)) for seen in progress]
+        await asyncio.sleep(0)
+        assert flights.in_flight == 1
+        release.set()
+
+        assert await asyncio.gather(*waiters) == ["result"] * 3
+        assert calls == 1
+        assert flights.coalesced == 2
+        # Late joiners get the latest report
+        assert progress == [["started"]] * 3
+        assert flights.in_flight == 0
+
+        # Once landed, the next call runs again
+        assert await flights.run("key", work) == "result"
+        assert calls == 2
+
+    asyncio.run(run())
+
+def test_exception_reaches_every_waiter():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def work(report):
+            await release.wait()
+            raise ValueError("Document is empty")
+
+        waiters = [asyncio.create_task(flights.run("key", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flights.in_flight == 0
+
+    asyncio.run(run())
+
+def test_cancelling_the_first_waiter_does_not_cancel_the_others():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        progress = []
+
+        async def work(report):
+            await release.wait()
+            report("done")
+            return 42
+
+        first = asyncio.create_task(flights.run("key", work, progress.append))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flights.run("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        release.set()
+        assert await second == 42
+        # The cancelled caller stopped listening
+        assert progress == []
+
+    asyncio.run(run())
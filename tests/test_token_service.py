@@ -0,0 +1,120 @@
+# tests/test_token_service.py
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.config import settings
+from app.services import token_service as token_module
+from app.services.token_service import InvalidTokenError, TokenVerifier
+
+SECRET = "test-secret-that-is-long-enough-for-hs256"
+
+@pytest.fixture
+def verifier(monkeypatch) -> TokenVerifier:
+    monkeypatch.setattr(settings, "supabase_jwt_secret", SECRET)
+    monkeypatch.setattr(settings, "supabase_jwt_leeway", 0.0)
+    return TokenVerifier(cache_size=8, jwks_ttl=600)
+
+def claims(**overrides) -> dict:
+    values = {"sub": "user-1", "aud": "authenticated", "exp": int(time.time()) + 60}
+    values.update(overrides)
+    return values
+
+def serve_jwks(verifier: TokenVerifier, keys: dict) -> list:
+    """Serves `keys` (kid -> private key) as the JWKS; returns the list of requests made."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        jwks = [
+            {**json.loads(jwt.algorithms.ECAlgorithm.to_jwk(key.public_key())), "kid": kid, "alg": "ES256"}
+            for kid, key in keys.items()
+        ]
+        return httpx.Response(200, json={"keys": jwks})
+
+    verifier._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return requests
+
+def test_valid_token_is_verified_and_cached(verifier):
+    token = jwt.encode(claims(email="a@example.com"), SECRET, algorithm="HS256")
+    user = asyncio.run(verifier.verify(token))
+    assert (user.id, user.email) == ("user-1", "a@example.com")
+    asyncio.run(verifier.verify(token))
+    assert verifier.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+def test_expired_token_is_rejected(verifier):
+    token = jwt.encode(claims(exp=int(time.time()) - 10), SECRET, algorithm="HS256")
+    with pytest.raises(InvalidTokenError, match="expired"):
+        asyncio.run(verifier.verify(token))
+
+def test_wrong_signature_is_rejected(verifier):
+    token = jwt.encode(claims(), "another-secret-that-is-long-enough-too", algorithm="HS256")
+    with pytest.raises(InvalidTokenError, match="Signature"):
+        asyncio.run(verifier.verify(token))
+
+@pytest.mark.parametrize("algorithm", ["none", "HS512"])
+def test_unsupported_algorithm_is_rejected(verifier, algorithm):
+    key = None if algorithm == "none" else SECRET
+    token = jwt.encode(claims(), key, algorithm=algorithm)
+    with pytest.raises(InvalidTokenError, match="Unsupported token algorithm"):
+        asyncio.run(verifier.verify(token))
+
+def test_algorithm_header_must_match_the_key_type(verifier):
+    # An ES256 header over an HMAC signature is checked against the JWKS, not the secret
+    key = ec.generate_private_key(ec.SECP256R1())
+    serve_jwks(verifier, {"k1": key})
+    token = jwt.encode(claims(), SECRET, algorithm="HS256", headers={"kid": "k1"})
+    header = jwt.utils.base64url_encode(json.dumps({"alg": "ES256", "kid": "k1", "typ": "JWT"}).encode()).decode()
+    forged = ".".join([header, *token.split(".")[1:]])
+    with pytest.raises(InvalidTokenError):
+        asyncio.run(verifier.verify(forged))
+
+def test_unknown_kid_refreshes_the_jwks_at_most_once_per_interval(verifier, monkeypatch):
+    async def run():
+        old_key, new_key = ec.generate_private_key(ec.SECP256R1()), ec.generate_private_key(ec.SECP256R1())
+        keys = {"old": old_key}
+        requests = serve_jwks(verifier, keys)
+        await verifier.verify(jwt.encode(claims(), old_key, algorithm="ES256", headers={"kid": "old"}))
+        assert len(requests) == 1
+
+        # Keys were rotated: the unknown kid refreshes once...
+        keys["new"] = new_key
+        monkeypatch.setattr(token_module, "JWKS_MIN_REFRESH_SECONDS", 0)
+        verifier._next_refresh_at = 0
+        user = await verifier.verify(jwt.encode(claims(sub="user-2"), new_key, algorithm="ES256", headers={"kid": "new"}))
+        assert user.id == "user-2"
+        assert len(requests) == 2
+
+        # ...but a flood of unknown kids does not hammer the endpoint
+        verifier._next_refresh_at = time.monotonic() + 30
+        for _ in range(3):
+            with pytest.raises(InvalidTokenError, match="Unknown signing key"):
+                await verifier.verify(jwt.encode(claims(), new_key, algorithm="ES256", headers={"kid": "bogus"}))
+        assert len(requests) == 2
+        await verifier.aclose()
+
+    asyncio.run(run())
+
+def test_cached_token_does_not_outlive_its_expiry(verifier, monkeypatch):
+    now = time.time()
+    token = jwt.encode(claims(exp=int(now) + 5), SECRET, algorithm="HS256")
+    asyncio.run(verifier.verify(token))
+    assert verifier.stats()["entries"] == 1
+
+    class Later(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(seconds=10)
+
+    # Ten seconds on, for the cache and for PyJWT's expiry check alike
+    monkeypatch.setattr(time, "time", lambda: now + 10)
+    monkeypatch.setattr(jwt.api_jwt, "datetime", Later)
+    with pytest.raises(InvalidTokenError, match="expired"):
+        asyncio.run(verifier.verify(token))
+    assert verifier.stats() == {"hits": 0, "misses": 2, "entries": 0}